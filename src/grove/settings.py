@@ -92,6 +92,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'djangosaml2.middleware.SamlSessionMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
+    'vocabs.middleware.ChangeSyncMiddleware',
 ]
 
 ROOT_URLCONF = 'grove.urls'
@@ -184,6 +185,53 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 VOCAB_OUTPUT_DIR = Path(env.str('VOCAB_OUTPUT_DIR', default=BASE_DIR / 'public'))
 
+# Uploads larger than FILE_UPLOAD_MAX_MEMORY_SIZE bytes are spooled to a file
+# in this directory (the system default temporary directory if unset), and
+# imported from there
+FILE_UPLOAD_TEMP_DIR = env.str('FILE_UPLOAD_TEMP_DIR', default=None)
+
+# Maximum number of term URIs accepted by a single batch resolve request
+RESOLVE_MAX_URIS = env.int('RESOLVE_MAX_URIS', default=10000)
+
+# Limits for the SPARQL query endpoint: seconds before a query is abandoned,
+# and the maximum number of result rows (or triples) returned
+SPARQL_QUERY_TIMEOUT = env.float('SPARQL_QUERY_TIMEOUT', default=10.0)
+SPARQL_MAX_RESULTS = env.int('SPARQL_MAX_RESULTS', default=10000)
+
+# Upper bound on the total number of triples in the graphs kept in memory by
+# the vocabulary graph cache
+GRAPH_CACHE_MAX_TRIPLES = env.int('GRAPH_CACHE_MAX_TRIPLES', default=500000)
+
+# Soft-deleted terms and properties older than this many days are moved to
+# the archive tables by the "compact" management command
+COMPACT_RETENTION_DAYS = env.int('COMPACT_RETENTION_DAYS', default=90)
+
+# Maximum number of rendered term table rows kept in memory
+TERM_ROW_CACHE_SIZE = env.int('TERM_ROW_CACHE_SIZE', default=10000)
+
+# Maximum number of seconds that the in-memory predicate registry is used
+# without checking whether the predicates in the database have changed
+PREDICATE_REGISTRY_MAX_AGE = env.float('PREDICATE_REGISTRY_MAX_AGE', default=60)
+
+# Number of worker processes that parse the files of a multi-vocabulary
+# import; 0 parses them in the server process
+IMPORT_WORKERS = env.int('IMPORT_WORKERS', default=4)
+
+# Limits on a multi-vocabulary import: the number of files in an archive, and
+# the total size in bytes of the uncompressed data
+IMPORT_MAX_FILES = env.int('IMPORT_MAX_FILES', default=1000)
+IMPORT_MAX_SIZE = env.int('IMPORT_MAX_SIZE', default=256 * 1024 * 1024)
+
+# How changes are announced to the caches of other server processes: "db",
+# "file" (using CHANGE_BUS_FILE), or "none" (see vocabs.events)
+CHANGE_BUS_CHANNEL = env.str('CHANGE_BUS_CHANNEL', default='db')
+CHANGE_BUS_FILE = Path(env.str('CHANGE_BUS_FILE', default=BASE_DIR / 'changes.jsonl'))
+# Seconds to keep change notices in the database
+CHANGE_BUS_RETENTION = env.int('CHANGE_BUS_RETENTION', default=86400)
+# Minimum seconds between reads of the channel; changes made in other
+# processes may take this long to show up
+CHANGE_BUS_SYNC_INTERVAL = env.float('CHANGE_BUS_SYNC_INTERVAL', default=1.0)
+
 # Logging
 LOGGING = {
     'version': 1,  # the dictConfig format version
@@ -0,0 +1,182 @@
+"""Keyset pagination and serialization for the read-only JSON API."""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from typing import Any, Callable, Iterable
+
+from django.db.models import Count, Model, Prefetch, Q, QuerySet
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class APIError(ValueError):
+    pass
+
+
+def encode_cursor(last_id: int) -> str:
+    return urlsafe_b64encode(json.dumps({'after': last_id}).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        data = json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        last_id = data['after']
+    except (Base64Error, ValueError, KeyError, TypeError) as e:
+        raise APIError('Invalid cursor') from e
+    if not isinstance(last_id, int):
+        raise APIError('Invalid cursor')
+    return last_id
+
+
+def page_size(value: str | None) -> int:
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError as e:
+        raise APIError('limit must be an integer') from e
+    if size < 1:
+        raise APIError('limit must be at least 1')
+    return min(size, MAX_PAGE_SIZE)
+
+
+def paginate(queryset: QuerySet, cursor: str | None, limit: int) -> tuple[list[Model], str | None]:
+    """Returns one page of the queryset, ordered by id, and the cursor for the
+    next page (or None if this is the last page).
+
+    Instead of an OFFSET, the cursor records the last id seen, so every page
+    is a range scan on the primary key index that starts where the previous
+    page ended, and costs the same no matter how deep into the results it is."""
+    queryset = queryset.order_by('id')
+    if cursor:
+        queryset = queryset.filter(id__gt=decode_cursor(cursor))
+    # fetch one extra row to find out whether there is another page
+    objects = list(queryset[:limit + 1])
+    if len(objects) > limit:
+        return objects[:limit], encode_cursor(objects[limit - 1].id)
+    return objects, None
+
+
+class Resource:
+    """Describes how to query and serialize one kind of API object.
+
+    `fields` maps each field name to a function that produces its value from
+    a model instance. `columns` maps field names to the model fields (or
+    fields of joined models) they are produced from; only the columns of the
+    requested fields are loaded. `relations` maps field names to functions
+    that add the necessary joins or prefetches to the queryset, and are only
+    applied if those fields are requested."""
+
+    model: type[Model]
+    fields: dict[str, Callable[[Any], Any]]
+    columns: dict[str, tuple[str, ...]] = {}
+    relations: dict[str, Callable[[QuerySet], QuerySet]] = {}
+
+    def parse_fields(self, value: str | None) -> list[str]:
+        if not value:
+            return list(self.fields)
+        requested = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in requested if name not in self.fields]
+        if unknown:
+            raise APIError(f'Unknown field(s): {", ".join(unknown)}')
+        # the id is always included, since it is the basis of the cursor
+        return ['id'] + [name for name in requested if name != 'id']
+
+    def get_queryset(self, queryset: QuerySet, fields: Iterable[str]) -> QuerySet:
+        columns = {'id'}
+        for name in fields:
+            columns.update(self.columns.get(name, ()))
+            if name in self.relations:
+                queryset = self.relations[name](queryset)
+        return queryset.only(*columns)
+
+    def serialize(self, obj: Model, fields: Iterable[str]) -> dict[str, Any]:
+        return {name: self.fields[name](obj) for name in fields}
+
+
+def timestamp(value) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+class VocabularyResource(Resource):
+    model = Vocabulary
+    fields = {
+        'id': lambda v: v.id,
+        'uri': lambda v: v.uri,
+        'label': lambda v: v.label,
+        'description': lambda v: v.description,
+        'preferred_prefix': lambda v: v.preferred_prefix,
+        'term_count': lambda v: v.live_term_count,
+        'created': lambda v: timestamp(v.created),
+        'modified': lambda v: timestamp(v.modified),
+        'published': lambda v: timestamp(v.published),
+    }
+    columns = {
+        'uri': ('uri',),
+        'label': ('label',),
+        'description': ('description',),
+        'preferred_prefix': ('preferred_prefix',),
+        'created': ('created',),
+        'modified': ('modified',),
+        'published': ('published',),
+    }
+    relations = {
+        'term_count': lambda qs: qs.annotate(
+            live_term_count=Count('terms', filter=Q(terms__deleted__isnull=True))
+        ),
+    }
+
+
+class TermResource(Resource):
+    model = Term
+    fields = {
+        'id': lambda t: t.id,
+        'name': lambda t: t.name,
+        'uri': lambda t: t.uri,
+        'vocabulary': lambda t: t.vocabulary.uri,
+        'created': lambda t: timestamp(t.created),
+        'modified': lambda t: timestamp(t.modified),
+        'properties': lambda t: [
+            {
+                'id': prop.id,
+                'predicate': str(prop.predicate),
+                'predicate_uri': prop.predicate.uri,
+                'value': prop.value,
+                'value_is_uri': prop.value_is_uri,
+            }
+            for prop in t.properties.all()
+        ],
+    }
+    columns = {
+        'name': ('name',),
+        'uri': ('name', 'vocabulary__uri'),
+        'vocabulary': ('vocabulary__uri',),
+        'created': ('created',),
+        'modified': ('modified',),
+    }
+    relations = {
+        'uri': lambda qs: qs.select_related('vocabulary'),
+        'vocabulary': lambda qs: qs.select_related('vocabulary'),
+        'properties': lambda qs: qs.prefetch_related(
+            Prefetch('properties', queryset=Property.objects.select_related('predicate').order_by('id'))
+        ),
+    }
+
+
+class PredicateResource(Resource):
+    model = Predicate
+    fields = {
+        'id': lambda p: p.id,
+        'uri': lambda p: p.uri,
+        'curie': lambda p: p.curie,
+        'object_type': lambda p: p.object_type,
+    }
+    columns = {
+        'uri': ('uri',),
+        'curie': ('uri',),
+        'object_type': ('object_type',),
+    }
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class VocabsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vocabs'
+
+    def ready(self):
+        from vocabs.autocomplete import autocomplete_index
+        from vocabs.events import change_bus
+        from vocabs.fragments import term_row_cache
+        from vocabs.graph_cache import graph_cache
+        from vocabs.models import predicate_registry
+        from vocabs.reconcile import label_index
+        from vocabs.sparql import vocabulary_dataset
+
+        # keep the in-memory caches and indexes up to date
+        change_bus.register(
+            autocomplete_index, label_index, vocabulary_dataset, graph_cache, term_row_cache,
+            predicate_registry,
+        )
@@ -0,0 +1,175 @@
+"""Moves old soft-deleted vocabularies, terms, and properties out of the
+live tables."""
+
+import logging
+from collections import Counter
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from safedelete.config import DELETED_VISIBLE
+
+from vocabs.bulk import mark_terms_deleted
+from vocabs.models import ArchivedProperty, ArchivedTerm, ArchivedVocabulary, Property, Term, Vocabulary
+
+logger = logging.getLogger(__name__)
+
+ROW_OVERHEAD = 64
+"""Rough number of bytes taken by a row's fixed-size columns, header, and
+index entries, used to estimate the space reclaimed."""
+
+
+def hard_delete(queryset: QuerySet):
+    # the archived rows have no live dependents left, so skip the deletion
+    # collector and its per-row signals (which would announce each row to
+    # the change bus, although no cached data changes)
+    queryset._raw_delete(queryset.db)
+
+
+def keep_vocabulary_timestamps(latest: dict[int, datetime]):
+    """`Vocabulary.updated` includes the "modified" timestamps of deleted
+    terms and properties. Before removing any, move each vocabulary's own
+    timestamp up to the latest one being removed, so "updated" (and whether
+    there are unpublished changes) stays the same."""
+    for vocabulary_id, modified in latest.items():
+        all_vocabularies().filter(pk=vocabulary_id, modified__lt=modified).update(modified=modified)
+
+
+def all_vocabularies() -> QuerySet:
+    # bulk updates only reach soft-deleted rows with forced visibility
+    return Vocabulary.all_objects.all(force_visibility=DELETED_VISIBLE)
+
+
+def all_terms() -> QuerySet:
+    return Term.all_objects.all(force_visibility=DELETED_VISIBLE)
+
+
+def all_properties() -> QuerySet:
+    return Property.all_objects.all(force_visibility=DELETED_VISIBLE)
+
+
+def archive_properties(properties: QuerySet, batch_size: int) -> Counter:
+    count = Counter()
+    while True:
+        with transaction.atomic():
+            rows = list(
+                properties.order_by('id').values(
+                    'id', 'term_id', 'term__vocabulary_id', 'predicate__uri', 'value',
+                    'created', 'modified', 'deleted', 'deleted_by_cascade',
+                )[:batch_size]
+            )
+            if not rows:
+                return count
+            latest = {}
+            for row in rows:
+                vocabulary_id = row.pop('term__vocabulary_id')
+                latest[vocabulary_id] = max(latest.get(vocabulary_id, row['modified']), row['modified'])
+                row['predicate_uri'] = row.pop('predicate__uri')
+            keep_vocabulary_timestamps(latest)
+            ArchivedProperty.objects.bulk_create([ArchivedProperty(**row) for row in rows])
+            hard_delete(all_properties().filter(id__in=[row['id'] for row in rows]))
+        count['properties'] += len(rows)
+        count['bytes'] += sum(len(row['value'].encode()) + ROW_OVERHEAD for row in rows)
+        logger.debug(f'Archived {len(rows)} properties')
+
+
+def archive_terms(terms: QuerySet, batch_size: int) -> Counter:
+    """Terms that still have properties, deleted or not, are kept."""
+    count = Counter()
+    while True:
+        with transaction.atomic():
+            rows = list(
+                terms.exclude(
+                    Exists(all_properties().filter(term=OuterRef('pk')))
+                ).order_by('id').values(
+                    'id', 'vocabulary_id', 'name', 'created', 'modified', 'deleted',
+                )[:batch_size]
+            )
+            if not rows:
+                return count
+            latest = {}
+            for row in rows:
+                latest[row['vocabulary_id']] = max(latest.get(row['vocabulary_id'], row['modified']), row['modified'])
+            keep_vocabulary_timestamps(latest)
+            ArchivedTerm.objects.bulk_create([ArchivedTerm(**row) for row in rows])
+            hard_delete(all_terms().filter(id__in=[row['id'] for row in rows]))
+        count['terms'] += len(rows)
+        count['bytes'] += sum(len(row['name'].encode()) + ROW_OVERHEAD for row in rows)
+        logger.debug(f'Archived {len(rows)} terms')
+
+
+def archive_vocabularies(before: datetime, batch_size: int) -> Counter:
+    """Archives each vocabulary deleted before the given time in a single
+    transaction, with all of its terms and properties, whenever they were
+    deleted, so that a vocabulary is never restored with only some of its
+    rows."""
+    count = Counter()
+    for vocabulary in all_vocabularies().filter(deleted__lt=before).order_by('id'):
+        with transaction.atomic():
+            # rows restored separately while the vocabulary stayed deleted
+            mark_terms_deleted(Term.objects.filter(vocabulary=vocabulary), vocabulary.deleted, cascade=True)
+            count += archive_properties(all_properties().filter(term__vocabulary=vocabulary), batch_size)
+            count += archive_terms(all_terms().filter(vocabulary=vocabulary), batch_size)
+            ArchivedVocabulary.objects.create(
+                id=vocabulary.id,
+                uri=vocabulary.uri,
+                label=vocabulary.label,
+                description=vocabulary.description,
+                preferred_prefix=vocabulary.preferred_prefix,
+                published=vocabulary.published,
+                created=vocabulary.created,
+                modified=vocabulary.modified,
+                deleted=vocabulary.deleted,
+            )
+            hard_delete(all_vocabularies().filter(pk=vocabulary.pk))
+        count['vocabularies'] += 1
+        count['bytes'] += len(f'{vocabulary.uri}{vocabulary.label}{vocabulary.description}'.encode()) + ROW_OVERHEAD
+        logger.debug(f'Archived vocabulary {vocabulary}')
+    return count
+
+
+def compact(before: datetime, batch_size: int = 1000) -> Counter:
+    """Archives the vocabularies, terms, and properties soft-deleted before
+    the given time, in transactions of at most `batch_size` terms or
+    properties. Returns the number of rows archived from each table, and an
+    estimate of the bytes reclaimed.
+
+    The terms and properties of deleted vocabularies are only archived
+    along with their vocabulary (see `archive_vocabularies()`)."""
+    count = archive_vocabularies(before, batch_size)
+    # properties first, so their terms are free to go
+    count += archive_properties(
+        all_properties().filter(deleted__lt=before, term__vocabulary__deleted__isnull=True), batch_size
+    )
+    count += archive_terms(all_terms().filter(deleted__lt=before, vocabulary__deleted__isnull=True), batch_size)
+    return count
+
+
+def pending(before: datetime) -> Counter:
+    """Counts the rows that `compact()` would archive."""
+    vocabularies = all_vocabularies().filter(deleted__lt=before)
+    return Counter({
+        'vocabularies': vocabularies.count(),
+        'properties': all_properties().filter(
+            Q(term__vocabulary__in=vocabularies) | Q(deleted__lt=before, term__vocabulary__deleted__isnull=True)
+        ).count(),
+        'terms': all_terms().filter(
+            Q(vocabulary__in=vocabularies)
+            | (
+                Q(deleted__lt=before, vocabulary__deleted__isnull=True)
+                & ~Exists(all_properties().filter(term=OuterRef('pk'), deleted__isnull=True))
+                & ~Exists(all_properties().filter(term=OuterRef('pk'), deleted__gte=before))
+            )
+        ).count(),
+    })
+
+
+def vacuum() -> bool:
+    """Returns the space freed by deleted rows to the operating system (on
+    SQLite), or makes it reusable (on PostgreSQL). Returns False for other
+    databases."""
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+    return True
@@ -0,0 +1,208 @@
+"""In-memory prefix index used to suggest URIs and CURIEs while editing properties."""
+
+import logging
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+from threading import RLock
+from typing import Iterable, Iterator, NamedTuple
+
+from vocabs.curies import curie_codec
+from vocabs.events import ChangeEvent, ChangeType
+from vocabs.models import Predicate, Property, Term
+
+logger = logging.getLogger(__name__)
+
+
+class Suggestion(NamedTuple):
+    value: str
+    """The string to insert into the property value field (a CURIE or a full URI)."""
+    label: str
+    """Human-readable label for the suggestion."""
+    kind: str
+    """One of "prefix", "term", or "value"."""
+
+
+class PrefixIndex:
+    """Sorted list of case-folded keys supporting fast prefix lookups.
+
+    The same suggestion may be stored under multiple keys (e.g., a term's
+    full URI and its CURIE). Entries are reference counted, so adding the
+    same key and suggestion twice requires removing it twice."""
+
+    def __init__(self, entries: Iterable[tuple[str, Suggestion]] = ()):
+        self._counts: Counter[tuple[str, Suggestion]] = Counter(
+            (key.casefold(), suggestion) for key, suggestion in entries
+        )
+        self._keys: list[tuple[str, Suggestion]] = sorted(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str, suggestion: Suggestion):
+        entry = (key.casefold(), suggestion)
+        self._counts[entry] += 1
+        if self._counts[entry] == 1:
+            self._keys.insert(bisect_left(self._keys, entry), entry)
+
+    def remove(self, key: str, suggestion: Suggestion):
+        entry = (key.casefold(), suggestion)
+        if entry not in self._counts:
+            return
+        self._counts[entry] -= 1
+        if self._counts[entry] <= 0:
+            del self._counts[entry]
+            index = bisect_left(self._keys, entry)
+            if index < len(self._keys) and self._keys[index] == entry:
+                del self._keys[index]
+
+    def search(self, prefix: str) -> Iterator[Suggestion]:
+        prefix = prefix.casefold()
+        index = bisect_left(self._keys, (prefix,))
+        while index < len(self._keys):
+            key, suggestion = self._keys[index]
+            if not key.startswith(prefix):
+                break
+            yield suggestion
+            index += 1
+
+
+def term_entries(name: str, vocabulary_uri: str, preferred_prefix: str = '') -> Iterator[tuple[str, Suggestion]]:
+    uri = vocabulary_uri + name
+    value = curie_codec.compact(uri)
+    suggestion = Suggestion(value=value, label=uri, kind='term')
+    yield uri, suggestion
+    yield name, suggestion
+    if value != uri:
+        yield value, suggestion
+    if preferred_prefix:
+        # the vocabulary's preferred prefix is not necessarily registered with
+        # the namespace manager, so it is only used as a search key; the value
+        # inserted into the form is still something the form can expand
+        yield f'{preferred_prefix}:{name}', suggestion
+
+
+def value_entries(value: str) -> Iterator[tuple[str, Suggestion]]:
+    curie = curie_codec.compact(value)
+    suggestion = Suggestion(value=curie, label=value, kind='value')
+    yield value, suggestion
+    if curie != value:
+        yield curie, suggestion
+
+
+class AutocompleteIndex:
+    """Suggests namespace prefixes, Grove term URIs, and values already used
+    with a predicate, from a single in-memory index.
+
+    The prefix and term indexes are built on first use and then kept up to
+    date incrementally from change events. The values for
+    each predicate are loaded on demand and discarded whenever a property
+    using that predicate changes."""
+
+    def __init__(self):
+        self._lock = RLock()
+        self._index: PrefixIndex | None = None
+        self._values: dict[int, PrefixIndex] = {}
+
+    def reset(self):
+        with self._lock:
+            self._index = None
+            self._values.clear()
+
+    @property
+    def is_built(self) -> bool:
+        return self._index is not None
+
+    def _build(self) -> PrefixIndex:
+        entries = []
+        for prefix, ns_uri in curie_codec.prefixes.items():
+            suggestion = Suggestion(value=f'{prefix}:', label=str(ns_uri), kind='prefix')
+            entries.append((f'{prefix}:', suggestion))
+            entries.append((str(ns_uri), suggestion))
+        terms = Term.objects.values_list('name', 'vocabulary__uri', 'vocabulary__preferred_prefix')
+        for name, vocabulary_uri, preferred_prefix in terms:
+            entries.extend(term_entries(name, vocabulary_uri, preferred_prefix))
+        index = PrefixIndex(entries)
+        logger.debug(f'Built autocomplete index with {len(index)} keys')
+        return index
+
+    def _build_values(self, predicate_id: int) -> PrefixIndex:
+        values = Property.objects.filter(
+            predicate_id=predicate_id,
+            predicate__object_type=Predicate.ObjectType.URI_REF,
+        ).values_list('value', flat=True)
+        return PrefixIndex(entry for value in values for entry in value_entries(value))
+
+    @property
+    def index(self) -> PrefixIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = self._build()
+            return self._index
+
+    def add_term(self, term: Term):
+        with self._lock:
+            if self._index is None:
+                return
+            vocab = term.vocabulary
+            for key, suggestion in term_entries(term.name, vocab.uri, vocab.preferred_prefix):
+                self._index.add(key, suggestion)
+
+    def remove_term(self, term: Term):
+        with self._lock:
+            if self._index is None:
+                return
+            vocab = term.vocabulary
+            for key, suggestion in term_entries(term.name, vocab.uri, vocab.preferred_prefix):
+                self._index.remove(key, suggestion)
+
+    def invalidate_values(self, predicate_id: int):
+        with self._lock:
+            self._values.pop(predicate_id, None)
+
+    def handle_change(self, event: ChangeEvent):
+        if event.model == 'Term' and event.instance is not None and event.change == ChangeType.CREATED:
+            self.add_term(event.instance)
+        elif event.model == 'Term' and event.instance is not None and event.change == ChangeType.SOFT_DELETED:
+            self.remove_term(event.instance)
+        elif event.model in ('Property', 'Predicate'):
+            self.invalidate_values(event.predicate_id)
+        else:
+            # renamed, restored, or deleted terms (whose previous names are
+            # not known here), changes to vocabulary URIs or prefixes (which
+            # change the keys of all their terms), and bulk changes
+            self.reset()
+
+    def suggest(self, query: str, predicate_id: int | None = None, limit: int = 10) -> list[Suggestion]:
+        """Returns up to `limit` suggestions for the given query. Values already
+        used with the given predicate are listed first, followed by terms and
+        then namespace prefixes."""
+        query = query.strip()
+        if not query:
+            return []
+
+        # keys are sorted, so bounding the number of candidates taken from each
+        # index keeps very short queries (e.g., "h") from scanning everything
+        max_candidates = limit * 10
+        with self._lock:
+            candidates = []
+            if predicate_id is not None:
+                if predicate_id not in self._values:
+                    self._values[predicate_id] = self._build_values(predicate_id)
+                candidates.extend(islice(self._values[predicate_id].search(query), max_candidates))
+            candidates.extend(islice(self.index.search(query), max_candidates))
+
+        order = {'value': 0, 'term': 1, 'prefix': 2}
+        suggestions = []
+        seen = set()
+        for suggestion in sorted(candidates, key=lambda s: (order[s.kind], len(s.value), s.value)):
+            if suggestion.value in seen:
+                continue
+            seen.add(suggestion.value)
+            suggestions.append(suggestion)
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+
+autocomplete_index = AutocompleteIndex()
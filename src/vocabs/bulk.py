@@ -0,0 +1,777 @@
+"""Set-based operations on the terms and properties of a vocabulary."""
+
+import csv
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from io import TextIOWrapper
+from typing import IO, Any, Iterable, NamedTuple, TextIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
+from django.forms import Form
+from plastron.namespaces import dc
+from rdflib import Graph, Literal, URIRef
+from rdflib.util import from_n3
+from safedelete.config import DELETED_VISIBLE
+
+from vocabs.datasets import find_namespaces, parse_members, read_members, route
+from vocabs.events import bulk_change, change_bus
+from vocabs.forms import PropertyForm, TermForm, clean_property_value
+from vocabs.models import ArchivedProperty, ArchivedTerm, GraphSource, GraphTriple, Predicate, Property, Term, \
+    Vocabulary, VocabularyImportError, predicate_registry, rdf_type_predicate, read_vocabulary, vocabulary_metadata
+from vocabs.namespaces import in_namespace_sql
+from vocabs.resolve import expand_predicates
+
+logger = logging.getLogger(__name__)
+
+
+class BatchError(Exception):
+    """Raised when one or more operations in a batch are invalid. Nothing in
+    the batch is applied."""
+
+    def __init__(self, errors: list[dict[str, Any]]):
+        self.errors = errors
+        super().__init__(f'{len(errors)} invalid operation(s)')
+
+
+def form_errors(form: Form) -> dict[str, list[str]]:
+    return {field: list(messages) for field, messages in form.errors.items()}
+
+
+def lookup(items: dict, key: Any) -> Any | None:
+    """Returns the item with the given key, or None if there is none or the
+    key is not a name or id (e.g., a list or object in a JSON request)."""
+    if not isinstance(key, (int, str)) or isinstance(key, bool):
+        return None
+    return items.get(key)
+
+
+def stamp(instances: Iterable[Term | Property], timestamp: datetime):
+    """Sets the "modified" timestamp of unsaved instances, and keeps
+    django-extensions from replacing it when they are saved."""
+    for instance in instances:
+        instance.modified = timestamp
+        instance.update_modified = False
+
+
+class Batch:
+    """A list of edit operations on a single vocabulary, validated with the
+    same forms used by the single-edit views, and applied in one transaction.
+
+    Each operation is a dict with an "op" key and operation-specific keys:
+
+    * `{"op": "add_term", "name": "...", "rdf_type": "rdfs:Class"}` (rdf_type is optional)
+    * `{"op": "delete_term", "term": "<name>"}`
+    * `{"op": "add_property", "term": "<name>", "predicate": "<CURIE or URI>", "value": "..."}`
+    * `{"op": "update_property", "id": <property id>, "value": "..."}`
+    * `{"op": "delete_property", "id": <property id>}`
+
+    Terms added earlier in the batch may be used by later "add_property"
+    operations. All rows written by the batch share a single "modified"
+    timestamp, so the vocabulary's "updated" timestamp changes exactly once."""
+
+    OPERATIONS = ('add_term', 'delete_term', 'add_property', 'update_property', 'delete_property')
+
+    def __init__(self, vocabulary: Vocabulary, operations: list[dict[str, Any]]):
+        self.vocabulary = vocabulary
+        self.operations = operations
+        self.errors: list[dict[str, Any]] = []
+        self.timestamp = datetime.now(timezone.utc)
+
+    def error(self, index: int, message: str | dict):
+        self.errors.append({
+            'index': index,
+            'op': self.operations[index].get('op') if isinstance(self.operations[index], dict) else None,
+            'errors': message if isinstance(message, dict) else {'__all__': [message]},
+        })
+
+    def by_op(self, *ops: str) -> Iterable[tuple[int, dict[str, Any]]]:
+        for index, operation in enumerate(self.operations):
+            if isinstance(operation, dict) and operation.get('op') in ops:
+                yield index, operation
+
+    def apply(self) -> Counter:
+        for index, operation in enumerate(self.operations):
+            if not isinstance(operation, dict) or operation.get('op') not in self.OPERATIONS:
+                self.error(index, f'"op" must be one of: {", ".join(self.OPERATIONS)}')
+        if self.errors:
+            raise BatchError(self.errors)
+
+        count = Counter()
+        with transaction.atomic():
+            # terms first, so that properties can be added to them
+            count['terms_added'] = self._add_terms()
+            terms = {term.name: term for term in self.vocabulary.terms.all()}
+            properties = {
+                prop.id: prop
+                for prop in Property.objects.filter(term__vocabulary=self.vocabulary).select_related('predicate')
+            }
+            count['properties_added'] = self._add_properties(terms)
+            count['properties_updated'] = self._update_properties(properties)
+            count['properties_deleted'] = self._delete_properties(properties)
+            count['terms_deleted'] = self._delete_terms(terms)
+            if self.errors:
+                raise BatchError(sorted(self.errors, key=lambda e: e['index']))
+            # bulk queries do not send model signals
+            change_bus.publish(bulk_change(self.vocabulary))
+
+        logger.info(f'Applied batch of {len(self.operations)} operation(s) to {self.vocabulary}: {dict(count)}')
+        return count
+
+    def _add_terms(self) -> int:
+        new_terms = []
+        rdf_types = []
+        # the form can't check the unique name constraint, since it is conditional
+        # on the "deleted" field, which is not part of the form
+        names = set(self.vocabulary.terms.values_list('name', flat=True))
+        for index, operation in self.by_op('add_term'):
+            form = TermForm({
+                'vocabulary': self.vocabulary.id,
+                'name': operation.get('name', ''),
+                'rdf_type': operation.get('rdf_type', ''),
+            })
+            if not form.is_valid():
+                self.error(index, form_errors(form))
+                continue
+            name = form.cleaned_data['name']
+            if name in names:
+                self.error(index, f'A term with the name "{name}" already exists in this vocabulary')
+                continue
+            names.add(name)
+            term = form.save(commit=False)
+            new_terms.append(term)
+            rdf_types.append(form.cleaned_data['rdf_type'])
+
+        if self.errors:
+            return 0
+
+        stamp(new_terms, self.timestamp)
+        Term.objects.bulk_create(new_terms)
+        type_properties = []
+        if any(rdf_types):
+            predicate = rdf_type_predicate()
+            type_properties = [
+                Property(term=term, predicate=predicate, value=str(from_n3(rdf_type)))
+                for term, rdf_type in zip(new_terms, rdf_types)
+                if rdf_type
+            ]
+        stamp(type_properties, self.timestamp)
+        Property.objects.bulk_create(type_properties)
+        return len(new_terms)
+
+    def _add_properties(self, terms: dict[str, Term]) -> int:
+        new_properties = []
+        for index, operation in self.by_op('add_property'):
+            term = lookup(terms, operation.get('term'))
+            if term is None:
+                self.error(index, {'term': [f'No term named "{operation.get("term")}" in this vocabulary']})
+                continue
+            predicate = predicate_registry.from_uri(expand_predicates([str(operation.get('predicate', ''))])[0])
+            if predicate is None:
+                self.error(index, {'predicate': [f'Unknown predicate "{operation.get("predicate")}"']})
+                continue
+            form = PropertyForm({'term': term.id, 'predicate': predicate.id, 'value': operation.get('value', '')})
+            if not form.is_valid():
+                self.error(index, form_errors(form))
+                continue
+            new_properties.append(form.save(commit=False))
+
+        stamp(new_properties, self.timestamp)
+        if not self.errors:
+            Property.objects.bulk_create(new_properties)
+        return len(new_properties)
+
+    def _update_properties(self, properties: dict[int, Property]) -> int:
+        updated = []
+        for index, operation in self.by_op('update_property'):
+            prop = lookup(properties, operation.get('id'))
+            if prop is None:
+                self.error(index, {'id': [f'No property with id {operation.get("id")} in this vocabulary']})
+                continue
+            form = PropertyForm(
+                {'term': prop.term_id, 'predicate': prop.predicate_id, 'value': operation.get('value', '')},
+                instance=prop,
+            )
+            if not form.is_valid():
+                self.error(index, form_errors(form))
+                continue
+            updated.append(form.save(commit=False))
+
+        stamp(updated, self.timestamp)
+        if not self.errors:
+            Property.objects.bulk_update(updated, ['value', 'modified'])
+        return len(updated)
+
+    def _delete_properties(self, properties: dict[int, Property]) -> int:
+        ids = set()
+        for index, operation in self.by_op('delete_property'):
+            if lookup(properties, operation.get('id')) is None:
+                self.error(index, {'id': [f'No property with id {operation.get("id")} in this vocabulary']})
+                continue
+            ids.add(operation['id'])
+
+        if self.errors:
+            return 0
+        return Property.objects.filter(id__in=ids).update(deleted=self.timestamp, modified=self.timestamp)
+
+    def _delete_terms(self, terms: dict[str, Term]) -> int:
+        ids = set()
+        for index, operation in self.by_op('delete_term'):
+            term = lookup(terms, operation.get('term'))
+            if term is None:
+                self.error(index, {'term': [f'No term named "{operation.get("term")}" in this vocabulary']})
+                continue
+            ids.add(term.id)
+
+        if self.errors:
+            return 0
+        return mark_terms_deleted(Term.objects.filter(id__in=ids), self.timestamp)['terms']
+
+
+class TermTable:
+    """New terms and their properties, read from a CSV or TSV file, and added
+    to a vocabulary with one bulk insert per table in a single transaction.
+
+    The header row has a "name" column for the term names, and a column for
+    each predicate, headed by its CURIE or full URI. A predicate may head
+    more than one column, to give a term several values for it. Empty cells
+    are skipped. Names are validated like those entered in the new term
+    form, and values like those entered in the property form.
+
+    If any row is invalid, nothing is added, and `load()` raises a
+    `BatchError` with the errors of each invalid row by line number."""
+
+    NAME_COLUMN = 'name'
+    BATCH_SIZE = 1000
+
+    def __init__(self, vocabulary: Vocabulary, file: TextIO, delimiter: str = ','):
+        self.vocabulary = vocabulary
+        self.file = file
+        self.delimiter = delimiter
+        self.errors: list[dict[str, Any]] = []
+        self.timestamp = datetime.now(timezone.utc)
+
+    @classmethod
+    def from_upload(cls, vocabulary: Vocabulary, upload: UploadedFile) -> 'TermTable':
+        """Reads a UTF-8 file, which is tab-separated if its name ends with
+        ".tsv" or it was sent as "text/tab-separated-values"."""
+        is_tsv = (upload.name or '').lower().endswith('.tsv') or upload.content_type == 'text/tab-separated-values'
+        return cls(
+            vocabulary=vocabulary,
+            file=TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''),
+            delimiter='\t' if is_tsv else ',',
+        )
+
+    def error(self, line: int, message: str | dict, name: str | None = None):
+        self.errors.append({
+            'line': line,
+            'name': name,
+            'errors': message if isinstance(message, dict) else {'__all__': [message]},
+        })
+
+    def read_header(self, header: list[str]) -> tuple[int, list[tuple[str, int, Predicate]]]:
+        """Returns the index of the name column, and the heading, index, and
+        predicate of each of the other columns."""
+        headings = [heading.strip() for heading in header]
+        if self.NAME_COLUMN not in headings:
+            self.error(1, f'No "{self.NAME_COLUMN}" column')
+            raise BatchError(self.errors)
+        name_index = headings.index(self.NAME_COLUMN)
+        columns = []
+        unknown = {}
+        for index, heading in enumerate(headings):
+            if index == name_index:
+                continue
+            predicate = predicate_registry.from_curie(heading.removeprefix('<').removesuffix('>'))
+            if predicate is None:
+                unknown[heading] = [f'Unknown predicate "{heading}"']
+                continue
+            columns.append((heading, index, predicate))
+        if unknown:
+            self.error(1, unknown)
+            raise BatchError(self.errors)
+        return name_index, columns
+
+    def read(self) -> list[tuple[Term, list[Property]]]:
+        """Validates every row, and returns the unsaved new terms and their
+        properties."""
+        reader = csv.reader(self.file, delimiter=self.delimiter)
+        try:
+            header = next(reader, None)
+            if header is None:
+                self.error(1, 'The file is empty')
+                raise BatchError(self.errors)
+            name_index, columns = self.read_header(header)
+
+            name_field = Term._meta.get_field('name')
+            value_field = Property._meta.get_field('value')
+            # the unique name constraint is conditional on the "deleted" field,
+            # so it is checked here instead of by validating each term
+            existing = set(self.vocabulary.terms.values_list('name', flat=True))
+            lines = {}
+            rows = []
+            for row in reader:
+                line = reader.line_num
+                if not any(cell.strip() for cell in row):
+                    continue
+                errors = {}
+                if len(row) > len(header):
+                    errors['__all__'] = [f'Expected {len(header)} columns, found {len(row)}']
+                name = row[name_index].strip() if name_index < len(row) else ''
+                try:
+                    name_field.clean(name, None)
+                except ValidationError as e:
+                    errors[self.NAME_COLUMN] = e.messages
+                else:
+                    if name in existing:
+                        errors[self.NAME_COLUMN] = [f'A term with the name "{name}" already exists in this vocabulary']
+                    elif name in lines:
+                        errors[self.NAME_COLUMN] = [f'The name "{name}" is also used on line {lines[name]}']
+                    lines.setdefault(name, line)
+
+                term = Term(vocabulary=self.vocabulary, name=name)
+                properties = []
+                for heading, index, predicate in columns:
+                    value = row[index].strip() if index < len(row) else ''
+                    if not value:
+                        continue
+                    try:
+                        value_field.run_validators(value)
+                        value = clean_property_value(predicate, value)
+                    except ValidationError as e:
+                        errors.setdefault(heading, []).extend(e.messages)
+                        continue
+                    properties.append(Property(term=term, predicate=predicate, value=value))
+
+                if errors:
+                    self.error(line, errors, name=name or None)
+                else:
+                    rows.append((term, properties))
+        except (csv.Error, UnicodeDecodeError) as e:
+            self.error(reader.line_num + 1, f'Unable to read the file: {e}')
+
+        if self.errors:
+            raise BatchError(self.errors)
+        return rows
+
+    def load(self) -> Counter:
+        rows = self.read()
+        terms = [term for term, _ in rows]
+        properties = [prop for _, term_properties in rows for prop in term_properties]
+        stamp(terms, self.timestamp)
+        stamp(properties, self.timestamp)
+        with transaction.atomic():
+            Term.objects.bulk_create(terms, batch_size=self.BATCH_SIZE)
+            Property.objects.bulk_create(properties, batch_size=self.BATCH_SIZE)
+            # bulk queries do not send model signals
+            change_bus.publish(bulk_change(self.vocabulary))
+
+        count = Counter({'new_terms': len(terms), 'new_properties': len(properties)})
+        logger.info(f'Loaded {len(rows)} row(s) into {self.vocabulary}: {dict(count)}')
+        return count
+
+
+def clone_vocabulary(
+    vocabulary: Vocabulary,
+    uri: str,
+    label: str | None = None,
+    rewrite_references: bool = True,
+) -> tuple[Vocabulary, Counter]:
+    """Copies the vocabulary's live terms and properties to a new vocabulary
+    with the given URI, with one INSERT ... SELECT statement per table, so
+    no rows pass through Python. With `rewrite_references`, URI values that
+    refer to the original vocabulary's namespace are changed to refer to
+    the new one.
+
+    The new vocabulary is unpublished, and all its rows share a single
+    "created" and "modified" timestamp."""
+    quote = connection.ops.quote_name
+    term_table = quote(Term._meta.db_table)
+    property_table = quote(Property._meta.db_table)
+    predicate_table = quote(Predicate._meta.db_table)
+    timestamp = datetime.now(timezone.utc)
+    count = Counter()
+
+    with transaction.atomic():
+        clone = Vocabulary.objects.create(
+            uri=uri,
+            label=label or vocabulary.label,
+            description=vocabulary.description,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {term_table} (created, modified, deleted, deleted_by_cascade, vocabulary_id, name) '
+                f'SELECT %s, %s, NULL, %s, %s, name FROM {term_table} WHERE vocabulary_id = %s AND deleted IS NULL',
+                [timestamp, timestamp, False, clone.id, vocabulary.id],
+            )
+            count['new_terms'] = cursor.rowcount
+
+            # properties of the original terms, and the terms they are copied to
+            source = (
+                f'FROM {property_table} p '
+                f'JOIN {term_table} t ON t.id = p.term_id '
+                f'JOIN {term_table} c ON c.vocabulary_id = %s AND c.name = t.name '
+                f'JOIN {predicate_table} pr ON pr.id = p.predicate_id '
+                f'WHERE t.vocabulary_id = %s AND t.deleted IS NULL AND p.deleted IS NULL'
+            )
+            source_params = [clone.id, vocabulary.id]
+            if rewrite_references:
+                condition, condition_params = in_namespace_sql('p.value', vocabulary.uri)
+                condition = f'pr.object_type = %s AND {condition}'
+                condition_params = [Predicate.ObjectType.URI_REF.value, *condition_params]
+                new_value = 'CAST(%s AS TEXT) || SUBSTR(p.value, %s)'
+                new_value_params = [uri, len(vocabulary.uri) + 1]
+                value = f'CASE WHEN {condition} THEN {new_value} ELSE p.value END'
+                value_params = [*condition_params, *new_value_params]
+            else:
+                value, value_params = 'p.value', []
+
+            cursor.execute(
+                f'INSERT INTO {property_table} '
+                f'(created, modified, deleted, deleted_by_cascade, term_id, predicate_id, value) '
+                f'SELECT %s, %s, NULL, %s, c.id, p.predicate_id, {value} {source}',
+                [timestamp, timestamp, False, *value_params, *source_params],
+            )
+            count['new_properties'] = cursor.rowcount
+
+        # bulk queries do not send model signals
+        change_bus.publish(bulk_change(clone))
+
+    logger.info(f'Cloned {vocabulary} to {clone}: {dict(count)}')
+    return clone, count
+
+
+def mark_terms_deleted(terms: QuerySet, timestamp: datetime, cascade: bool = False) -> Counter:
+    """Same effect as the SOFT_DELETE_CASCADE policy, but with one UPDATE
+    per table. Publishes no change events. Set `cascade` if the terms are
+    deleted along with their vocabulary."""
+    count = Counter()
+    count['properties'] = Property.objects.filter(term__in=terms).update(
+        deleted=timestamp,
+        deleted_by_cascade=True,
+        modified=timestamp,
+    )
+    count['terms'] = terms.update(deleted=timestamp, deleted_by_cascade=cascade, modified=timestamp)
+    return count
+
+
+def soft_delete_terms(terms: QuerySet) -> tuple[datetime, Counter]:
+    """Soft-deletes the terms and their properties in one transaction, with
+    one UPDATE per table. Returns the "deleted" timestamp, which identifies
+    the deletion batch for `restore_deleted()`, and the number of rows
+    deleted from each table."""
+    timestamp = datetime.now(timezone.utc)
+    with transaction.atomic():
+        vocabularies = list(Vocabulary.objects.filter(Exists(terms.filter(vocabulary=OuterRef('pk')))))
+        count = mark_terms_deleted(terms, timestamp)
+        Vocabulary.objects.filter(pk__in=[vocabulary.pk for vocabulary in vocabularies]).update(modified=timestamp)
+        if vocabularies:
+            # bulk queries do not send model signals
+            change_bus.publish(bulk_change(*vocabularies))
+    logger.info(f'Deleted {count["terms"]} term(s) and {count["properties"]} property(ies)')
+    return timestamp, count
+
+
+def soft_delete_vocabularies(vocabularies: QuerySet) -> tuple[datetime, Counter]:
+    """Soft-deletes the vocabularies, with all their terms and properties,
+    in one transaction, with one UPDATE per table. Returns the "deleted"
+    timestamp, which identifies the deletion batch for `restore_deleted()`,
+    and the number of rows deleted from each table."""
+    timestamp = datetime.now(timezone.utc)
+    with transaction.atomic():
+        vocabularies = list(vocabularies.select_for_update())
+        ids = [vocabulary.id for vocabulary in vocabularies]
+        count = mark_terms_deleted(Term.objects.filter(vocabulary_id__in=ids), timestamp, cascade=True)
+        count['vocabularies'] = Vocabulary.objects.filter(pk__in=ids).update(deleted=timestamp, modified=timestamp)
+        if vocabularies:
+            change_bus.publish(bulk_change(*vocabularies))
+    logger.info(
+        f'Deleted {count["vocabularies"]} vocabulary(ies), with {count["terms"]} term(s) '
+        f'and {count["properties"]} property(ies)'
+    )
+    return timestamp, count
+
+
+def deletion_batches(vocabulary: Vocabulary) -> list[dict[str, Any]]:
+    """Lists the times at which the vocabulary, or any of its terms and
+    properties, were deleted, with the number of rows deleted from each
+    table, latest first."""
+    batches: dict[datetime, Counter] = {}
+    if vocabulary.deleted is not None:
+        batches[vocabulary.deleted] = Counter(vocabulary=1)
+    for key, queryset in (
+        ('terms', Term.all_objects.filter(vocabulary=vocabulary)),
+        ('properties', Property.all_objects.filter(term__vocabulary=vocabulary)),
+    ):
+        for deleted, number in queryset.filter(deleted__isnull=False).values_list('deleted').annotate(Count('id')):
+            batches.setdefault(deleted, Counter())[key] = number
+    return [
+        {'batch': deleted.isoformat(), 'deleted': dict(count)}
+        for deleted, count in sorted(batches.items(), reverse=True)
+    ]
+
+
+def restore_deleted(vocabulary: Vocabulary, batch: datetime) -> Counter:
+    """Restores the vocabulary, terms, and properties that were deleted at
+    the given time (see `deletion_batches()`), with one UPDATE per table.
+
+    Raises ValueError if terms with the same names have been added since,
+    or if any of the rows have been moved to the archive tables (see
+    `vocabs.archive.compact()`)."""
+    with transaction.atomic():
+        vocabulary = Vocabulary.all_objects.select_for_update().get(pk=vocabulary.pk)
+        terms = Term.all_objects.all(force_visibility=DELETED_VISIBLE).filter(vocabulary=vocabulary, deleted=batch)
+        properties = Property.all_objects.all(force_visibility=DELETED_VISIBLE).filter(
+            term__vocabulary=vocabulary, deleted=batch,
+        )
+        restore_vocabulary = vocabulary.deleted == batch
+        conflicts = list(
+            Term.objects.filter(vocabulary=vocabulary, name__in=terms.values('name')).values_list('name', flat=True)
+        )
+        if conflicts:
+            raise ValueError(f'Terms with these names have been added since: {", ".join(sorted(conflicts))}')
+        archived_terms = ArchivedTerm.objects.filter(vocabulary_id=vocabulary.pk)
+        archived = archived_terms.filter(deleted=batch).exists() or ArchivedProperty.objects.filter(
+            Q(term_id__in=Term.all_objects.all(force_visibility=DELETED_VISIBLE).filter(vocabulary=vocabulary).values('id'))
+            | Q(term_id__in=archived_terms.values('id')),
+            deleted=batch,
+        ).exists()
+        if archived:
+            # restoring the rest would silently leave out the archived rows
+            raise ValueError('Some of the rows deleted at this time have been archived, so none can be restored')
+
+        timestamp = datetime.now(timezone.utc)
+        count = Counter()
+        count['properties'] = properties.update(deleted=None, deleted_by_cascade=False, modified=timestamp)
+        count['terms'] = terms.update(deleted=None, deleted_by_cascade=False, modified=timestamp)
+        vocabularies = Vocabulary.all_objects.all(force_visibility=DELETED_VISIBLE).filter(pk=vocabulary.pk)
+        if restore_vocabulary:
+            count['vocabularies'] = vocabularies.update(deleted=None, deleted_by_cascade=False, modified=timestamp)
+        else:
+            vocabularies.update(modified=timestamp)
+        change_bus.publish(bulk_change(vocabulary))
+    logger.info(f'Restored rows deleted from {vocabulary} at {batch.isoformat()}: {dict(count)}')
+    return count
+
+
+Statement = tuple[str, str, str, str]
+"""(term name, predicate URI, object type, value) of a property."""
+
+
+class VocabularyDiff(NamedTuple):
+    """Changes that make a vocabulary's live terms and properties match an
+    imported graph. The removed properties include those of removed terms."""
+
+    new_terms: list[str]
+    removed_terms: list[str]
+    new_properties: list[Statement]
+    removed_properties: list[Statement]
+
+    def count(self) -> Counter:
+        return Counter({key: len(value) for key, value in self._asdict().items()})
+
+    def __bool__(self):
+        return any(self)
+
+
+def live_statements(vocabulary: Vocabulary) -> dict[Statement, list[int]]:
+    """Returns the ids of the vocabulary's live properties, by statement.
+    There is usually one property per statement."""
+    statements = {}
+    rows = Property.objects.filter(term__vocabulary=vocabulary).values_list(
+        'id', 'term__name', 'predicate__uri', 'predicate__object_type', 'value',
+    )
+    for property_id, *statement in rows.iterator():
+        statements.setdefault(tuple(statement), []).append(property_id)
+    return statements
+
+
+def insert_statements(
+    vocabulary: Vocabulary,
+    term_ids: dict[str, int],
+    new_terms: Iterable[str],
+    new_properties: Iterable[Statement],
+    timestamp: datetime,
+):
+    """Adds the terms, and then the properties, with bulk inserts. The
+    properties may belong to the new terms, or to the existing ones in
+    `term_ids`, which is updated with the ids of the new terms."""
+    terms = [Term(vocabulary=vocabulary, name=name) for name in new_terms]
+    stamp(terms, timestamp)
+    Term.objects.bulk_create(terms, batch_size=TermTable.BATCH_SIZE)
+    term_ids.update((term.name, term.id) for term in terms)
+    properties = [
+        Property(
+            term_id=term_ids[name],
+            predicate=predicate_registry.get_or_create(predicate_uri, object_type),
+            value=value,
+        )
+        for name, predicate_uri, object_type, value in new_properties
+    ]
+    stamp(properties, timestamp)
+    Property.objects.bulk_create(properties, batch_size=TermTable.BATCH_SIZE)
+
+
+def sync_vocabulary(
+    file: GraphSource,
+    uri: str,
+    rdf_format: str,
+    dry_run: bool = False,
+) -> tuple[Vocabulary | None, bool, VocabularyDiff]:
+    """Makes the live terms and properties of the vocabulary with the given
+    URI the same as those in the file, creating the vocabulary if needed.
+    Unlike `import_vocabulary()`, this also removes the terms and properties
+    that are not in the file.
+
+    The changes are the set differences between the (term name, predicate,
+    value) statements in the file and in the vocabulary. They are applied
+    in one transaction, with bulk inserts, and bulk soft-deletes that share
+    a single "deleted" timestamp, so they can be undone with
+    `restore_deleted()`. With `dry_run`, returns the changes without
+    applying them (and None as the vocabulary, if it does not exist yet)."""
+    terms, metadata = read_vocabulary(file, uri, rdf_format)
+    wanted = {(name, *prop) for name, properties in terms.items() for prop in properties}
+
+    with transaction.atomic():
+        vocabulary = Vocabulary.objects.select_for_update().filter(uri=uri).first()
+        term_ids = dict(vocabulary.terms.values_list('name', 'id')) if vocabulary is not None else {}
+        existing = live_statements(vocabulary) if vocabulary is not None else {}
+        diff = VocabularyDiff(
+            new_terms=sorted(terms.keys() - term_ids.keys()),
+            removed_terms=sorted(term_ids.keys() - terms.keys()),
+            new_properties=sorted(wanted - existing.keys()),
+            removed_properties=sorted(existing.keys() - wanted),
+        )
+        is_new = vocabulary is None
+        if is_new:
+            deleted = Vocabulary.deleted_with_uri(uri)
+            if deleted is not None:
+                raise VocabularyImportError(deleted.deleted_message)
+        if dry_run or (not is_new and not diff):
+            return vocabulary, is_new, diff
+
+        if is_new:
+            vocabulary = Vocabulary.objects.create(uri=uri, **metadata)
+        timestamp = datetime.now(timezone.utc)
+
+        removed_term_ids = [term_ids[name] for name in diff.removed_terms]
+        # the properties of removed terms are removed along with them
+        removed_terms = set(diff.removed_terms)
+        removed_property_ids = [
+            property_id
+            for statement in diff.removed_properties if statement[0] not in removed_terms
+            for property_id in existing[statement]
+        ]
+        for start in range(0, len(removed_term_ids), TermTable.BATCH_SIZE):
+            mark_terms_deleted(
+                Term.objects.filter(id__in=removed_term_ids[start:start + TermTable.BATCH_SIZE]),
+                timestamp,
+            )
+        for start in range(0, len(removed_property_ids), TermTable.BATCH_SIZE):
+            Property.objects.filter(id__in=removed_property_ids[start:start + TermTable.BATCH_SIZE]).update(
+                deleted=timestamp,
+                modified=timestamp,
+            )
+
+        insert_statements(vocabulary, term_ids, diff.new_terms, diff.new_properties, timestamp)
+        if not is_new:
+            Vocabulary.objects.filter(pk=vocabulary.pk).update(modified=timestamp)
+        # bulk queries do not send model signals
+        change_bus.publish(bulk_change(vocabulary))
+
+    logger.info(f'Synced {vocabulary} with {file}: {dict(diff.count())}')
+    return vocabulary, is_new, diff
+
+
+def import_terms(vocabulary: Vocabulary, terms: dict[str, list[GraphTriple]]) -> Counter:
+    """Adds the terms and properties that the vocabulary does not have yet,
+    with bulk inserts, like `import_vocabulary()` does one at a time. Does
+    not publish a change event."""
+    term_ids = dict(vocabulary.terms.values_list('name', 'id'))
+    existing = live_statements(vocabulary)
+    new_properties = sorted(
+        {(name, *prop) for name, properties in terms.items() for prop in properties} - existing.keys()
+    )
+    new_terms = sorted(terms.keys() - term_ids.keys())
+    if new_terms or new_properties:
+        timestamp = datetime.now(timezone.utc)
+        insert_statements(vocabulary, term_ids, new_terms, new_properties, timestamp)
+        Vocabulary.objects.filter(pk=vocabulary.pk, modified__lt=timestamp).update(modified=timestamp)
+    return Counter({'new_terms': len(new_terms), 'new_properties': len(new_properties)})
+
+
+class DatasetReport(NamedTuple):
+    vocabularies: list[dict[str, Any]]
+    """URI, whether it was created, and the number of subjects, new terms,
+    and new properties, for each vocabulary."""
+    errors: list[dict[str, str]]
+    """Name and error message of each file that could not be parsed."""
+    unrouted: list[str]
+    """Subjects that are not in the namespace of any vocabulary."""
+
+
+def import_dataset(file: IO[bytes], name: str, workers: int | None = None) -> DatasetReport:
+    """Imports several vocabularies from a TriG or N-Quads dataset, a zip or
+    tar archive of RDF files, or a single RDF file, with the format of each
+    file guessed from its name. The files are parsed in up to `workers`
+    processes (`settings.IMPORT_WORKERS` by default).
+
+    Raises DatasetTooLarge, before anything is imported, if there are more
+    files than `settings.IMPORT_MAX_FILES`, or more uncompressed data than
+    `settings.IMPORT_MAX_SIZE` bytes.
+
+    Each subject goes to the vocabulary with the longest URI that it
+    starts with, among the existing vocabularies and the ones the files
+    declare (see `vocabs.datasets.find_namespaces`). As with
+    `import_vocabulary()`, terms and properties are only added, and new
+    vocabularies get their label, description, and prefix from the
+    statements about them. Each vocabulary is loaded in its own
+    transaction, with bulk inserts."""
+    workers = settings.IMPORT_WORKERS if workers is None else workers
+    members = read_members(file, name, max_members=settings.IMPORT_MAX_FILES, max_size=settings.IMPORT_MAX_SIZE)
+    parsed = list(parse_members(members, workers))
+    errors = [{'file': member.name, 'error': member.error} for member in parsed if member.error is not None]
+    # including deleted vocabularies, so their subjects are reported rather than unrouted
+    namespaces = find_namespaces(parsed) | set(Vocabulary.all_objects.values_list('uri', flat=True))
+    routed = route(parsed, namespaces)
+
+    report = []
+    changed = []
+    deleted = {
+        vocabulary.uri: vocabulary
+        for vocabulary in Vocabulary.all_objects.filter(uri__in=namespaces, deleted__isnull=False)
+    }
+    for uri in sorted(routed.terms.keys() | routed.metadata.keys()):
+        if uri in deleted:
+            errors.append({'file': name, 'error': deleted[uri].deleted_message})
+            continue
+        metadata = Graph()
+        for predicate, value, is_uri in routed.metadata.get(uri, []):
+            metadata.add((URIRef(uri), URIRef(predicate), URIRef(value) if is_uri else Literal(value)))
+        terms = {
+            term_name: [
+                (predicate, Predicate.ObjectType.URI_REF if is_uri else Predicate.ObjectType.LITERAL, value)
+                for predicate, value, is_uri in statements
+                if not (predicate == str(dc.identifier) and value == term_name)
+            ]
+            for term_name, statements in routed.terms.get(uri, {}).items()
+        }
+        with transaction.atomic():
+            vocabulary, is_new = Vocabulary.objects.get_or_create(uri=uri, defaults=vocabulary_metadata(metadata, uri))
+            count = import_terms(vocabulary, terms)
+        if is_new or count['new_terms'] or count['new_properties']:
+            changed.append(vocabulary)
+        report.append({'uri': uri, 'created': is_new, 'subjects': len(terms), **count})
+    if changed:
+        # bulk queries do not send model signals
+        change_bus.publish(bulk_change(*changed))
+
+    logger.info(
+        f'Imported {len(report)} vocabulary(ies) from {len(parsed)} file(s) in {name}, '
+        f'with {len(errors)} unreadable file(s) and {len(routed.unrouted)} subject(s) outside every vocabulary'
+    )
+    return DatasetReport(vocabularies=report, errors=errors, unrouted=sorted(routed.unrouted))
@@ -0,0 +1,101 @@
+"""Validators (ETag and Last-Modified) for the HTML views, so that
+conditional GET requests for unchanged pages can be answered with 304 Not
+Modified without running the main queries or rendering the page.
+
+A page's version is a tuple of the timestamps (and row counts, to catch
+hard deletes) of the data it shows, found with a few aggregate queries on
+indexed columns. The ETag also includes everything that differs per user in
+an otherwise identical page: the user, the CSRF token embedded in its forms,
+and whether it was requested by htmx. Pages with pending messages are never
+answered with 304, since showing them consumes the messages."""
+
+from datetime import datetime
+from hashlib import sha1
+from typing import Any
+
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.http import HttpRequest
+from django.utils.cache import patch_cache_control
+from django.views import View
+from django.views.decorators.http import condition
+
+from vocabs.models import Property, Term, Vocabulary, predicates_version
+
+Version = tuple[Any, ...]
+
+
+def vocabulary_version(pk: int) -> Version | None:
+    """Version of the vocabulary and all its terms and properties, including
+    deleted ones, or None if there is no such vocabulary."""
+    latest = Vocabulary.objects.filter(pk=pk).aggregate(
+        modified=Max('modified'),
+        term=Max('terms__modified'),
+        property=Max('terms__properties__modified'),
+    )
+    if latest['modified'] is None:
+        return None
+    return latest['modified'], latest['term'], latest['property']
+
+
+def data_version() -> Version:
+    """Version of all vocabularies, terms, properties, and predicates."""
+    vocabularies = Vocabulary.objects.aggregate(modified=Max('modified'), count=Count('id'))
+    return (
+        vocabularies['modified'],
+        vocabularies['count'],
+        Term.all_objects.aggregate(modified=Max('modified'))['modified'],
+        Property.all_objects.aggregate(modified=Max('modified'))['modified'],
+        *predicates_version(),
+    )
+
+
+def page_etag(request: HttpRequest, version: Version) -> str:
+    key = repr((
+        request.get_full_path(),
+        request.user.pk,
+        request.META.get('CSRF_COOKIE'),
+        bool(getattr(request, 'htmx', False)),
+        version,
+    ))
+    return sha1(key.encode()).hexdigest()
+
+
+def last_modified(request: HttpRequest, version: Version) -> datetime | None:
+    timestamps = [value for value in version if isinstance(value, datetime)]
+    if request.user.is_authenticated and request.user.last_login is not None:
+        # the same URL may have been fetched by another user in this browser
+        timestamps.append(request.user.last_login)
+    return max(timestamps, default=None)
+
+
+class ConditionalGetMixin(View):
+    """Answers GET and HEAD requests with 304 Not Modified if the client's
+    copy of the page is still current, according to `get_version()`.
+
+    Must come after LoginRequiredMixin in the list of base classes, so that
+    anonymous requests are redirected before any versions are looked up."""
+
+    def get_version(self) -> Version | None:
+        """Returns the version of the data shown on the page, or None to
+        always render it (e.g., if the object does not exist)."""
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)) > 0:
+            return super().dispatch(request, *args, **kwargs)
+        if request.META.get('CSRF_COOKIE') is None:
+            # rendering the page sets the CSRF cookie, which a 304 would not
+            return super().dispatch(request, *args, **kwargs)
+
+        version = self.get_version()
+        if version is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        response = condition(
+            etag_func=lambda *_args, **_kwargs: page_etag(request, version),
+            last_modified_func=lambda *_args, **_kwargs: last_modified(request, version),
+        )(super().dispatch)(request, *args, **kwargs)
+        # without this, browsers may reuse the page without asking first
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,109 @@
+"""Conversion between full URIs and CURIEs using the registered namespaces."""
+
+import re
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable
+
+from plastron.namespaces import namespace_manager
+from rdflib import URIRef
+from rdflib.namespace import NamespaceManager
+
+LOCAL_NAME = re.compile(r'\w[\w.%-]*')
+"""The local part of a CURIE. This is a little stricter than rdflib, which
+will also produce qnames whose local part is not valid in Turtle, such as
+"dc:a(b)"."""
+
+# key of the trie node entry that holds the namespace ending at that node;
+# all other keys are single characters
+END = ''
+
+
+class CurieCodec:
+    """Compacts URIs to CURIEs and expands CURIEs to URIs.
+
+    Namespaces are stored in a character trie, so finding the namespaces
+    that a URI starts with takes one step per character of the URI, instead
+    of one comparison per registered namespace. Results are memoized in a
+    bounded LRU cache. Both are rebuilt by `rebuild()`, which `bind()` calls;
+    call it directly after binding a prefix on the namespace manager in some
+    other way."""
+
+    def __init__(self, namespace_manager: NamespaceManager, cache_size: int = 4096):
+        self.namespace_manager = namespace_manager
+        self.cache_size = cache_size
+        self._lock = Lock()
+        self.rebuild()
+
+    def rebuild(self):
+        prefixes = {str(prefix): str(uri) for prefix, uri in self.namespace_manager.namespaces()}
+        trie: dict[str, Any] = {}
+        for uri in set(prefixes.values()):
+            node = trie
+            for char in uri:
+                node = node.setdefault(char, {})
+            # same prefix that rdflib would use if several are bound to this namespace
+            node[END] = (self.namespace_manager.store.prefix(URIRef(uri)), uri)
+        with self._lock:
+            self._prefixes = prefixes
+            self._trie = trie
+            # a fresh memo for the new namespaces
+            self._compact_memo: Callable[[str], str] = lru_cache(maxsize=self.cache_size)(self._compact)
+            self._expand_memo: Callable[[str], str] = lru_cache(maxsize=self.cache_size)(self._expand)
+
+    def bind(self, prefix: str, uri: str, **kwargs):
+        self.namespace_manager.bind(prefix, uri, **kwargs)
+        self.rebuild()
+
+    @property
+    def prefixes(self) -> dict[str, str]:
+        return dict(self._prefixes)
+
+    def namespaces_of(self, uri: str) -> list[tuple[str, str]]:
+        """Returns the (prefix, namespace URI) pairs of all the registered
+        namespaces that the URI starts with, longest first."""
+        matches = []
+        node = self._trie
+        for char in uri:
+            node = node.get(char)
+            if node is None:
+                break
+            if END in node:
+                matches.append(node[END])
+        matches.reverse()
+        return matches
+
+    def namespace_of(self, uri: str) -> tuple[str, str] | None:
+        """Returns the (prefix, namespace URI) pair of the longest registered
+        namespace that the URI starts with, or None."""
+        matches = self.namespaces_of(uri)
+        return matches[0] if matches else None
+
+    def _compact(self, uri: str) -> str:
+        for prefix, namespace in self.namespaces_of(uri):
+            local_name = uri[len(namespace):]
+            if LOCAL_NAME.fullmatch(local_name):
+                return f'{prefix}:{local_name}'
+        return uri
+
+    def _expand(self, value: str) -> str:
+        prefix, sep, local_name = value.partition(':')
+        if sep and prefix in self._prefixes:
+            return self._prefixes[prefix] + local_name
+        return value
+
+    def compact(self, uri: str) -> str:
+        """Returns the CURIE for the URI, or the URI itself if it is not in a
+        registered namespace."""
+        return self._compact_memo(str(uri))
+
+    def expand(self, value: str) -> str:
+        """Returns the full URI for the CURIE, or the value itself if it is
+        not a CURIE with a registered prefix (e.g., if it is a full URI)."""
+        return self._expand_memo(str(value))
+
+    def cache_info(self) -> dict[str, Any]:
+        return {'compact': self._compact_memo.cache_info(), 'expand': self._expand_memo.cache_info()}
+
+
+curie_codec = CurieCodec(namespace_manager)
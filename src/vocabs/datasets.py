@@ -0,0 +1,208 @@
+"""Reads the statements in RDF datasets (TriG, N-Quads) and in archives
+(zip, tar) of RDF files, and sorts them by vocabulary, so that several
+vocabularies can be imported at once (see `vocabs.bulk.import_dataset`).
+
+Nothing here uses Django, so the files can be parsed in worker processes."""
+
+import tarfile
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import PurePosixPath
+from typing import IO, NamedTuple
+from xml.sax import SAXParseException
+from zipfile import ZipFile
+
+from rdflib import Dataset, Graph, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.namespace import OWL, RDF, VANN
+from rdflib.plugin import PluginException
+from rdflib.util import guess_format
+
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+QUAD_FORMATS = ('trig', 'nquads')
+
+Quad = tuple[str | None, str, str, str, bool]
+"""(graph name, subject, predicate, value, whether the value is a URI) of a
+statement. The graph name is None for the default graph."""
+
+
+class DatasetTooLarge(ValueError):
+    """Raised when an upload has more files, or more uncompressed data, than
+    the limits allow."""
+
+
+class Member(NamedTuple):
+    """An uploaded file, or a file in an uploaded archive."""
+    name: str
+    data: bytes
+    rdf_format: str | None
+
+
+class ParsedMember(NamedTuple):
+    name: str
+    quads: list[Quad]
+    error: str | None = None
+
+
+class RoutedStatements(NamedTuple):
+    terms: dict[str, dict[str, dict[tuple[str, str, bool], None]]]
+    """(predicate, value, whether the value is a URI) of each statement about
+    a term, by term name, by vocabulary URI."""
+    metadata: dict[str, list[tuple[str, str, bool]]]
+    """(predicate, value, whether the value is a URI) of each statement about
+    a vocabulary itself, by vocabulary URI."""
+    unrouted: set[str]
+    """Subjects that are not in the namespace of any vocabulary."""
+
+
+def is_hidden(path: str) -> bool:
+    return any(part.startswith('.') or part == '__MACOSX' for part in PurePosixPath(path).parts)
+
+
+def read_members(
+    file: IO[bytes],
+    name: str,
+    max_members: int | None = None,
+    max_size: int | None = None,
+) -> Iterator[Member]:
+    """Yields the files in a zip or tar archive, or the file itself if it is
+    not an archive. The RDF format of each is guessed from its name.
+
+    Raises DatasetTooLarge as soon as there are more than `max_members`
+    files, or their total uncompressed size is more than `max_size` bytes,
+    so that an archive is never decompressed past the limits."""
+    count = 0
+    size = 0
+
+    def read(stream: IO[bytes], member_name: str) -> Member:
+        nonlocal count, size
+        count += 1
+        if max_members is not None and count > max_members:
+            raise DatasetTooLarge(f'More than {max_members} files in {name}')
+        data = stream.read(max_size - size + 1 if max_size is not None else -1)
+        size += len(data)
+        if max_size is not None and size > max_size:
+            raise DatasetTooLarge(f'More than {max_size} bytes of uncompressed data in {name}')
+        return Member(member_name, data, guess_format(member_name))
+
+    lowercase_name = name.lower()
+    if lowercase_name.endswith('.zip'):
+        with ZipFile(file) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and not is_hidden(info.filename):
+                    with archive.open(info) as stream:
+                        yield read(stream, info.filename)
+    elif lowercase_name.endswith(TAR_SUFFIXES):
+        with tarfile.open(fileobj=file) as archive:
+            for info in archive:
+                if info.isfile() and not is_hidden(info.name):
+                    yield read(archive.extractfile(info), info.name)
+    else:
+        yield read(file, name)
+
+
+def graph_name(identifier: URIRef | None) -> str | None:
+    return str(identifier) if identifier not in (None, DATASET_DEFAULT_GRAPH_ID) else None
+
+
+def parse_member(member: Member) -> ParsedMember:
+    """Returns the statements in the file with URI subjects, or the reason
+    it could not be parsed."""
+    if member.rdf_format is None:
+        return ParsedMember(member.name, [], 'Unknown RDF format')
+    try:
+        if member.rdf_format in QUAD_FORMATS:
+            dataset = Dataset()
+            dataset.parse(data=member.data, format=member.rdf_format)
+            quads = dataset.quads()
+        else:
+            graph = Graph()
+            graph.parse(data=member.data, format=member.rdf_format)
+            quads = ((s, p, o, None) for s, p, o in graph)
+        return ParsedMember(member.name, [
+            (graph_name(g), str(s), str(p), str(o), isinstance(o, URIRef))
+            for s, p, o, g in quads
+            if isinstance(s, URIRef)
+        ])
+    except (ValueError, SyntaxError, SAXParseException, PluginException) as e:
+        return ParsedMember(member.name, [], f'{e.__class__.__name__}: {e}')
+
+
+def parse_members(members: Iterable[Member], workers: int = 0) -> Iterator[ParsedMember]:
+    """Parses the files, in order, in up to `workers` processes at a time,
+    or in this process if `workers` is 0 or 1. Files are only read from
+    `members` as workers become free, so no more than two per worker are
+    waiting to be parsed at any time."""
+    if workers <= 1:
+        yield from map(parse_member, members)
+        return
+    # "spawn" rather than "fork", so the workers do not inherit (and close)
+    # this process's database connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+        pending = deque()
+        try:
+            for member in members:
+                pending.append(executor.submit(parse_member, member))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        except BaseException:
+            # e.g., the upload is too large, or the caller stopped early
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
+def is_namespace(uri: str | None) -> bool:
+    return uri is not None and uri.endswith(('/', '#'))
+
+
+def find_namespaces(parsed: Iterable[ParsedMember]) -> set[str]:
+    """Returns the vocabulary URIs that the files declare: the names of the
+    named graphs, the subjects with a preferred namespace prefix or of type
+    "owl:Ontology", and the values of "vann:preferredNamespaceUri"."""
+    namespaces = set()
+    prefix_predicate = str(VANN.preferredNamespacePrefix)
+    uri_predicate = str(VANN.preferredNamespaceUri)
+    for member in parsed:
+        for graph_name, subject, predicate, value, _ in member.quads:
+            namespaces.add(graph_name)
+            if predicate == prefix_predicate or (predicate == str(RDF.type) and value == str(OWL.Ontology)):
+                namespaces.add(subject)
+            elif predicate == uri_predicate:
+                namespaces.add(value)
+    return {uri for uri in namespaces if is_namespace(uri)}
+
+
+def namespace_of(uri: str, namespaces: set[str]) -> str | None:
+    """Returns the longest of the namespaces that the URI starts with, so
+    that terms of nested vocabularies go to the nested vocabulary."""
+    end = len(uri)
+    while end > 0:
+        end = max(uri.rfind('/', 0, end), uri.rfind('#', 0, end))
+        if end < 0:
+            return None
+        if uri[:end + 1] in namespaces:
+            return uri[:end + 1]
+    return None
+
+
+def route(parsed: Iterable[ParsedMember], namespaces: set[str]) -> RoutedStatements:
+    """Sorts the statements by the vocabulary namespace their subject is in.
+    Repeated statements, including the same statement in different files
+    or graphs, are kept once."""
+    routed = RoutedStatements(terms={}, metadata={}, unrouted=set())
+    for member in parsed:
+        for _, subject, predicate, value, is_uri in member.quads:
+            if subject in namespaces:
+                routed.metadata.setdefault(subject, []).append((predicate, value, is_uri))
+                continue
+            namespace = namespace_of(subject, namespaces)
+            if namespace is None:
+                routed.unrouted.add(subject)
+                continue
+            name = subject[len(namespace):]
+            routed.terms.setdefault(namespace, {}).setdefault(name, {})[(predicate, value, is_uri)] = None
+    return routed
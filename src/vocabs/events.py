@@ -0,0 +1,434 @@
+"""Change notifications for the in-memory caches and indexes.
+
+Every save, soft delete, and restore of a Vocabulary, Term, Property, or
+Predicate, and every delete of a Vocabulary or Predicate, is turned into a
+ChangeEvent that names the vocabularies it affects. The event is passed to
+each listener registered with the change bus once the transaction commits.
+Listeners are objects with a `handle_change(event)` method, such as the
+autocomplete index or the graph cache.
+
+Deleting a vocabulary sends a single event that also stands for its terms
+and properties, so that Django can delete those rows without loading them.
+
+Events are also sent through a channel, so that the caches in other server
+processes can be invalidated too. The CHANGE_BUS_CHANNEL setting selects
+the channel:
+
+* "db": events are stored as ChangeNotice rows
+* "file": events are appended to the file named by CHANGE_BUS_FILE (all
+  processes must be on the same host)
+* "none": events stay in this process
+
+The events of a transaction are sent when it commits, coalesced into a
+single event (see `coalesce()`), so that a transaction that changes many
+rows only writes once to the channel.
+
+Other processes pick up the events from the channel at the start of a
+request, at most once every CHANGE_BUS_SYNC_INTERVAL seconds (see
+vocabs.middleware)."""
+
+import fcntl
+import json
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from threading import Lock, local
+from time import monotonic
+from typing import Any, NamedTuple, Protocol
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Model, Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from safedelete.signals import post_undelete
+
+from vocabs.models import ChangeNotice, Predicate, Property, Term, Vocabulary
+
+logger = logging.getLogger(__name__)
+
+ChangeType = ChangeNotice.ChangeType
+
+ALL_MODELS = '*'
+"""Model name for an event that may have changed anything, e.g., when some
+notifications from other processes were missed."""
+
+
+class ChangeEvent(NamedTuple):
+    model: str
+    """Name of the changed model class."""
+    change: ChangeType
+    object_id: int
+    vocabulary_ids: frozenset[int] | None
+    """The vocabularies affected by the change, or None for all of them."""
+    term_id: int | None = None
+    """For terms and properties, the id of the (property's) term."""
+    predicate_id: int | None = None
+    """For properties and predicates, the id of the predicate."""
+    instance: Model | None = None
+    """The changed model instance. Only present for changes made in this
+    process through the ORM, not for bulk changes or changes made in other
+    processes."""
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'model': self.model,
+            'change': str(self.change),
+            'object_id': self.object_id,
+            'vocabulary_ids': sorted(self.vocabulary_ids) if self.vocabulary_ids is not None else None,
+            'term_id': self.term_id,
+            'predicate_id': self.predicate_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ChangeEvent':
+        vocabulary_ids = data.get('vocabulary_ids')
+        return cls(
+            model=data['model'],
+            change=ChangeType(data['change']),
+            object_id=data['object_id'],
+            vocabulary_ids=frozenset(vocabulary_ids) if vocabulary_ids is not None else None,
+            term_id=data.get('term_id'),
+            predicate_id=data.get('predicate_id'),
+        )
+
+
+def everything_changed() -> ChangeEvent:
+    return ChangeEvent(model=ALL_MODELS, change=ChangeType.UPDATED, object_id=0, vocabulary_ids=None)
+
+
+def bulk_change(vocabulary: Vocabulary, *others: Vocabulary) -> ChangeEvent:
+    """Event for changes made to the terms and properties of one or more
+    vocabularies with bulk queries, which do not send model signals."""
+    return ChangeEvent(
+        model=Vocabulary.__name__,
+        change=ChangeType.UPDATED,
+        object_id=vocabulary.id,
+        vocabulary_ids=frozenset(v.id for v in (vocabulary, *others)),
+    )
+
+
+def predicates_changed() -> ChangeEvent:
+    """Event for predicates added with bulk queries, which do not send model
+    signals."""
+    return ChangeEvent(model=Predicate.__name__, change=ChangeType.CREATED, object_id=0, vocabulary_ids=None)
+
+
+def coalesce(events: list[ChangeEvent]) -> ChangeEvent:
+    """Returns a single event that covers all the given events: the last
+    one, if they are all about the same object, or else an update of all
+    the vocabularies they affect."""
+    last = events[-1]
+    if all((event.model, event.object_id) == (last.model, last.object_id) for event in events):
+        return last._replace(instance=None)
+    if any(event.vocabulary_ids is None for event in events):
+        return everything_changed()
+    vocabulary_ids = frozenset().union(*(event.vocabulary_ids for event in events))
+    return ChangeEvent(
+        model=Vocabulary.__name__,
+        change=ChangeType.UPDATED,
+        object_id=min(vocabulary_ids),
+        vocabulary_ids=vocabulary_ids,
+    )
+
+
+class ChangeListener(Protocol):
+    def handle_change(self, event: ChangeEvent): ...
+
+
+class Channel:
+    """Carries events between processes. This base class carries nothing."""
+
+    def send(self, origin: str, event: ChangeEvent):
+        pass
+
+    def receive(self, origin: str) -> list[ChangeEvent]:
+        """Returns the events sent by other origins since the last call. The
+        first call only establishes the starting point."""
+        return []
+
+
+class TransactionChannel(Channel):
+    """Holds back the events sent during a transaction, and writes them as
+    one event once it commits. The events of a transaction that is rolled
+    back are dropped; outside of a transaction, events are written at once."""
+
+    def __init__(self):
+        # each thread has its own connection, and so its own transaction
+        self._local = local()
+
+    def send(self, origin: str, event: ChangeEvent):
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            self.write(origin, event)
+            return
+        # the outermost atomic block stands for the transaction
+        outermost = connection.atomic_blocks[0]
+        if getattr(self._local, 'transaction', None) is not outermost:
+            self._local.transaction = outermost
+            self._local.pending = []
+        pending = self._local.pending
+        pending.append(event)
+        # one callback per event, since those added in a savepoint that is
+        # rolled back are dropped; the first one to run writes all the events
+        transaction.on_commit(partial(self._flush, origin, pending))
+
+    def _flush(self, origin: str, pending: list[ChangeEvent]):
+        if pending:
+            event = coalesce(pending)
+            pending.clear()
+            self.write(origin, event)
+
+    def write(self, origin: str, event: ChangeEvent):
+        raise NotImplementedError
+
+
+class DatabaseChannel(TransactionChannel):
+    """Events are stored in the ChangeNotice table.
+
+    Rows are read by increasing id, but ids are assigned before commit, so a
+    row may become visible after rows with higher ids. To catch those, rows
+    created within the last COMMIT_WINDOW are read again, and skipped if
+    they were already seen. Rows older than CHANGE_BUS_RETENTION are
+    deleted; a process that has not synced for that long discards all of
+    its cached data instead."""
+
+    COMMIT_WINDOW = timedelta(seconds=30)
+    PRUNE_INTERVAL = timedelta(hours=1)
+
+    def __init__(self):
+        super().__init__()
+        self._last_id: int | None = None
+        self._last_sync: datetime | None = None
+        self._last_prune: datetime | None = None
+        self._recent: dict[int, datetime] = {}
+
+    def write(self, origin: str, event: ChangeEvent):
+        ChangeNotice.objects.create(
+            origin=origin,
+            model=event.model,
+            change=event.change,
+            object_id=event.object_id,
+            term_id=event.term_id,
+            predicate_id=event.predicate_id,
+            vocabulary_ids=event.as_dict()['vocabulary_ids'],
+        )
+
+    def receive(self, origin: str) -> list[ChangeEvent]:
+        now = timezone.now()
+        retention = timedelta(seconds=settings.CHANGE_BUS_RETENTION)
+        if self._last_prune is None or now - self._last_prune > self.PRUNE_INTERVAL:
+            ChangeNotice.objects.filter(created__lt=now - retention).delete()
+            self._last_prune = now
+
+        window_start = now - self.COMMIT_WINDOW
+        if self._last_id is None or now - self._last_sync > retention:
+            missed = self._last_id is not None
+            self._last_id = ChangeNotice.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+            self._last_sync = now
+            self._recent = dict(ChangeNotice.objects.filter(created__gte=window_start).values_list('id', 'created'))
+            return [everything_changed()] if missed else []
+
+        notices = ChangeNotice.objects.filter(
+            Q(id__gt=self._last_id) | Q(created__gte=window_start)
+        ).exclude(origin=origin).order_by('id')
+        events = []
+        for notice in notices:
+            if notice.id in self._recent:
+                continue
+            self._recent[notice.id] = notice.created
+            self._last_id = max(self._last_id, notice.id)
+            events.append(ChangeEvent.from_dict({
+                'model': notice.model,
+                'change': notice.change,
+                'object_id': notice.object_id,
+                'vocabulary_ids': notice.vocabulary_ids,
+                'term_id': notice.term_id,
+                'predicate_id': notice.predicate_id,
+            }))
+        self._recent = {pk: created for pk, created in self._recent.items() if created >= window_start}
+        self._last_sync = now
+        return events
+
+
+class FileChannel(TransactionChannel):
+    """Events are appended to a shared file as JSON lines.
+
+    Each process remembers how far into the file it has read. The file is
+    emptied when it grows past MAX_SIZE; a process that finds the file
+    shorter than where it left off may have missed events, and discards all
+    of its cached data."""
+
+    MAX_SIZE = 1024 * 1024
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = path
+        self._offset: int | None = None
+
+    def write(self, origin: str, event: ChangeEvent):
+        data = (json.dumps({'origin': origin, **event.as_dict()}) + '\n').encode()
+        with self.path.open('ab') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                if fh.tell() > self.MAX_SIZE:
+                    fh.truncate(0)
+                fh.write(data)
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def receive(self, origin: str) -> list[ChangeEvent]:
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if self._offset is None:
+            self._offset = size
+            return []
+
+        events = []
+        if size < self._offset:
+            events.append(everything_changed())
+            self._offset = 0
+        if size == self._offset:
+            return events
+
+        with self.path.open('rb') as fh:
+            fh.seek(self._offset)
+            data = fh.read(size - self._offset)
+        # a line may still be in the middle of being written
+        complete = data[:data.rfind(b'\n') + 1]
+        self._offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.warning(f'Skipping unreadable line in {self.path}')
+                continue
+            if message.get('origin') != origin:
+                events.append(ChangeEvent.from_dict(message))
+        return events
+
+
+CHANNELS = {
+    'none': Channel,
+    'db': DatabaseChannel,
+    'file': lambda: FileChannel(Path(settings.CHANGE_BUS_FILE)),
+}
+
+
+class ChangeBus:
+    def __init__(self):
+        self.origin = uuid4().hex
+        self._listeners: list[ChangeListener] = []
+        self._channel: Channel | None = None
+        self._sync_lock = Lock()
+        self._last_sync: float | None = None
+
+    def register(self, *listeners: ChangeListener):
+        for listener in listeners:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def unregister(self, listener: ChangeListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @property
+    def channel(self) -> Channel:
+        if self._channel is None:
+            self._channel = CHANNELS[settings.CHANGE_BUS_CHANNEL]()
+        return self._channel
+
+    def dispatch(self, event: ChangeEvent):
+        for listener in self._listeners:
+            try:
+                listener.handle_change(event)
+            except Exception as e:
+                # a failing cache must not make the change itself fail
+                logger.exception(f'Error handling {event.model} {event.change} event in {listener}: {e}')
+
+    def publish(self, event: ChangeEvent):
+        """Passes the event to the listeners in this process, and sends it to
+        the other processes, once the current transaction (if any) commits.
+        Nothing is passed on for a transaction that is rolled back."""
+        transaction.on_commit(partial(self.dispatch, event))
+        self.channel.send(self.origin, event)
+
+    def sync(self, interval: float = 0):
+        """Passes the events sent by other processes since the last sync to
+        the listeners in this process. Does nothing if the last sync was less
+        than `interval` seconds ago."""
+        if self._last_sync is not None and monotonic() - self._last_sync < interval:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            # another thread is already syncing
+            return
+        try:
+            events = self.channel.receive(self.origin)
+            self._last_sync = monotonic()
+        finally:
+            self._sync_lock.release()
+        for event in events:
+            self.dispatch(event)
+
+
+change_bus = ChangeBus()
+
+
+def model_event(instance: Model, change: ChangeType) -> ChangeEvent:
+    model = type(instance).__name__
+    if isinstance(instance, Vocabulary):
+        return ChangeEvent(model, change, instance.id, frozenset([instance.id]), instance=instance)
+    if isinstance(instance, Term):
+        return ChangeEvent(
+            model, change, instance.id, frozenset([instance.vocabulary_id]),
+            term_id=instance.id,
+            instance=instance,
+        )
+    if isinstance(instance, Property):
+        # the term is loaded along with the property by the views, or set
+        # on it by whatever created it, so this does not need a query
+        return ChangeEvent(
+            model, change, instance.id, frozenset([instance.term.vocabulary_id]),
+            term_id=instance.term_id,
+            predicate_id=instance.predicate_id,
+            instance=instance,
+        )
+    # a predicate may be used in any vocabulary
+    return ChangeEvent(model, change, instance.id, None, predicate_id=instance.id, instance=instance)
+
+
+@receiver(post_save, sender=Vocabulary)
+@receiver(post_save, sender=Term)
+@receiver(post_save, sender=Property)
+@receiver(post_save, sender=Predicate)
+def model_saved(sender, instance: Model, created: bool, **kwargs):
+    if created:
+        change = ChangeType.CREATED
+    elif getattr(instance, 'deleted', None) is not None:
+        # safedelete soft-deletes by saving, including when it cascades
+        # from a term to its properties
+        change = ChangeType.SOFT_DELETED
+    else:
+        change = ChangeType.UPDATED
+    change_bus.publish(model_event(instance, change))
+
+
+@receiver(post_undelete, sender=Term)
+@receiver(post_undelete, sender=Property)
+def model_restored(sender, instance: Model, **kwargs):
+    # restoring is also a save, so this follows an "updated" event
+    change_bus.publish(model_event(instance, ChangeType.RESTORED))
+
+
+@receiver(post_delete, sender=Predicate)
+def predicate_deleted(sender, instance: Predicate, **kwargs):
+    change_bus.publish(model_event(instance, ChangeType.DELETED))
+
+
+@receiver(pre_delete, sender=Vocabulary)
+def vocabulary_deleted(sender, instance: Vocabulary, **kwargs):
+    # sent before the delete cascades to the terms and properties, which
+    # have no delete receivers of their own, so they are deleted in bulk
+    change_bus.publish(model_event(instance, ChangeType.DELETED))
@@ -1,9 +1,14 @@
 from django.core.exceptions import ValidationError
-from django.forms import CharField, Form, HiddenInput, ModelForm, TextInput, Textarea, FileField, ChoiceField
-from plastron.namespaces import namespace_manager
-from rdflib.util import from_n3
+from django.core.validators import EMPTY_VALUES
+from django.forms import BooleanField, CharField, Form, HiddenInput, ModelForm, TextInput, Textarea, FileField, \
+    ChoiceField, ModelChoiceField
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse
 
-from vocabs.models import Predicate, Property, Vocabulary, VocabularyURIValidator, VOCAB_FORMAT_LABELS, Term
+from vocabs.curies import curie_codec
+from vocabs.models import Predicate, Property, Vocabulary, VocabularyURIValidator, VOCAB_FORMAT_LABELS, Term, \
+    TermNameValidator, predicate_registry
+from vocabs.uploads import AUTO_FORMAT
 
 
 class NewVocabularyForm(Form):
@@ -43,6 +48,21 @@ def _is_valid_uri(uri: str) -> bool:
     return True
 
 
+def clean_property_value(predicate: Predicate, value: str) -> str:
+    """If the predicate takes URIRef values, and the value comes in as a CURIE,
+    use the namespace manager to expand it to a full URI."""
+    if predicate.object_type == Predicate.ObjectType.URI_REF:
+        # ensure only valid URI characters in the value
+        if not _is_valid_uri(value):
+            raise ValidationError(f'{predicate} expects a URI or CURIE')
+        # values that look like CURIEs, but don't have a known prefix
+        # (e.g., "http://example.com" or "urn:foo" or "mailto:jdoe@example.org"),
+        # are returned unchanged
+        return curie_codec.expand(value)
+
+    return value
+
+
 class TermForm(ModelForm):
     class Meta:
         model = Term
@@ -59,34 +79,70 @@ class TermForm(ModelForm):
     )
 
 
+class PredicateChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield '', self.field.empty_label
+        for predicate in predicate_registry.all():
+            yield self.choice(predicate)
+
+    def __len__(self):
+        return len(predicate_registry.all()) + (self.field.empty_label is not None)
+
+
+class PredicateChoiceField(ModelChoiceField):
+    """Choice of predicate that is looked up in the predicate registry,
+    instead of with a query."""
+
+    iterator = PredicateChoiceIterator
+
+    def to_python(self, value):
+        if value in EMPTY_VALUES:
+            return None
+        if isinstance(value, Predicate):
+            value = value.pk
+        try:
+            predicate = predicate_registry.get(int(value))
+        except (TypeError, ValueError):
+            predicate = None
+        if predicate is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        return predicate
+
+
 class PropertyForm(ModelForm):
     class Meta:
         model = Property
         fields = ['term', 'predicate', 'value']
+        field_classes = {'predicate': PredicateChoiceField}
         widgets = {
             'term': HiddenInput(),
             'value': TextInput(attrs={'autofocus': True, 'size': 40}),
         }
 
-    def clean_value(self):
-        """If the predicate takes URIRef values, and the value comes in as a CURIE,
-        use the namespace manager to expand it to a full URI."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        predicate = self.initial.get('predicate')
+        term = self.initial.get('term')
+        if isinstance(predicate, Predicate) and predicate.object_type == Predicate.ObjectType.URI_REF:
+            # fetch suggestions into the datalist that follows the value field
+            self.fields['value'].widget.attrs.update({
+                'list': f'value-suggestions-{getattr(term, "pk", "new")}-{predicate.pk}',
+                'autocomplete': 'off',
+                'hx-get': reverse('autocomplete'),
+                'hx-trigger': 'input changed delay:200ms',
+                'hx-include': 'closest form',
+                'hx-target': 'next datalist',
+                'hx-swap': 'innerHTML',
+            })
 
-        predicate = self.cleaned_data['predicate']
+    def clean_value(self):
+        predicate = self.cleaned_data.get('predicate')
         value = self.cleaned_data['value']
-        if predicate.object_type == Predicate.ObjectType.URI_REF:
-            # ensure only valid URI characters in the value
-            if not _is_valid_uri(value):
-                raise ValidationError(f'{predicate} expects a URI or CURIE')
-            try:
-                return str(from_n3(value, nsm=namespace_manager))
-            except KeyError:
-                # something looked like a CURIE, but we don't have a namespace for it
-                # (e.g., "http://example.com" or "urn:foo" or "mailto:jdoe@example.org"),
-                # so just return the full value
-                return value
-
-        return value
+        if predicate is None:
+            # already reported as an invalid choice
+            return value
+        return clean_property_value(predicate, value)
 
 
 class ImportForm(Form):
@@ -95,6 +151,68 @@ class ImportForm(Form):
         widget=TextInput(attrs={'size': 40}),
         validators=[VocabularyURIValidator()],
     )
-    file = FileField()
-    rdf_format = ChoiceField(choices=VOCAB_FORMAT_LABELS, label='RDF Format')
+    file = FileField(help_text='May be compressed with gzip or bzip2')
+    rdf_format = ChoiceField(
+        choices={AUTO_FORMAT: 'Detect automatically', **VOCAB_FORMAT_LABELS},
+        initial=AUTO_FORMAT,
+        label='RDF Format',
+    )
+    sync = BooleanField(
+        label='Sync',
+        help_text='Also remove the terms and properties that are not in the file',
+        required=False,
+    )
+    preview = BooleanField(
+        label='Preview',
+        help_text='Only list the changes a sync would make',
+        required=False,
+    )
+    template_name = 'vocabs/dl_form.html'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('preview'):
+            cleaned_data['sync'] = True
+        return cleaned_data
+
+
+class DatasetImportForm(Form):
+    file = FileField(
+        help_text='TriG or N-Quads file with a named graph per vocabulary, or a zip or tar archive of RDF files',
+    )
+    template_name = 'vocabs/dl_form.html'
+
+
+class TermUploadForm(Form):
+    file = FileField(help_text='CSV or TSV file with a "name" column, and a column for each predicate')
+
+
+class TermRenameForm(Form):
+    name = CharField(
+        max_length=256,
+        validators=[TermNameValidator()],
+        widget=TextInput(attrs={'placeholder': 'New name'}),
+    )
+
+
+class CloneForm(Form):
+    uri = CharField(
+        label='New URI',
+        widget=TextInput(attrs={'size': 40}),
+        validators=[VocabularyURIValidator()],
+    )
+    label = CharField(max_length=256, widget=TextInput(attrs={'size': 40}))
+    rewrite_references = BooleanField(
+        label='Rewrite references',
+        help_text='Change values that refer to terms of this vocabulary to refer to the new one',
+        required=False,
+        initial=True,
+    )
     template_name = 'vocabs/dl_form.html'
+
+    def clean_uri(self):
+        uri = self.cleaned_data['uri']
+        # including deleted vocabularies, which keep their URIs
+        if Vocabulary.all_objects.filter(uri=uri).exists():
+            raise ValidationError(f'There is already a vocabulary with the URI "{uri}"')
+        return uri
@@ -0,0 +1,140 @@
+"""Process-wide cache of rendered HTML fragments."""
+
+import logging
+from collections import OrderedDict
+from collections.abc import Iterable
+from threading import Lock
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString
+
+if TYPE_CHECKING:
+    from vocabs.events import ChangeEvent
+    from vocabs.models import Predicate, Term
+
+logger = logging.getLogger(__name__)
+
+
+class CachedRow(NamedTuple):
+    version: tuple
+    html: SafeString
+
+
+class TermRowCache:
+    """Least-recently-used cache of the "vocabs/term.html" table rows.
+
+    Each row is stored by term id along with a version made up of the term's
+    "modified" timestamp, the vocabulary URI, the ids and "modified"
+    timestamps of the term's properties, and the URIs and object types of all
+    predicates (which appear in the row's "Add a property" menu). A cached
+    row is only used if none of those have changed since it was rendered, so
+    changes made by other processes are noticed even before their change
+    events arrive."""
+
+    template_name = 'vocabs/term.html'
+
+    def __init__(self, max_size: int | None = None):
+        self._lock = Lock()
+        self._max_size = max_size
+        self._rows: OrderedDict[int, CachedRow] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size if self._max_size is not None else settings.TERM_ROW_CACHE_SIZE
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, term_id: int) -> bool:
+        return term_id in self._rows
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'rows': len(self._rows),
+            'max_rows': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
+
+    @staticmethod
+    def predicates_version(predicates: Iterable['Predicate']) -> tuple:
+        return tuple((p.id, p.uri, p.object_type) for p in predicates)
+
+    @staticmethod
+    def term_version(term: 'Term') -> tuple:
+        return (
+            term.modified,
+            term.vocabulary.uri,
+            tuple((p.id, p.modified) for p in term.properties.all()),
+        )
+
+    def render(self, terms: Iterable['Term'], predicates: Iterable['Predicate']) -> list[SafeString]:
+        """Returns the rendered rows for the terms, in order, rendering only
+        the rows that are not cached or have changed since they were cached.
+
+        To avoid a query per term, prefetch the terms' properties and their
+        predicates."""
+        predicates = list(predicates)
+        predicates_version = self.predicates_version(predicates)
+        rows = []
+        rendered = 0
+        for term in terms:
+            version = (self.term_version(term), predicates_version)
+            with self._lock:
+                cached = self._rows.get(term.id)
+                if cached is not None and cached.version == version:
+                    self._rows.move_to_end(term.id)
+                    self.hits += 1
+                    rows.append(cached.html)
+                    continue
+                self.misses += 1
+
+            html = render_to_string(self.template_name, {'term': term, 'predicates': predicates})
+            self._put(term.id, CachedRow(version, html))
+            rows.append(html)
+            rendered += 1
+
+        logger.debug(f'Rendered {rendered} of {len(rows)} term rows')
+        return rows
+
+    def _put(self, term_id: int, row: CachedRow):
+        with self._lock:
+            self._rows.pop(term_id, None)
+            if self.max_size <= 0:
+                return
+            while len(self._rows) >= self.max_size:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+            self._rows[term_id] = row
+
+    def handle_change(self, event: 'ChangeEvent'):
+        # stale rows are also detected by their version, so this only
+        # frees the space taken by rows that cannot be used anymore
+        if event.term_id is not None:
+            self.invalidate(event.term_id)
+        elif event.vocabulary_ids is None and event.predicate_id is None:
+            self.clear()
+
+    def invalidate(self, term_id: int):
+        with self._lock:
+            self._rows.pop(term_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+    def reset(self):
+        """Empties the cache and resets the counters."""
+        self.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+term_row_cache = TermRowCache()
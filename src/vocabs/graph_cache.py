@@ -0,0 +1,126 @@
+"""Process-wide cache of the RDF graphs built from vocabularies."""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.conf import settings
+from rdflib import Graph
+
+if TYPE_CHECKING:
+    from vocabs.events import ChangeEvent
+    from vocabs.models import Context, Vocabulary
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    updated: datetime
+    graph: Graph
+    context: 'Context'
+
+
+class GraphCache:
+    """Least-recently-used cache of `Vocabulary.graph()` results.
+
+    Entries are stored by vocabulary id along with the vocabulary's "updated"
+    timestamp when the graph was built, and are only used if that timestamp
+    has not changed since, so changes made by other processes are noticed
+    even before their change events arrive.
+
+    The cache is bounded by the total number of triples in all the cached
+    graphs, not by the number of graphs. Cached graphs are shared, so callers
+    must not modify them."""
+
+    def __init__(self, max_triples: int | None = None):
+        self._lock = Lock()
+        self._max_triples = max_triples
+        self._entries: OrderedDict[int, CacheEntry] = OrderedDict()
+        self._sizes: dict[int, int] = {}
+        self.total_triples = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_triples(self) -> int:
+        return self._max_triples if self._max_triples is not None else settings.GRAPH_CACHE_MAX_TRIPLES
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, vocabulary_id: int) -> bool:
+        return vocabulary_id in self._entries
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'graphs': len(self._entries),
+            'triples': self.total_triples,
+            'max_triples': self.max_triples,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def get(self, vocabulary: 'Vocabulary') -> tuple[Graph, 'Context']:
+        """Returns the graph and context for the vocabulary, building it if
+        it is not cached or has changed since it was cached."""
+        updated = vocabulary.updated
+        with self._lock:
+            entry = self._entries.get(vocabulary.id)
+            if entry is not None and entry.updated == updated:
+                self._entries.move_to_end(vocabulary.id)
+                self.hits += 1
+                return entry.graph, entry.context
+            self.misses += 1
+
+        # build outside the lock, so other vocabularies can still be served
+        graph, context = vocabulary.graph()
+        self._put(vocabulary.id, CacheEntry(updated, graph, context))
+        return graph, context
+
+    def _put(self, vocabulary_id: int, entry: CacheEntry):
+        size = len(entry.graph)
+        with self._lock:
+            self._discard(vocabulary_id)
+            if size > self.max_triples:
+                logger.debug(f'Not caching graph for vocabulary {vocabulary_id}: {size} triples is over the limit')
+                return
+            while self._entries and self.total_triples + size > self.max_triples:
+                evicted_id, _ = self._entries.popitem(last=False)
+                self.total_triples -= self._sizes.pop(evicted_id)
+                self.evictions += 1
+                logger.debug(f'Evicted graph for vocabulary {evicted_id} from the cache')
+            self._entries[vocabulary_id] = entry
+            self._sizes[vocabulary_id] = size
+            self.total_triples += size
+
+    def _discard(self, vocabulary_id: int):
+        if self._entries.pop(vocabulary_id, None) is not None:
+            self.total_triples -= self._sizes.pop(vocabulary_id)
+
+    def handle_change(self, event: 'ChangeEvent'):
+        if event.vocabulary_ids is None:
+            self.clear()
+        for vocabulary_id in event.vocabulary_ids or ():
+            self.invalidate(vocabulary_id)
+
+    def invalidate(self, vocabulary_id: int):
+        with self._lock:
+            self._discard(vocabulary_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.total_triples = 0
+
+    def reset(self):
+        """Empties the cache and resets the counters."""
+        self.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+graph_cache = GraphCache()
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from logging import getLogger
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from vocabs.archive import compact, pending, vacuum
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+           Moves vocabularies, terms, and properties that were soft-deleted more than a given number
+           of days ago into the archive tables, and reports the number of rows and (approximate) bytes
+           reclaimed. A deleted vocabulary is archived together with all of its terms and properties.
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            help="Archive rows deleted more than this many days ago (default: COMPACT_RETENTION_DAYS)",
+            type=int,
+            default=settings.COMPACT_RETENTION_DAYS,
+        )
+        parser.add_argument(
+            "--batch-size",
+            help="Number of rows to move per transaction",
+            type=int,
+            default=1000,
+        )
+        parser.add_argument(
+            "--vacuum",
+            help="Run VACUUM afterward, so the database file shrinks (SQLite and PostgreSQL only)",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--dry-run",
+            help="Only count the rows that would be archived",
+            action="store_true",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--days must not be negative, and --batch-size must be positive")
+
+        before = timezone.now() - timedelta(days=options["days"])
+        if options["dry_run"]:
+            count = pending(before)
+            self.stdout.write(
+                f"Would archive {count['vocabularies']} vocabulary(ies), {count['terms']} term(s), "
+                f"and {count['properties']} property(ies) "
+                f"deleted before {before:%Y-%m-%d %H:%M}"
+            )
+            return
+
+        count = compact(before, batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Archived {count['vocabularies']} vocabulary(ies), {count['terms']} term(s), "
+            f"and {count['properties']} property(ies), reclaiming about {count['bytes']} bytes"
+        )
+
+        if options["vacuum"]:
+            if vacuum():
+                self.stdout.write("Vacuumed the database")
+            else:
+                logger.warning("VACUUM is not supported for this database; skipping it")
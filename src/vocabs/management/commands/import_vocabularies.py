@@ -0,0 +1,46 @@
+from pathlib import Path
+from tarfile import TarError
+from zipfile import BadZipFile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vocabs.bulk import import_dataset
+from vocabs.datasets import DatasetTooLarge
+
+
+class Command(BaseCommand):
+    help = """
+           Imports several vocabularies at once from a TriG or N-Quads dataset, or from a zip or tar
+           archive of RDF files. Subjects go to the vocabulary whose URI they start with; terms and
+           properties are only added, never removed.
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="The dataset or archive file")
+        parser.add_argument(
+            "--workers",
+            help="Number of processes that parse the files (default: the IMPORT_WORKERS setting)",
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["file"])
+        try:
+            with path.open("rb") as file:
+                report = import_dataset(file, path.name, workers=options["workers"])
+        except (OSError, EOFError, BadZipFile, TarError) as e:
+            raise CommandError(f"Invalid file: {e}") from e
+        except DatasetTooLarge as e:
+            raise CommandError(str(e)) from e
+
+        for vocabulary in report.vocabularies:
+            self.stdout.write(
+                f"{vocabulary['uri']}{' (created)' if vocabulary['created'] else ''}: "
+                f"{vocabulary['subjects']} subject(s), {vocabulary['new_terms']} new term(s), "
+                f"{vocabulary['new_properties']} new property(ies)"
+            )
+        for error in report.errors:
+            self.stderr.write(f"Unable to parse {error['file']}: {error['error']}")
+        if report.unrouted:
+            self.stderr.write(f"{len(report.unrouted)} subject(s) outside every vocabulary were not imported")
+        self.stdout.write(f"Imported {len(report.vocabularies)} vocabulary(ies)")
@@ -1,18 +1,44 @@
+import re
 from csv import DictReader
 from logging import getLogger
+from time import perf_counter
+from typing import Iterator
 
 from django.core.management.base import BaseCommand, CommandError
-from plastron.namespaces import namespace_manager
-from rdflib.util import from_n3
+from django.db import transaction
+
+from vocabs.curies import curie_codec
+from vocabs.events import change_bus, predicates_changed
 from vocabs.models import Predicate
 
 logger = getLogger(__name__)
 
+# an absolute URI (RFC 3986): a scheme, a colon, and characters allowed in URIs
+ABSOLUTE_URI = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*:[^\s<>"{}|\\^`]+')
+
+
+def expand_predicate(value: str) -> str:
+    """Returns the full URI for a predicate given as a CURIE, a full URI, or
+    a full URI in angle brackets. A value is only a CURIE if its prefix is
+    bound; otherwise, it must be an absolute URI of any scheme. Raises
+    ValueError if it is neither."""
+    value = value.strip()
+    if value.startswith('<') and value.endswith('>'):
+        value = value[1:-1]
+    else:
+        prefix, sep, _ = value.partition(':')
+        if sep and prefix in curie_codec.prefixes:
+            return curie_codec.expand(value)
+    if ABSOLUTE_URI.fullmatch(value):
+        return value
+    raise ValueError(f'"{value}" is not a CURIE or a URI')
+
 
 class Command(BaseCommand):
     help = """
            A small management utility that reads a simple, 2-column CSV file (predicate, object_type),
-           and does a get_or_create for each predicate listed.
+           and does a get_or_create for each predicate listed. With --bulk, all rows are validated
+           first, and the predicates are only added if every row is valid.
            """
 
     def add_arguments(self, parser):
@@ -24,26 +50,99 @@ class Command(BaseCommand):
             type=str,
             required=True,
         )
+        parser.add_argument(
+            "--bulk",
+            help="Validate every row, then add all new predicates in a single transaction",
+            action="store_true",
+        )
 
     def handle(self, *args, **options):
         try:
             with open(options["file"], "r", newline="") as csv_file:
-                csv_reader = DictReader(csv_file)
+                if options["bulk"]:
+                    self.load_bulk(DictReader(csv_file))
+                else:
+                    self.load(DictReader(csv_file))
+        except IOError as e:
+            raise CommandError(f"Invalid file: {str(e)}") from e
 
-                for row in csv_reader:
-                    if None in row:
-                        raise CommandError(f'Invalid row, extra column found: {row[None]}')
+    def load(self, csv_reader: DictReader):
+        for row in csv_reader:
+            if None in row:
+                raise CommandError(f'Invalid row, extra column found: {row[None]}')
 
-                    predicate = row['predicate']
-                    object_type = row['object_type']
+            predicate = row['predicate']
+            object_type = row['object_type']
 
-                    if predicate is None or object_type is None:
-                        raise CommandError(f'Invalid row: {predicate}, {object_type}')
+            if predicate is None or object_type is None:
+                raise CommandError(f'Invalid row: {predicate}, {object_type}')
 
-                    logger.debug(f'Row: {predicate}, {object_type}')
+            logger.debug(f'Row: {predicate}, {object_type}')
 
-                    uri = from_n3(predicate.strip(), nsm=namespace_manager)
-                    Predicate.objects.get_or_create(uri=uri, object_type=object_type.strip())
+            try:
+                uri = expand_predicate(predicate)
+            except ValueError as e:
+                raise CommandError(f'Invalid row: {e}') from e
+            Predicate.objects.get_or_create(uri=uri, object_type=object_type.strip())
 
-        except IOError as e:
-            raise CommandError(f"Invalid file: {str(e)}") from e
+    def validate(self, csv_reader: DictReader, errors: list[str]) -> Iterator[tuple[str, str]]:
+        """Yields the (URI, object type) of each valid row, and adds a
+        message to `errors` for each invalid one."""
+        for row in csv_reader:
+            line = csv_reader.line_num
+            if None in row:
+                errors.append(f'Line {line}: extra column found: {row[None]}')
+                continue
+            predicate = row.get('predicate')
+            object_type = row.get('object_type')
+            if predicate is None or object_type is None:
+                errors.append(f'Line {line}: missing predicate or object_type')
+                continue
+            object_type = object_type.strip()
+            if object_type not in Predicate.ObjectType.values:
+                errors.append(
+                    f'Line {line}: unknown object_type "{object_type}" '
+                    f'(expected one of: {", ".join(Predicate.ObjectType.values)})'
+                )
+                continue
+            try:
+                yield expand_predicate(predicate), object_type
+            except ValueError as e:
+                errors.append(f'Line {line}: {e}')
+
+    def load_bulk(self, csv_reader: DictReader):
+        start = perf_counter()
+        errors = []
+        rows = 0
+        predicates = set()
+        for predicate in self.validate(csv_reader, errors):
+            rows += 1
+            predicates.add(predicate)
+        validated = perf_counter()
+        self.stdout.write(
+            f'Validated {rows + len(errors)} row(s) in {validated - start:.3f}s: '
+            f'{len(predicates)} distinct, {rows - len(predicates)} duplicate, {len(errors)} invalid'
+        )
+        if errors:
+            for error in errors:
+                self.stderr.write(error)
+            raise CommandError(f'Invalid rows: {len(errors)} of {rows + len(errors)}; no predicates were added')
+
+        with transaction.atomic():
+            # the predicate table is small enough to check against all of it
+            existing = set(Predicate.objects.values_list('uri', 'object_type'))
+            new = [
+                Predicate(uri=uri, object_type=object_type)
+                for uri, object_type in sorted(predicates - existing)
+            ]
+            # another process may have added some of the same predicates since
+            # the check above; the unique constraint makes those no-ops
+            Predicate.objects.bulk_create(new, ignore_conflicts=True)
+        if new:
+            # new predicates are not used by any properties yet, but they are
+            # in the predicate registry and the "Add a property" menus
+            change_bus.publish(predicates_changed())
+        self.stdout.write(
+            f'Loaded predicates in {perf_counter() - validated:.3f}s: '
+            f'{len(new)} created, {len(predicates) - len(new)} existing'
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vocabs.namespaces import rewrite_namespace
+
+
+class Command(BaseCommand):
+    help = """
+           Changes the URI of a vocabulary, and replaces the old URI with the new one in every URI
+           property value and predicate URI that starts with it, in all vocabularies.
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument("old_uri", help="Current URI of the vocabulary")
+        parser.add_argument("new_uri", help="New URI of the vocabulary")
+        parser.add_argument(
+            "--dry-run",
+            help="Only count the values that would be rewritten, and list the vocabularies they are in",
+            action="store_true",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = rewrite_namespace(options["old_uri"], options["new_uri"], dry_run=options["dry_run"])
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(
+            f"{'Would rewrite' if options['dry_run'] else 'Rewrote'} {result.properties} property value(s) "
+            f"and {result.predicates} predicate(s) in {len(result.vocabularies)} vocabulary(ies):"
+        )
+        for vocabulary in result.vocabularies:
+            self.stdout.write(f"  {vocabulary.uri} ({vocabulary.label})")
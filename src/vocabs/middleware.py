@@ -0,0 +1,19 @@
+from django.conf import settings
+
+from vocabs.events import change_bus
+
+
+class ChangeSyncMiddleware:
+    """Applies the changes announced by other server processes to the caches
+    of this process before handling each request. Only logged-in users can
+    see any cached data, so other requests are passed straight through.
+    To keep the channel from being read on every request, it is read at most
+    once every CHANGE_BUS_SYNC_INTERVAL seconds."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.user.is_authenticated:
+            change_bus.sync(interval=settings.CHANGE_BUS_SYNC_INTERVAL)
+        return self.get_response(request)
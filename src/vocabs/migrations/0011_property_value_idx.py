@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0010_alter_term_options_term_unique_term_vocabulary_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['value'], name='property_value_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0011_property_value_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeNotice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin', models.CharField(max_length=32)),
+                ('model', models.CharField(max_length=32)),
+                ('change', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('soft_deleted', 'Soft Deleted'), ('restored', 'Restored'), ('deleted', 'Deleted')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('term_id', models.BigIntegerField(null=True)),
+                ('predicate_id', models.BigIntegerField(null=True)),
+                ('vocabulary_ids', models.JSONField(null=True)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:42
+
+import django.utils.timezone
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0012_changenotice'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='predicate',
+            options={'get_latest_by': 'modified'},
+        ),
+        migrations.AddField(
+            model_name='predicate',
+            name='created',
+            field=django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='created'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='predicate',
+            name='modified',
+            field=django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['modified'], name='property_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='term',
+            index=models.Index(fields=['modified'], name='term_modified_idx'),
+        ),
+    ]
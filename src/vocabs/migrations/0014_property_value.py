@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_value_dictionary(apps, schema_editor):
+    Property = apps.get_model('vocabs', 'Property')
+    PropertyValue = apps.get_model('vocabs', 'PropertyValue')
+    # includes soft-deleted properties, so they can be restored
+    values = list(Property.objects.values_list('value', flat=True).distinct())
+    PropertyValue.objects.bulk_create([PropertyValue(value=value) for value in values], batch_size=500)
+    Property.objects.update(
+        value_ref_id=models.Subquery(PropertyValue.objects.filter(value=models.OuterRef('value')).values('id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0013_predicate_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=1024)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('value',), name='unique_property_value')],
+            },
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='value_ref',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='properties', to='vocabs.propertyvalue'),
+        ),
+        migrations.RunPython(fill_value_dictionary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0014_property_value'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProperty',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('term_id', models.BigIntegerField(db_index=True)),
+                ('predicate_uri', models.CharField(max_length=256)),
+                ('value', models.CharField(max_length=1024)),
+                ('created', models.DateTimeField()),
+                ('modified', models.DateTimeField()),
+                ('deleted', models.DateTimeField()),
+                ('deleted_by_cascade', models.BooleanField(default=False)),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'archived properties',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTerm',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('vocabulary_id', models.BigIntegerField(db_index=True)),
+                ('name', models.CharField(max_length=256)),
+                ('created', models.DateTimeField()),
+                ('modified', models.DateTimeField()),
+                ('deleted', models.DateTimeField()),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
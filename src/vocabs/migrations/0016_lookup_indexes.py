@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:53
+
+import vocabs.models
+from django.db import migrations, models
+
+
+def check_duplicate_uris(apps, schema_editor):
+    Vocabulary = apps.get_model('vocabs', 'Vocabulary')
+    duplicates = list(
+        Vocabulary.objects.values('uri').annotate(count=models.Count('id')).filter(count__gt=1).values_list('uri', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Vocabulary URIs must be unique, but these are used more than once: '
+            f'{", ".join(duplicates)}. Merge or delete the duplicates, then run the migration again.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0015_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_uris, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='predicate',
+            options={},
+        ),
+        migrations.AlterField(
+            model_name='vocabulary',
+            name='uri',
+            field=models.CharField(max_length=256, unique=True, validators=[vocabs.models.VocabularyURIValidator()]),
+        ),
+        migrations.AddIndex(
+            model_name='predicate',
+            index=models.Index(fields=['uri', 'object_type'], name='predicate_uri_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['term', 'predicate', 'value'], name='property_live_term_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:56
+
+from django.db import migrations, models
+
+
+def merge_duplicate_predicates(apps, schema_editor):
+    """Points the properties of each duplicate predicate at the oldest one
+    with the same URI and object type, then deletes the duplicates."""
+    Predicate = apps.get_model('vocabs', 'Predicate')
+    Property = apps.get_model('vocabs', 'Property')
+    duplicates = Predicate.objects.values('uri', 'object_type').annotate(
+        keep=models.Min('id'), count=models.Count('id')
+    ).filter(count__gt=1)
+    for row in duplicates:
+        others = Predicate.objects.filter(uri=row['uri'], object_type=row['object_type']).exclude(id=row['keep'])
+        Property.objects.filter(predicate__in=others).update(predicate_id=row['keep'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0016_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_predicates, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='predicate',
+            name='predicate_uri_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='predicate',
+            constraint=models.UniqueConstraint(fields=('uri', 'object_type'), name='unique_predicate_uri'),
+        ),
+    ]
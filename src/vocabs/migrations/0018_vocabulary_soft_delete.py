@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+import vocabs.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0017_unique_predicate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vocabulary',
+            name='deleted',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='vocabulary',
+            name='deleted_by_cascade',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='vocabulary',
+            name='uri',
+            field=models.CharField(max_length=256, validators=[vocabs.models.VocabularyURIValidator()]),
+        ),
+        migrations.AddConstraint(
+            model_name='vocabulary',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted__isnull', True)), fields=('uri',), name='unique_vocabulary_uri', violation_error_message='A vocabulary with this URI already exists'),
+        ),
+    ]
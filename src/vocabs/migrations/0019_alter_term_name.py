@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:51
+
+import vocabs.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0018_vocabulary_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='term',
+            name='name',
+            field=models.CharField(max_length=256, validators=[vocabs.models.TermNameValidator()]),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0019_alter_term_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedVocabulary',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('uri', models.CharField(max_length=256)),
+                ('label', models.CharField(max_length=256)),
+                ('description', models.CharField(blank=True, max_length=1024)),
+                ('preferred_prefix', models.CharField(blank=True, max_length=32)),
+                ('published', models.DateTimeField(null=True)),
+                ('created', models.DateTimeField()),
+                ('modified', models.DateTimeField()),
+                ('deleted', models.DateTimeField()),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'archived vocabularies',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:07
+
+import vocabs.models
+from django.db import migrations, models
+
+
+def check_duplicate_uris(apps, schema_editor):
+    Vocabulary = apps.get_model('vocabs', 'Vocabulary')
+    duplicates = list(
+        Vocabulary._base_manager.values('uri').annotate(count=models.Count('id')).filter(count__gt=1).values_list('uri', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Vocabulary URIs must be unique, including those of deleted vocabularies, but these are used more than '
+            f'once: {", ".join(duplicates)}. Delete the deleted duplicates permanently, then run the migration again.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0020_archived_vocabulary'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_uris, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='vocabulary',
+            name='unique_vocabulary_uri',
+        ),
+        migrations.AlterField(
+            model_name='vocabulary',
+            name='uri',
+            field=models.CharField(error_messages={'unique': 'A vocabulary with this URI already exists'}, max_length=256, unique=True, validators=[vocabs.models.VocabularyURIValidator()]),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabs', '0021_unique_vocabulary_uri'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='property',
+            name='value_ref',
+        ),
+        migrations.DeleteModel(
+            name='PropertyValue',
+        ),
+    ]
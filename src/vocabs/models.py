@@ -3,25 +3,35 @@ import re
 from collections import Counter
 from contextlib import contextmanager
 from datetime import datetime, timezone
+from io import IOBase
 from os.path import basename
+from threading import Lock
+from time import monotonic
 from pathlib import PurePath
-from typing import IO, TextIO, TypeAlias, NamedTuple, cast
+from typing import IO, TYPE_CHECKING, Iterator, TextIO, TypeAlias, NamedTuple, cast
 from xml.sax import SAXParseException
 
+from django.conf import settings
 from django.core.validators import RegexValidator
-from django.db.models import CASCADE, PROTECT, CharField, DateTimeField, ForeignKey, Model, TextChoices, \
-    UniqueConstraint, Q
+from django.db.models import CASCADE, PROTECT, BigIntegerField, BooleanField, CharField, DateTimeField, \
+    Count, ForeignKey, Index, JSONField, Max, Model, QuerySet, TextChoices, UniqueConstraint, Q
 from django_extensions.db.models import TimeStampedModel
-from plastron.namespaces import dc, namespace_manager as nsm, rdfs
+from plastron.namespaces import dc, rdf, rdfs
 from rdflib import Graph, Literal, URIRef, Namespace
-from rdflib.namespace import NamespaceManager
+from rdflib.exceptions import ParserError
 from rdflib.parser import InputSource
 from rdflib.plugin import PluginException
-from rdflib.util import from_n3
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.term import Node
 from safedelete.config import SOFT_DELETE_CASCADE
 from safedelete.models import SafeDeleteModel
 
 from grove.settings import VOCAB_OUTPUT_DIR
+from vocabs.curies import CurieCodec, curie_codec
+from vocabs.graph_cache import graph_cache
+
+if TYPE_CHECKING:
+    from vocabs.events import ChangeEvent
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +44,8 @@ VOCAB_FORMAT_LABELS = {
     'ntriples': 'N-Triples',
 }
 
+NTRIPLES_FORMATS = ('ntriples', 'nt', 'nt11', 'application/n-triples')
+
 GraphSource: TypeAlias = IO[bytes] | TextIO | InputSource | str | bytes | PurePath | None
 """Type alias for the types accepted by the `rdflib.Graph.parse()` method's `source` argument."""
 
@@ -50,15 +62,15 @@ class TermNameValidator(RegexValidator):
 
 
 class Context(dict):
-    def __init__(self, namespace_manager: NamespaceManager, **kwargs):
-        self.namespace_manager = namespace_manager
+    def __init__(self, codec: CurieCodec, **kwargs):
+        self.codec = codec
         super().__init__(**kwargs)
 
     def add_prefix(self, uri: URIRef):
-        for prefix, ns_uri in self.namespace_manager.namespaces():
-            if uri.startswith(ns_uri):
-                self[prefix] = str(ns_uri)
-                return
+        namespace = self.codec.namespace_of(uri)
+        if namespace is not None:
+            prefix, ns_uri = namespace
+            self[prefix] = ns_uri
 
 
 class OutputFormat(NamedTuple):
@@ -68,11 +80,22 @@ class OutputFormat(NamedTuple):
     parameter_names: list[str]
 
 
-class Vocabulary(TimeStampedModel):
+class Vocabulary(TimeStampedModel, SafeDeleteModel):
     class Meta:
         verbose_name_plural = 'vocabularies'
 
-    uri = CharField(max_length=256, validators=[VocabularyURIValidator()])
+    # Deleting a single vocabulary soft-deletes its terms and properties one
+    # at a time; see vocabs.bulk.soft_delete_vocabularies() for the bulk way.
+    _safedelete_policy = SOFT_DELETE_CASCADE
+
+    # a deleted vocabulary keeps its URI until it is deleted permanently or
+    # archived, so that it can always be restored
+    uri = CharField(
+        max_length=256,
+        unique=True,
+        validators=[VocabularyURIValidator()],
+        error_messages={'unique': 'A vocabulary with this URI already exists'},
+    )
     label = CharField(max_length=256)
     description = CharField(max_length=1024, blank=True)
     preferred_prefix = CharField(max_length=32, blank=True)
@@ -86,6 +109,15 @@ class Vocabulary(TimeStampedModel):
     def with_uri(cls, uri: str):
         yield cls.objects.get(uri=uri)
 
+    @classmethod
+    def deleted_with_uri(cls, uri: str) -> 'Vocabulary | None':
+        """Returns the soft-deleted vocabulary with the URI, if there is one."""
+        return cls.all_objects.filter(uri=uri, deleted__isnull=False).first()
+
+    @property
+    def deleted_message(self) -> str:
+        return f'The vocabulary "{self.uri}" has been deleted; restore it, or delete it permanently to reuse its URI'
+
     @property
     def term_count(self) -> int:
         return self.terms.count()
@@ -94,33 +126,45 @@ class Vocabulary(TimeStampedModel):
     def basename(self) -> str:
         return basename(cast(str, self.uri).rstrip('#/'))
 
+    def metadata_triples(self) -> Iterator[tuple[URIRef, URIRef, Literal]]:
+        """Triples describing the vocabulary itself (label, description, prefix)."""
+        vocab_subject = URIRef(cast(str, self.uri))
+        if self.label:
+            yield vocab_subject, rdfs.label, Literal(self.label)
+        if self.description:
+            yield vocab_subject, dc.description, Literal(self.description)
+        if self.preferred_prefix:
+            yield vocab_subject, vann.preferredNamespacePrefix, Literal(self.preferred_prefix)
+
     def graph(self) -> tuple[Graph, Context]:
         context = Context(
-            namespace_manager=nsm,
+            codec=curie_codec,
             dc=str(dc),
             rdfs=str(rdfs),
             vann=str(vann),
         )
         graph = Graph()
-        vocab_subject = URIRef(cast(str, self.uri))
-        if self.label:
-            graph.add((vocab_subject, rdfs.label, Literal(self.label)))
-        if self.description:
-            graph.add((vocab_subject, dc.description, Literal(self.description)))
-        if self.preferred_prefix:
-            graph.add((vocab_subject, vann.preferredNamespacePrefix, Literal(self.preferred_prefix)))
-        for term in self.terms.all():
-            s = URIRef(term.uri)
-            graph.add((s, dc.identifier, Literal(term.name)))
-            for prop in term.properties.all():
-                p = URIRef(prop.predicate.uri)
+        for triple in self.metadata_triples():
+            graph.add(triple)
+        subjects = {}
+        for term_id, name in self.terms.values_list('id', 'name'):
+            subjects[term_id] = URIRef(self.uri + name)
+            graph.add((subjects[term_id], dc.identifier, Literal(name)))
+        # one node per distinct predicate and value, shared by all the triples that use it
+        predicates: dict[str, URIRef] = {}
+        objects: dict[tuple[str, str], URIRef | Literal] = {}
+        properties = Property.objects.filter(term__vocabulary=self, term__deleted__isnull=True)
+        for term_id, predicate_uri, object_type, value in property_rows(properties):
+            p = predicates.get(predicate_uri)
+            if p is None:
+                p = predicates[predicate_uri] = URIRef(predicate_uri)
                 context.add_prefix(p)
-                if prop.value_is_uri:
-                    o = URIRef(prop.value)
+            o = objects.get((value, object_type))
+            if o is None:
+                o = objects[value, object_type] = rdf_node(value, object_type)
+                if isinstance(o, URIRef):
                     context.add_prefix(o)
-                else:
-                    o = Literal(prop.value)
-                graph.add((s, p, o))
+            graph.add((subjects[term_id], p, o))
 
         return graph, context
 
@@ -137,12 +181,13 @@ class Vocabulary(TimeStampedModel):
         Returns timestamp when this Vocabulary or any of its dependent Term or
         Property model was last changed (added, modified, or deleted)
         """
-        most_recent_update = self.modified
-        for term in self.terms.all_with_deleted():
-            most_recent_update = most_recent_update if most_recent_update > term.modified else term.modified
-            for prop in term.properties.all_with_deleted():
-                most_recent_update = most_recent_update if most_recent_update > prop.modified else prop.modified
-        return most_recent_update
+        # joins are not filtered by the soft-delete managers, so this includes
+        # deleted terms and properties
+        latest = Vocabulary.objects.filter(pk=self.pk).aggregate(
+            term=Max('terms__modified'),
+            property=Max('terms__properties__modified'),
+        )
+        return max(timestamp for timestamp in (self.modified, *latest.values()) if timestamp is not None)
 
     @property
     def has_updated(self):
@@ -153,7 +198,7 @@ class Vocabulary(TimeStampedModel):
         return not self.is_published or (self.updated > self.published)
 
     def publish(self):
-        graph, context = self.graph()
+        graph, context = graph_cache.get(self)
         for fmt in self.OUTPUT_FORMATS:
             file = VOCAB_OUTPUT_DIR / (self.basename + '.' + fmt.extension)
             with file.open(mode='wb') as fh:
@@ -193,6 +238,10 @@ class Term(TimeStampedModel, SafeDeleteModel):
                 violation_error_message='A term with this name already exists in this vocabulary',
             ),
         ]
+        indexes = [
+            # supports finding the latest change (see vocabs.conditional)
+            Index(fields=['modified'], name='term_modified_idx'),
+        ]
 
     # Use SOFT_DELETE_CASCADE policy to ensure that dependent Property models
     # are also soft-deleted (instead of not being deleted at all).
@@ -205,25 +254,37 @@ class Term(TimeStampedModel, SafeDeleteModel):
     def uri(self):
         return self.vocabulary.uri + self.name
 
+    @property
+    def incoming_references(self) -> QuerySet['Property']:
+        """Properties of other terms that use this term's URI as their value."""
+        return references_to(self.uri).exclude(term=self)
+
     def __str__(self):
         return self.uri
 
 
-class Predicate(Model):
+class Predicate(TimeStampedModel):
     class ObjectType(TextChoices):
         URI_REF = 'URIRef'
         LITERAL = 'Literal'
 
+    class Meta:
+        constraints = [
+            # also supports lookups by URI (see from_curie), and lets bulk
+            # loads skip predicates that already exist (see load_predicates)
+            UniqueConstraint(fields=['uri', 'object_type'], name='unique_predicate_uri'),
+        ]
+
     @classmethod
     def from_curie(cls, curie: str):
-        return Predicate.objects.filter(uri=from_n3(curie)).first()
+        return predicate_registry.from_curie(curie)
 
     uri = CharField(max_length=256)
     object_type = CharField(max_length=32, choices=ObjectType.choices)
 
     @property
     def curie(self) -> str:
-        curie = URIRef(str(self.uri)).n3(namespace_manager=nsm)
+        curie = curie_codec.compact(self.uri)
         return curie if len(curie) < len(str(self.uri)) else ''
 
     def __str__(self) -> str:
@@ -237,6 +298,18 @@ class Predicate(Model):
 class Property(TimeStampedModel, SafeDeleteModel):
     class Meta:
         verbose_name_plural = 'properties'
+        indexes = [
+            # supports reverse lookups of URI-valued properties (see references_to)
+            Index(fields=['value'], name='property_value_idx'),
+            Index(fields=['modified'], name='property_modified_idx'),
+            # supports finding a live property of a term by predicate and value,
+            # e.g., get_or_create() when importing
+            Index(
+                fields=['term', 'predicate', 'value'],
+                condition=Q(deleted__isnull=True),
+                name='property_live_term_idx',
+            ),
+        ]
 
     term = ForeignKey(Term, on_delete=CASCADE, related_name='properties')
     predicate = ForeignKey(Predicate, on_delete=PROTECT)
@@ -249,12 +322,14 @@ class Property(TimeStampedModel, SafeDeleteModel):
     def value_is_uri(self) -> bool:
         return self.predicate.object_type == Predicate.ObjectType.URI_REF
 
+    @property
+    def object(self) -> URIRef | Literal:
+        """The value of this property as an RDF node."""
+        return rdf_node(self.value, self.predicate.object_type)
+
     @property
     def value_as_curie(self) -> str:
-        try:
-            curie = URIRef(str(self.value)).n3(namespace_manager=nsm)
-        except Exception:  # noqa
-            curie = str(self.value)
+        curie = curie_codec.compact(self.value)
         return curie if len(curie) <= len(str(self.value)) else str(self.value)
 
     @property
@@ -262,28 +337,284 @@ class Property(TimeStampedModel, SafeDeleteModel):
         return self.value_as_curie if self.value_is_uri else self.value
 
 
+class ChangeNotice(Model):
+    """A change to a vocabulary, term, property, or predicate, recorded so
+    that other server processes can invalidate their caches (see
+    vocabs.events)."""
+
+    class ChangeType(TextChoices):
+        CREATED = 'created'
+        UPDATED = 'updated'
+        SOFT_DELETED = 'soft_deleted'
+        RESTORED = 'restored'
+        DELETED = 'deleted'
+
+    origin = CharField(max_length=32)
+    model = CharField(max_length=32)
+    change = CharField(max_length=16, choices=ChangeType.choices)
+    object_id = BigIntegerField()
+    term_id = BigIntegerField(null=True)
+    predicate_id = BigIntegerField(null=True)
+    # list of ids, or null for all vocabularies
+    vocabulary_ids = JSONField(null=True)
+    created = DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'{self.model} {self.object_id} {self.change}'
+
+
+class ArchivedVocabulary(Model):
+    """A soft-deleted vocabulary moved out of the Vocabulary table by the
+    "compact" command, along with all of its terms and properties."""
+
+    class Meta:
+        verbose_name_plural = 'archived vocabularies'
+
+    id = BigIntegerField(primary_key=True)
+    uri = CharField(max_length=256)
+    label = CharField(max_length=256)
+    description = CharField(max_length=1024, blank=True)
+    preferred_prefix = CharField(max_length=32, blank=True)
+    published = DateTimeField(null=True)
+    created = DateTimeField()
+    modified = DateTimeField()
+    deleted = DateTimeField()
+    archived = DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.uri} (deleted {self.deleted})'
+
+
+class ArchivedTerm(Model):
+    """A soft-deleted term moved out of the Term table by the "compact"
+    command. Keeps the original id; references are plain ids, not foreign
+    keys, so archived rows never block deleting anything else."""
+
+    id = BigIntegerField(primary_key=True)
+    vocabulary_id = BigIntegerField(db_index=True)
+    name = CharField(max_length=256)
+    created = DateTimeField()
+    modified = DateTimeField()
+    deleted = DateTimeField()
+    archived = DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.name} (vocabulary {self.vocabulary_id}, deleted {self.deleted})'
+
+
+class ArchivedProperty(Model):
+    """A soft-deleted property moved out of the Property table by the
+    "compact" command."""
+
+    class Meta:
+        verbose_name_plural = 'archived properties'
+
+    id = BigIntegerField(primary_key=True)
+    term_id = BigIntegerField(db_index=True)
+    predicate_uri = CharField(max_length=256)
+    value = CharField(max_length=1024)
+    created = DateTimeField()
+    modified = DateTimeField()
+    deleted = DateTimeField()
+    deleted_by_cascade = BooleanField(default=False)
+    archived = DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'<{self.predicate_uri}> {self.value} (term {self.term_id}, deleted {self.deleted})'
+
+
+def property_rows(properties: QuerySet[Property]) -> list[tuple[int, str, str, str]]:
+    """Returns (term id, predicate URI, object type, value) tuples for the
+    properties. Repeated values are the same string object, so that a large
+    graph holds each distinct value once."""
+    values = {}
+    return [
+        (term_id, predicate_uri, object_type, values.setdefault(value, value))
+        for term_id, predicate_uri, object_type, value in properties.values_list(
+            'term_id', 'predicate__uri', 'predicate__object_type', 'value'
+        )
+    ]
+
+
+def rdf_node(value: str, object_type: str) -> URIRef | Literal:
+    """Converts a property value to an RDF node, according to the object type
+    of its predicate."""
+    return URIRef(value) if object_type == Predicate.ObjectType.URI_REF else Literal(value)
+
+
+def rdf_type_predicate() -> Predicate:
+    """Find or create the Predicate for "rdf:type"."""
+
+    return predicate_registry.get_or_create(str(rdf.type), Predicate.ObjectType.URI_REF)
+
+
+def predicates_version() -> tuple[datetime | None, int]:
+    """Changes whenever a predicate is added, changed, or deleted."""
+    latest = Predicate.objects.aggregate(modified=Max('modified'), count=Count('id'))
+    return latest['modified'], latest['count']
+
+
+class PredicateSnapshot(NamedTuple):
+    version: tuple[datetime | None, int]
+    checked: float
+    """When the version was last compared to the database (monotonic clock)."""
+    predicates: tuple[Predicate, ...]
+    by_id: dict[int, Predicate]
+    by_uri: dict[str, Predicate]
+    """The oldest predicate with each URI, of any object type."""
+    by_uri_and_type: dict[tuple[str, str], Predicate]
+    by_curie: dict[str, Predicate]
+
+
+class PredicateRegistry:
+    """All predicates, loaded into memory once and shared by all threads.
+
+    A snapshot is reloaded when its version (see `predicates_version()`) no
+    longer matches the database. The version is checked after a predicate
+    change event (see vocabs.events), and at least every
+    PREDICATE_REGISTRY_MAX_AGE seconds in case an event from another process
+    was missed. A new snapshot replaces the old one as a whole, so readers
+    never see a partly loaded registry. The Predicate instances are shared,
+    so callers must not modify them."""
+
+    def __init__(self, max_age: float | None = None):
+        self._lock = Lock()
+        self._max_age = max_age
+        self._snapshot: PredicateSnapshot | None = None
+        self._stale = False
+        self.loads = 0
+
+    @property
+    def max_age(self) -> float:
+        return self._max_age if self._max_age is not None else settings.PREDICATE_REGISTRY_MAX_AGE
+
+    def _is_current(self, snapshot: PredicateSnapshot | None) -> bool:
+        return snapshot is not None and not self._stale and monotonic() - snapshot.checked < self.max_age
+
+    def snapshot(self) -> PredicateSnapshot:
+        snapshot = self._snapshot
+        if self._is_current(snapshot):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if self._is_current(snapshot):
+                # another thread refreshed it while this one waited
+                return snapshot
+            # a change arriving from here on marks the new snapshot stale again
+            self._stale = False
+            version = predicates_version()
+            if snapshot is not None and snapshot.version == version:
+                snapshot = snapshot._replace(checked=monotonic())
+            else:
+                snapshot = self._load(version)
+            self._snapshot = snapshot
+            return snapshot
+
+    def _load(self, version: tuple[datetime | None, int]) -> PredicateSnapshot:
+        predicates = tuple(Predicate.objects.order_by('id'))
+        by_uri = {}
+        by_curie = {}
+        for predicate in predicates:
+            by_uri.setdefault(predicate.uri, predicate)
+            if predicate.curie:
+                by_curie.setdefault(predicate.curie, predicate)
+        self.loads += 1
+        logger.debug(f'Loaded {len(predicates)} predicates into the registry')
+        return PredicateSnapshot(
+            version=version,
+            checked=monotonic(),
+            predicates=predicates,
+            by_id={predicate.id: predicate for predicate in predicates},
+            by_uri=by_uri,
+            by_uri_and_type={(predicate.uri, predicate.object_type): predicate for predicate in predicates},
+            by_curie=by_curie,
+        )
+
+    def all(self) -> tuple[Predicate, ...]:
+        return self.snapshot().predicates
+
+    def get(self, predicate_id: int) -> Predicate | None:
+        return self.snapshot().by_id.get(predicate_id)
+
+    def from_uri(self, uri: str) -> Predicate | None:
+        return self.snapshot().by_uri.get(str(uri))
+
+    def from_curie(self, curie: str) -> Predicate | None:
+        snapshot = self.snapshot()
+        return snapshot.by_curie.get(curie) or snapshot.by_uri.get(curie_codec.expand(curie))
+
+    def get_or_create(self, uri: str, object_type: str) -> Predicate:
+        predicate = self.snapshot().by_uri_and_type.get((str(uri), object_type))
+        if predicate is None:
+            predicate, _ = Predicate.objects.get_or_create(uri=str(uri), object_type=object_type)
+        return predicate
+
+    def handle_change(self, event: 'ChangeEvent'):
+        # predicates may be used in any vocabulary, so only predicate events
+        # (and events that may have changed anything) have no vocabularies
+        if event.vocabulary_ids is None:
+            self.invalidate()
+
+    def invalidate(self):
+        self._stale = True
+
+    def reset(self):
+        with self._lock:
+            self._snapshot = None
+            self._stale = False
+            self.loads = 0
+
+
+predicate_registry = PredicateRegistry()
+
+
+def references_to(uri: str) -> QuerySet[Property]:
+    """Returns the live URI-valued properties whose value is the given URI."""
+    return Property.objects.filter(
+        value=uri,
+        predicate__object_type=Predicate.ObjectType.URI_REF,
+    ).select_related('term__vocabulary', 'predicate').order_by('term__vocabulary__uri', 'term__name', 'id')
+
+
 class VocabularyImportError(Exception):
     pass
 
 
-def import_vocabulary(file: GraphSource, uri: str, rdf_format: str) -> tuple[Vocabulary, bool, Counter]:
-    count = Counter({
-        'subjects': 0,
-        'new_terms': 0,
-        'new_properties': 0,
-    })
+GraphTriple = tuple[str, str, str]
+"""(predicate URI, object type, value) of a property in an imported graph."""
+
+
+PARSER_FORMATS = {'rdfxml': 'xml'}
+"""rdflib parser names for the keys of VOCAB_FORMAT_LABELS that are not
+parser names themselves."""
+
+PARSE_ERRORS = (ValueError, SyntaxError, SAXParseException, PluginException, ParserError, OSError, EOFError)
+"""Raised by rdflib for invalid or unreadable files, and by the gzip and
+bz2 modules for invalid compressed data."""
+
+
+def parse_error(e: Exception, file: GraphSource, uri: str, rdf_format: str) -> VocabularyImportError:
+    logger.error(
+        f'Unable to import vocabulary: {e.__class__.__name__}: {e} '
+        f'(file={file}, uri={uri}, rdf_format={rdf_format})'
+    )
+    return VocabularyImportError()
+
+
+def parse_vocabulary(file: GraphSource, uri: str, rdf_format: str) -> Graph:
     graph = Graph()
     try:
-        graph.parse(file, format=rdf_format)
-    except (ValueError, SAXParseException, PluginException, FileNotFoundError) as e:
-        logger.error(
-            f'Unable to import vocabulary: {e.__class__.__name__}: {e} '
-            f'(file={file}, uri={uri}, rdf_format={rdf_format})'
-        )
-        raise VocabularyImportError from e
+        graph.parse(file, format=PARSER_FORMATS.get(rdf_format, rdf_format))
+    except PARSE_ERRORS as e:
+        raise parse_error(e, file, uri, rdf_format) from e
+    return graph
+
+
+def vocabulary_metadata(graph: Graph, uri: str) -> dict[str, str]:
+    """Label, description, and prefix of a new vocabulary, from the
+    statements about it in the graph."""
     vocab_subject = URIRef(uri)
-    # check for existing predicates about the vocab (label, description, prefix)
-    default_vocab_metadata = {
+    return {
         'label': str(graph.value(
             subject=vocab_subject, predicate=rdfs.label, default=Literal(basename(uri.rstrip('#/')).title())
         )),
@@ -294,23 +625,95 @@ def import_vocabulary(file: GraphSource, uri: str, rdf_format: str) -> tuple[Voc
             subject=vocab_subject, predicate=vann.preferredNamespacePrefix, default=Literal('')
         )),
     }
-    subjects = {s for s in set(graph.subjects()) if str(s).startswith(uri)}
-    count['subjects'] = len(subjects)
-    vocab, vocab_is_new = Vocabulary.objects.get_or_create(uri=uri, defaults=default_vocab_metadata)
-    for subject in subjects:
-        name = subject.replace(uri, '')
+
+
+class TermCollector:
+    """Collects the properties of each term in the vocabulary namespace, by
+    term name, from a graph or, as an rdflib N-Triples parser sink, straight
+    from a file. A "dc:identifier" that only repeats the term name is not
+    a property. The statements about the vocabulary itself are also kept,
+    for `vocabulary_metadata()`."""
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self.metadata = Graph()
+        self._terms: dict[str, dict[GraphTriple, None]] = {}
+
+    def triple(self, s: Node, p: Node, o: Node):
+        if not str(s).startswith(self.uri):
+            return
+        if s == URIRef(self.uri):
+            self.metadata.add((s, p, o))
+        name = s.replace(self.uri, '')
+        properties = self._terms.setdefault(name, {})
+        if p == dc.identifier and str(o) == name:
+            return
+        if isinstance(o, URIRef):
+            object_type = Predicate.ObjectType.URI_REF
+        else:
+            object_type = Predicate.ObjectType.LITERAL
+        properties[(str(p), object_type, str(o))] = None
+
+    def terms(self) -> dict[str, list[GraphTriple]]:
+        return {name: list(properties) for name, properties in self._terms.items()}
+
+
+def graph_terms(graph: Graph, uri: str) -> dict[str, list[GraphTriple]]:
+    """Returns the properties of each term in the vocabulary namespace, by
+    term name. See `TermCollector`."""
+    collector = TermCollector(uri)
+    for triple in graph:
+        collector.triple(*triple)
+    return collector.terms()
+
+
+def read_vocabulary(
+    file: GraphSource,
+    uri: str,
+    rdf_format: str,
+) -> tuple[dict[str, list[GraphTriple]], dict[str, str]]:
+    """Returns the properties of each term in the file, by term name (see
+    `graph_terms()`), and the metadata for a new vocabulary (see
+    `vocabulary_metadata()`).
+
+    N-Triples files are read one line at a time, keeping only the statements
+    about the vocabulary and its terms, instead of loading the whole file
+    into a graph first."""
+    if rdf_format not in NTRIPLES_FORMATS or not isinstance(file, (PurePath, IOBase)):
+        graph = parse_vocabulary(file, uri, rdf_format)
+        return graph_terms(graph, uri), vocabulary_metadata(graph, uri)
+
+    collector = TermCollector(uri)
+    try:
+        if isinstance(file, PurePath):
+            with open(file, 'rb') as stream:
+                W3CNTriplesParser(sink=collector).parse(stream)
+        else:
+            W3CNTriplesParser(sink=collector).parse(file)
+    except PARSE_ERRORS as e:
+        raise parse_error(e, file, uri, rdf_format) from e
+    return collector.terms(), vocabulary_metadata(collector.metadata, uri)
+
+
+def import_vocabulary(file: GraphSource, uri: str, rdf_format: str) -> tuple[Vocabulary, bool, Counter]:
+    count = Counter({
+        'subjects': 0,
+        'new_terms': 0,
+        'new_properties': 0,
+    })
+    terms, metadata = read_vocabulary(file, uri, rdf_format)
+    count['subjects'] = len(terms)
+    deleted = Vocabulary.deleted_with_uri(uri)
+    if deleted is not None:
+        raise VocabularyImportError(deleted.deleted_message)
+    vocab, vocab_is_new = Vocabulary.objects.get_or_create(uri=uri, defaults=metadata)
+    for name, properties in terms.items():
         term, term_is_new = Term.objects.get_or_create(vocabulary=vocab, name=name)
         if term_is_new:
             count['new_terms'] += 1
-        for _, p, o in graph.triples((subject, None, None)):
-            if isinstance(o, URIRef):
-                object_type = Predicate.ObjectType.URI_REF
-            else:
-                object_type = Predicate.ObjectType.LITERAL
-            if p == dc.identifier and str(o) == name:
-                continue
-            predicate, _ = Predicate.objects.get_or_create(uri=str(p), object_type=object_type)
-            prop, prop_is_new = Property.objects.get_or_create(term=term, predicate=predicate, value=str(o))
+        for predicate_uri, object_type, value in properties:
+            predicate = predicate_registry.get_or_create(predicate_uri, object_type)
+            prop, prop_is_new = Property.objects.get_or_create(term=term, predicate=predicate, value=value)
             if prop_is_new:
                 count['new_properties'] += 1
 
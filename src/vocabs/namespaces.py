@@ -0,0 +1,273 @@
+"""Changes the URIs of vocabularies and terms, along with every reference to them."""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, QuerySet, Value, When
+from django.db.models.functions import Concat, Substr
+from django.db.models.lookups import Exact
+from safedelete.config import DELETED_VISIBLE
+
+from vocabs.events import bulk_change, change_bus, predicates_changed
+from vocabs.models import Predicate, Property, Term, Vocabulary, VocabularyURIValidator
+
+logger = logging.getLogger(__name__)
+
+
+class NamespaceRewrite(NamedTuple):
+    old_uri: str
+    new_uri: str
+    properties: int
+    """Number of URI property values (including those of deleted properties)
+    that were, or would be, rewritten."""
+    predicates: int
+    """Number of predicate URIs that were, or would be, rewritten."""
+    vocabularies: list[Vocabulary]
+    """The renamed vocabulary, and every vocabulary with a term whose
+    properties refer to it."""
+
+
+class TermRename(NamedTuple):
+    names: dict[str, str]
+    """The old and new names of the renamed terms."""
+    properties: int
+    """Number of URI property values (including those of deleted properties)
+    that were, or would be, rewritten."""
+    predicates: int
+    """Number of predicate URIs that were, or would be, rewritten."""
+    vocabularies: list[Vocabulary]
+    """The vocabulary of the terms, and every vocabulary with a term whose
+    properties refer to them."""
+
+
+class RenameError(ValueError):
+    """Raised when one or more renames are invalid. No terms are renamed."""
+
+    def __init__(self, errors: dict[str, list[str]]):
+        self.errors = errors
+        super().__init__(f'{len(errors)} invalid rename(s)')
+
+
+BATCH_SIZE = 500
+"""Maximum number of renames in each UPDATE, to stay well below the limits
+on the number of query parameters."""
+
+
+def live_and_deleted_uri_properties() -> QuerySet:
+    return Property.all_objects.all(force_visibility=DELETED_VISIBLE).filter(
+        predicate__object_type=Predicate.ObjectType.URI_REF
+    )
+
+
+def affected_vocabularies(vocabulary: Vocabulary, properties: QuerySet, predicates: QuerySet) -> list[Vocabulary]:
+    return list(
+        Vocabulary.objects.filter(
+            Q(pk=vocabulary.pk)
+            | Exists(properties.filter(term__vocabulary=OuterRef('pk')))
+            | Exists(Property.all_objects.filter(term__vocabulary=OuterRef('pk'), predicate__in=predicates))
+        ).order_by('uri')
+    )
+
+
+def mark_changed(vocabularies: list[Vocabulary], predicates: int, timestamp: datetime):
+    # "modified" also changes for vocabularies that only use a renamed
+    # predicate, since their graphs have changed too
+    Vocabulary.objects.filter(pk__in=[v.pk for v in vocabularies]).update(modified=timestamp)
+    # bulk queries do not send model signals
+    change_bus.publish(bulk_change(*vocabularies))
+    if predicates:
+        change_bus.publish(predicates_changed())
+
+
+def starts_with(field: str, namespace: str) -> Exact:
+    # LIKE (and so "__startswith") is case-insensitive on SQLite
+    return Exact(Substr(field, 1, len(namespace)), Value(namespace))
+
+
+def rewritten(field: str, old_uri: str, new_uri: str) -> Concat:
+    return Concat(Value(new_uri), Substr(field, len(old_uri) + 1))
+
+
+def nested_namespaces(namespace: str) -> list[str]:
+    """Returns the URIs of the other vocabularies inside the namespace."""
+    return list(
+        Vocabulary.objects.filter(starts_with('uri', namespace)).exclude(uri=namespace).values_list('uri', flat=True)
+    )
+
+
+def in_namespace(queryset: QuerySet, field: str, namespace: str) -> QuerySet:
+    """Filters the queryset to the rows where the field starts with the
+    namespace, but not with the URI of another vocabulary inside it."""
+    # "__startswith" can use an index to narrow down the rows
+    queryset = queryset.filter(**{f'{field}__startswith': namespace}).filter(starts_with(field, namespace))
+    for uri in nested_namespaces(namespace):
+        queryset = queryset.exclude(starts_with(field, uri))
+    return queryset
+
+
+def in_namespace_sql(column: str, namespace: str) -> tuple[str, list[Any]]:
+    """Returns the condition of `in_namespace()` as SQL (and its parameters)
+    for a column of a raw query."""
+    sql = f'SUBSTR({column}, 1, %s) = %s'
+    params = [len(namespace), namespace]
+    for uri in nested_namespaces(namespace):
+        sql += f' AND SUBSTR({column}, 1, %s) <> %s'
+        params += [len(uri), uri]
+    return sql, params
+
+
+def rewrite_namespace(old_uri: str, new_uri: str, dry_run: bool = False) -> NamespaceRewrite:
+    """Changes the URI of the vocabulary with the old URI to the new one,
+    and replaces the old URI with the new one at the start of every URI
+    property value and predicate URI, in any vocabulary, with a single
+    UPDATE per table in one transaction. With `dry_run`, only counts what
+    would change.
+
+    Raises ValueError if there is no vocabulary with the old URI, or if the
+    new URI is invalid or already used by another vocabulary or predicate."""
+    try:
+        VocabularyURIValidator()(new_uri)
+    except ValidationError as e:
+        raise ValueError(f'Invalid URI "{new_uri}": {" ".join(e.messages)}') from e
+    if new_uri == old_uri:
+        raise ValueError('The new URI is the same as the old one')
+
+    with transaction.atomic():
+        try:
+            vocabulary = Vocabulary.objects.select_for_update().get(uri=old_uri)
+        except Vocabulary.DoesNotExist as e:
+            raise ValueError(f'No vocabulary with the URI "{old_uri}"') from e
+        # including deleted vocabularies, which keep their URIs
+        if Vocabulary.all_objects.filter(uri=new_uri).exists():
+            raise ValueError(f'There is already a vocabulary with the URI "{new_uri}"')
+
+        properties = in_namespace(live_and_deleted_uri_properties(), 'value', old_uri)
+        predicates = in_namespace(Predicate.objects.all(), 'uri', old_uri)
+        conflicts = Predicate.objects.filter(
+            Exists(predicates.filter(object_type=OuterRef('object_type')).filter(
+                Exact(rewritten('uri', old_uri, new_uri), OuterRef('uri'))
+            ))
+        )
+        if conflicts.exists():
+            raise ValueError(
+                f'Predicates already exist with the new URIs: {", ".join(conflicts.values_list("uri", flat=True))}'
+            )
+
+        vocabularies = affected_vocabularies(vocabulary, properties, predicates)
+        result = NamespaceRewrite(
+            old_uri=old_uri,
+            new_uri=new_uri,
+            properties=properties.count(),
+            predicates=predicates.count(),
+            vocabularies=vocabularies,
+        )
+        if dry_run:
+            return result
+
+        timestamp = datetime.now(timezone.utc)
+        properties.update(value=rewritten('value', old_uri, new_uri), modified=timestamp)
+        predicates.update(uri=rewritten('uri', old_uri, new_uri), modified=timestamp)
+        Vocabulary.objects.filter(pk=vocabulary.pk).update(uri=new_uri)
+        mark_changed(vocabularies, result.predicates, timestamp)
+
+    logger.info(
+        f'Changed namespace {old_uri} to {new_uri}: {result.properties} property value(s) and '
+        f'{result.predicates} predicate(s) in {len(vocabularies)} vocabulary(ies)'
+    )
+    return result
+
+
+def switch(field: str, mapping: dict[str, str]) -> Case:
+    """Expression for the value in the mapping for each value of the field,
+    or else the field's own value."""
+    return Case(*(When(**{field: old}, then=Value(new)) for old, new in mapping.items()), default=F(field))
+
+
+def check_renames(vocabulary: Vocabulary, names: dict[str, str]):
+    name_field = Term._meta.get_field('name')
+    existing = set(vocabulary.terms.values_list('name', flat=True))
+    new_names = {}
+    errors = {}
+    for old, new in names.items():
+        messages = []
+        if old not in existing:
+            messages.append(f'No term named "{old}" in this vocabulary')
+        try:
+            name_field.clean(new, None)
+        except ValidationError as e:
+            messages.extend(e.messages)
+        else:
+            # renaming terms to each other's names (or in a chain) is not
+            # supported, since the unique constraint is checked row by row
+            if new in existing:
+                messages.append(f'A term with the name "{new}" already exists in this vocabulary')
+            elif new in new_names:
+                messages.append(f'"{new_names[new]}" is also being renamed to "{new}"')
+            new_names.setdefault(new, old)
+        if messages:
+            errors[old] = messages
+    if errors:
+        raise RenameError(errors)
+
+
+def rename_terms(vocabulary: Vocabulary, names: dict[str, str], dry_run: bool = False) -> TermRename:
+    """Renames the vocabulary's terms from the old to the new names in the
+    mapping, and replaces the old term URIs with the new ones in every URI
+    property value and predicate URI, in any vocabulary. Each table is
+    updated with one UPDATE per batch of renames, in one transaction. With
+    `dry_run`, only counts what would change.
+
+    Raises RenameError with the errors for each old name if any rename is
+    invalid."""
+    names = {old: new for old, new in names.items() if old != new}
+
+    with transaction.atomic():
+        # one rename at a time per vocabulary
+        vocabulary = Vocabulary.objects.select_for_update().get(pk=vocabulary.pk)
+        check_renames(vocabulary, names)
+        uris = {vocabulary.uri + old: vocabulary.uri + new for old, new in names.items()}
+
+        properties = live_and_deleted_uri_properties().filter(value__in=uris)
+        predicates = Predicate.objects.filter(uri__in=uris)
+        renamed = {(uris[uri], object_type) for uri, object_type in predicates.values_list('uri', 'object_type')}
+        conflicts = renamed & set(Predicate.objects.filter(uri__in=uris.values()).values_list('uri', 'object_type'))
+        if conflicts:
+            old_names = {vocabulary.uri + new: old for old, new in names.items()}
+            raise RenameError({
+                old_names[uri]: [f'A predicate with the URI "{uri}" already exists'] for uri, _ in conflicts
+            })
+
+        vocabularies = affected_vocabularies(vocabulary, properties, predicates)
+        result = TermRename(
+            names=names,
+            properties=properties.count(),
+            predicates=predicates.count(),
+            vocabularies=vocabularies,
+        )
+        if dry_run:
+            return result
+
+        timestamp = datetime.now(timezone.utc)
+        items = list(names.items())
+        for start in range(0, len(items), BATCH_SIZE):
+            batch = dict(items[start:start + BATCH_SIZE])
+            batch_uris = {vocabulary.uri + old: vocabulary.uri + new for old, new in batch.items()}
+            Term.objects.filter(vocabulary=vocabulary, name__in=batch).update(
+                name=switch('name', batch),
+                modified=timestamp,
+            )
+            live_and_deleted_uri_properties().filter(value__in=batch_uris).update(
+                value=switch('value', batch_uris),
+                modified=timestamp,
+            )
+            Predicate.objects.filter(uri__in=batch_uris).update(uri=switch('uri', batch_uris), modified=timestamp)
+        mark_changed(vocabularies, result.predicates, timestamp)
+
+    logger.info(
+        f'Renamed {len(names)} term(s) in {vocabulary}: {result.properties} property value(s) and '
+        f'{result.predicates} predicate(s) in {len(vocabularies)} vocabulary(ies)'
+    )
+    return result
@@ -0,0 +1,262 @@
+"""Label matching for the reconciliation service.
+
+Implements the matching side of the OpenRefine Reconciliation API: an
+in-memory index of normalized term labels and their character trigrams,
+queried in batches."""
+
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from threading import RLock
+from typing import Any, Iterable, NamedTuple
+
+from plastron.namespaces import dc, dcterms, foaf, rdfs, schema, skos
+
+from vocabs.events import ChangeEvent
+from vocabs.models import Property, Term, Vocabulary, predicate_registry
+
+logger = logging.getLogger(__name__)
+
+LABEL_PREDICATES = [
+    rdfs.label,
+    skos.prefLabel,
+    skos.altLabel,
+    skos.hiddenLabel,
+    dc.title,
+    dcterms.title,
+    schema.name,
+    foaf.name,
+]
+"""Literal-valued predicates whose values are indexed as term labels."""
+
+LABEL_PREDICATE_URIS = {str(p) for p in LABEL_PREDICATES}
+
+# labels from these predicates are preferred when choosing a display name
+PREFERRED_LABEL_PREDICATES = {str(rdfs.label), str(skos.prefLabel)}
+
+
+def normalize(label: str) -> str:
+    """Case-folds the label, strips accents, splits camelCase words, and
+    collapses all runs of punctuation and whitespace to a single space."""
+    label = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', label)
+    decomposed = unicodedata.normalize('NFKD', label)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(re.split(r'[\W_]+', stripped.casefold())).strip()
+
+
+def trigrams(normalized: str) -> set[str]:
+    padded = f'  {normalized} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LabelEntry(NamedTuple):
+    term_id: int
+    vocabulary_id: int
+    uri: str
+    label: str
+    normalized: str
+    size: int
+    """Number of distinct trigrams in the normalized label."""
+
+
+class Candidate(NamedTuple):
+    uri: str
+    label: str
+    vocabulary_id: int
+    score: float
+    match: bool
+
+
+class ReconciliationQuery(NamedTuple):
+    query: str
+    vocabulary_id: int | None = None
+    limit: int = 5
+
+
+class LabelIndex:
+    """Trigram index over normalized labels.
+
+    Built lazily on the first query, and discarded whenever a term, property,
+    or vocabulary changes."""
+
+    def __init__(self):
+        self._lock = RLock()
+        self._entries: list[LabelEntry] | None = None
+        self._postings: dict[str, list[int]] = {}
+        self._exact: dict[str, list[int]] = {}
+        self._names: dict[int, str] = {}
+
+    def handle_change(self, event: ChangeEvent):
+        if event.model == 'Property' and event.predicate_id is not None:
+            # the registry knows the predicate without a query
+            predicate = predicate_registry.get(event.predicate_id)
+            if predicate is not None and predicate.uri not in LABEL_PREDICATE_URIS:
+                return
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._entries = None
+            self._postings = {}
+            self._exact = {}
+            self._names = {}
+
+    @property
+    def is_built(self) -> bool:
+        return self._entries is not None
+
+    def _build(self):
+        entries = []
+        names = {}
+        terms = Term.objects.values_list('id', 'vocabulary_id', 'vocabulary__uri', 'name')
+        for term_id, vocabulary_id, vocabulary_uri, name in terms:
+            names[term_id] = name
+            entries.append((term_id, vocabulary_id, vocabulary_uri + name, name))
+        labels = Property.objects.filter(
+            predicate__uri__in=LABEL_PREDICATE_URIS,
+            term__deleted__isnull=True,
+        ).values_list(
+            'term_id', 'term__vocabulary_id', 'term__vocabulary__uri', 'term__name', 'predicate__uri', 'value'
+        )
+        for term_id, vocabulary_id, vocabulary_uri, name, predicate_uri, value in labels:
+            if predicate_uri in PREFERRED_LABEL_PREDICATES and names.get(term_id) == name:
+                names[term_id] = value
+            entries.append((term_id, vocabulary_id, vocabulary_uri + name, value))
+
+        self._entries = []
+        self._postings = defaultdict(list)
+        self._exact = defaultdict(list)
+        for term_id, vocabulary_id, uri, label in entries:
+            normalized = normalize(label)
+            if not normalized:
+                continue
+            grams = trigrams(normalized)
+            index = len(self._entries)
+            self._entries.append(LabelEntry(term_id, vocabulary_id, uri, label, normalized, len(grams)))
+            self._exact[normalized].append(index)
+            for gram in grams:
+                self._postings[gram].append(index)
+        self._names = names
+        logger.debug(f'Built label index with {len(self._entries)} labels and {len(self._postings)} trigrams')
+
+    def match(self, queries: dict[str, ReconciliationQuery], min_score: float = 30.0) -> dict[str, list[Candidate]]:
+        """Returns scored candidates for each query in the batch.
+
+        The trigrams of all the queries are gathered first, and each posting
+        list in the index is then read once for the whole batch, no matter
+        how many of the queries share that trigram."""
+        with self._lock:
+            if self._entries is None:
+                self._build()
+            entries, postings, exact, names = self._entries, self._postings, self._exact, self._names
+
+        normalized = {key: normalize(q.query) for key, q in queries.items()}
+        grams = {key: trigrams(n) if n else set() for key, n in normalized.items()}
+
+        queries_by_gram: dict[str, list[str]] = defaultdict(list)
+        for key, query_grams in grams.items():
+            for gram in query_grams:
+                queries_by_gram[gram].append(key)
+
+        overlaps: dict[str, dict[int, int]] = {key: defaultdict(int) for key in queries}
+        for gram, keys in queries_by_gram.items():
+            for index in postings.get(gram, ()):
+                for key in keys:
+                    overlaps[key][index] += 1
+
+        results = {}
+        for key, query in queries.items():
+            exact_matches = set(exact.get(normalized[key], ())) if normalized[key] else set()
+            best: dict[int, Candidate] = {}
+            for index, overlap in overlaps[key].items():
+                entry = entries[index]
+                if query.vocabulary_id is not None and entry.vocabulary_id != query.vocabulary_id:
+                    continue
+                is_exact = index in exact_matches
+                score = 100.0 if is_exact else round(200.0 * overlap / (len(grams[key]) + entry.size), 1)
+                if score < min_score:
+                    continue
+                if entry.term_id not in best or score > best[entry.term_id].score:
+                    best[entry.term_id] = Candidate(
+                        uri=entry.uri,
+                        label=names.get(entry.term_id, entry.label),
+                        vocabulary_id=entry.vocabulary_id,
+                        score=score,
+                        match=is_exact,
+                    )
+            candidates = sorted(best.values(), key=lambda c: (-c.score, c.uri))[:query.limit]
+            # only claim a match when it is unambiguous
+            if sum(1 for c in candidates if c.match) > 1:
+                candidates = [c._replace(match=False) for c in candidates]
+            results[key] = candidates
+        return results
+
+
+label_index = LabelIndex()
+
+
+def parse_queries(
+    raw_queries: dict[str, Any],
+    vocabularies: dict[str, int],
+    vocabulary_id: int | None = None,
+) -> dict[str, ReconciliationQuery]:
+    """Converts the "queries" object of a reconciliation request into
+    ReconciliationQuery objects. The query "type", if given, must be the URI
+    of a vocabulary. Raises ValueError if the queries are malformed."""
+    if not isinstance(raw_queries, dict):
+        raise ValueError('queries must be a JSON object')
+    queries = {}
+    for key, raw_query in raw_queries.items():
+        if not isinstance(raw_query, dict) or not isinstance(raw_query.get('query'), str):
+            raise ValueError(f'query "{key}" must be an object with a "query" string')
+        query_vocabulary_id = vocabulary_id
+        query_type = raw_query.get('type')
+        if query_type and vocabulary_id is None:
+            if query_type not in vocabularies:
+                raise ValueError(f'query "{key}" has an unknown type: {query_type}')
+            query_vocabulary_id = vocabularies[query_type]
+        try:
+            limit = max(1, min(int(raw_query.get('limit', 5)), 100))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'query "{key}" has an invalid limit') from e
+        queries[key] = ReconciliationQuery(query=raw_query['query'], vocabulary_id=query_vocabulary_id, limit=limit)
+    return queries
+
+
+def reconcile(
+    raw_queries: dict[str, Any],
+    vocabulary_id: int | None = None,
+) -> dict[str, dict[str, list[dict[str, Any]]]]:
+    """Answers a batch of reconciliation queries in the OpenRefine format."""
+    vocabularies = {vocab.id: vocab for vocab in Vocabulary.objects.all()}
+    queries = parse_queries(raw_queries, {v.uri: v.id for v in vocabularies.values()}, vocabulary_id)
+    results = label_index.match(queries)
+    return {
+        key: {
+            'result': [
+                {
+                    'id': c.uri,
+                    'name': c.label,
+                    'score': c.score,
+                    'match': c.match,
+                    'type': [{'id': vocabularies[c.vocabulary_id].uri, 'name': vocabularies[c.vocabulary_id].label}],
+                }
+                for c in candidates
+                if c.vocabulary_id in vocabularies
+            ]
+        }
+        for key, candidates in results.items()
+    }
+
+
+def service_manifest(vocabularies: Iterable[Vocabulary]) -> dict[str, Any]:
+    return {
+        'versions': ['0.2'],
+        'name': 'Grove',
+        'identifierSpace': 'http://www.w3.org/2000/01/rdf-schema#Resource',
+        'schemaSpace': 'http://www.w3.org/2000/01/rdf-schema#Class',
+        'defaultTypes': [{'id': vocab.uri, 'name': vocab.label} for vocab in vocabularies],
+        'view': {'url': '{{id}}'},
+        'batchSize': 100,
+    }
@@ -0,0 +1,64 @@
+"""Resolve many term URIs to their properties using a fixed number of queries."""
+
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from typing import Any, Iterable
+
+from django.db.models import Q
+
+from vocabs.curies import curie_codec
+from vocabs.models import Property, Term, Vocabulary
+
+
+def split_term_uri(uri: str) -> tuple[str, str]:
+    """Splits a term URI into its vocabulary URI and term name.
+
+    Vocabulary URIs always end with "/" or "#", and term names may contain
+    neither, so the split is at the last occurrence of either character."""
+    index = max(uri.rfind('#'), uri.rfind('/')) + 1
+    return uri[:index], uri[index:]
+
+
+def expand_predicates(predicates: Iterable[str]) -> list[str]:
+    """Expands a list of predicate CURIEs or URIs to full URIs."""
+    return [curie_codec.expand(predicate) for predicate in predicates]
+
+
+def resolve_terms(uris: Iterable[str], predicates: Iterable[str] | None = None) -> dict[str, Any]:
+    """Returns the properties of each of the given term URIs, optionally
+    restricted to the given predicates (CURIEs or URIs).
+
+    The URIs are grouped by vocabulary URI, so this runs exactly three
+    queries no matter how many URIs are requested: one for the vocabularies,
+    one for the terms, and one for their properties."""
+    uris = list(dict.fromkeys(uris))
+    vocab_ids = {uri: pk for pk, uri in Vocabulary.objects.values_list('id', 'uri')}
+
+    names_by_vocab: dict[int, set[str]] = defaultdict(set)
+    for uri in uris:
+        vocab_uri, name = split_term_uri(uri)
+        if vocab_uri in vocab_ids and name:
+            names_by_vocab[vocab_ids[vocab_uri]].add(name)
+
+    results: dict[str, dict[str, Any]] = {}
+    if names_by_vocab:
+        condition = reduce(or_, (Q(vocabulary_id=pk, name__in=names) for pk, names in names_by_vocab.items()))
+        terms = {
+            term.id: term
+            for term in Term.objects.filter(condition).select_related('vocabulary')
+        }
+        for term in terms.values():
+            results[term.uri] = {'vocabulary': term.vocabulary.uri, 'name': term.name, 'properties': {}}
+
+        properties = Property.objects.filter(term_id__in=terms.keys()).select_related('predicate').order_by('id')
+        if predicates is not None:
+            properties = properties.filter(predicate__uri__in=expand_predicates(predicates))
+        for prop in properties:
+            values = results[terms[prop.term_id].uri]['properties'].setdefault(str(prop.predicate), [])
+            values.append(prop.value)
+
+    return {
+        'results': results,
+        'not_found': [uri for uri in uris if uri not in results],
+    }
@@ -0,0 +1,338 @@
+"""Read-only SPARQL queries over an in-memory dataset of all vocabularies.
+
+The dataset has one named graph per vocabulary, with the vocabulary URI as
+the graph name, and the default graph is the union of all of them. It is
+built from the database on the first query, and after that only the terms
+and vocabularies that have changed are reloaded."""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Iterable, NamedTuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+from plastron.namespaces import dc, namespace_manager
+from rdflib import Dataset, Graph, Literal, URIRef
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.algebra import traverse
+from rdflib.plugins.sparql.parserutils import CompValue
+from rdflib.plugins.sparql.sparql import Query
+from rdflib.plugins.stores.memory import Memory
+from rdflib.query import Result
+
+from vocabs.curies import curie_codec
+from vocabs.events import ChangeEvent
+from vocabs.models import Property, Term, Vocabulary, property_rows, rdf_node
+
+logger = logging.getLogger(__name__)
+
+RESULT_FORMATS = {
+    'SELECT': [
+        ('application/sparql-results+json', 'json'),
+        ('application/sparql-results+xml', 'xml'),
+        ('text/csv', 'csv'),
+        ('text/tab-separated-values', 'tsv'),
+    ],
+    'CONSTRUCT': [
+        ('text/turtle', 'turtle'),
+        ('application/n-triples', 'nt'),
+        ('application/rdf+xml', 'xml'),
+        ('application/ld+json', 'json-ld'),
+    ],
+}
+"""Supported media types and their rdflib serializer names, by query type.
+The first entry for each query type is the default."""
+
+RESULT_FORMATS['ASK'] = RESULT_FORMATS['SELECT'][:2]
+RESULT_FORMATS['DESCRIBE'] = RESULT_FORMATS['CONSTRUCT']
+
+
+class QueryError(ValueError):
+    """The query could not be parsed, or is not a read-only query."""
+
+
+class QueryTimeout(Exception):
+    """The query did not finish within the time limit."""
+
+
+class QueryResult(NamedTuple):
+    result: Result
+    truncated: bool = False
+    """True if there were more results than the result limit allows."""
+
+    @property
+    def type(self) -> str:
+        return self.result.type
+
+    def serialize(self, accept: str = '') -> tuple[bytes, str]:
+        """Serializes the result in the first supported media type that
+        appears in the given Accept header value, or in the default format for
+        the query type. Returns the serialized result and its media type."""
+        formats = RESULT_FORMATS[self.type]
+        media_type, fmt = next(((m, f) for m, f in formats if m in accept), formats[0])
+        if self.type in ('CONSTRUCT', 'DESCRIBE'):
+            return self.result.graph.serialize(format=fmt, encoding='utf-8'), media_type
+        return self.result.serialize(format=fmt, encoding='utf-8'), media_type
+
+
+def parse_query(query_string: str) -> Query:
+    """Parses a SPARQL query. All namespace prefixes known to Grove may be
+    used without declaring them. SPARQL Update requests are not queries, and
+    are rejected by the parser.
+
+    Queries may only read the vocabularies, so SERVICE patterns and FROM (or
+    FROM NAMED) clauses are rejected, since rdflib would fetch their URLs
+    from the server."""
+    try:
+        query = prepareQuery(query_string, initNs=curie_codec.prefixes)
+    except Exception as e:
+        raise QueryError(str(e)) from e
+
+    if query.algebra.get('datasetClause'):
+        raise QueryError('FROM and FROM NAMED are not supported; every vocabulary is already a named graph')
+    services = []
+    traverse(query.algebra, visitPre=lambda node: (
+        services.append(node) if isinstance(node, CompValue) and node.name == 'ServiceGraphPattern' else None
+    ))
+    if services:
+        raise QueryError('SERVICE is not supported')
+    return query
+
+
+def term_rows(terms: QuerySet) -> tuple[list[tuple], list[tuple]]:
+    """Loads the given terms and their properties, reading each distinct
+    property value once."""
+    term_values = list(terms.values_list('id', 'vocabulary_id', 'vocabulary__uri', 'name'))
+    property_values = property_rows(Property.objects.filter(term__in=terms))
+    return term_values, property_values
+
+
+class DeadlineStore(Memory):
+    """In-memory triple store that gives up on reading triples once the
+    deadline of the query being evaluated has passed. Every step of a
+    query's evaluation reads triples from the store, so this stops a query
+    wherever it is, and not only between result rows."""
+
+    def __init__(self):
+        super().__init__()
+        self.deadline: float | None = None
+
+    def _check_deadline(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise QueryTimeout()
+
+    def triples(self, triple_pattern, context=None):
+        self._check_deadline()
+        for item in super().triples(triple_pattern, context):
+            self._check_deadline()
+            yield item
+
+
+class VocabularyDataset:
+    """An rdflib Dataset that follows the database.
+
+    Changes to terms, properties, and vocabularies are recorded from change
+    events when their transaction commits, and applied just
+    before the next query runs: a changed term has its triples removed and
+    reloaded, and a changed vocabulary has its whole graph reloaded.
+
+    Queries run on a single worker thread, so a slow query holds up other
+    queries but never more than one of the server's request threads. A
+    query that reaches the time limit is stopped (see `DeadlineStore`), which
+    frees the worker thread and the dataset for the next query. The dataset
+    is only modified while no query is running."""
+
+    def __init__(self):
+        # guards the dataset; held while a query runs or changes are applied
+        self._lock = Lock()
+        # guards the records of pending changes, which signal handlers update
+        self._pending_lock = Lock()
+        self._dataset: Dataset | None = None
+        self._graph_names: dict[int, URIRef] = {}
+        self._subjects: dict[int, tuple[int, URIRef]] = {}
+        self._stale = True
+        self._changed_terms: set[int] = set()
+        self._changed_vocabularies: set[int] = set()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def reset(self):
+        """Discards the dataset; it is rebuilt before the next query."""
+        with self._pending_lock:
+            self._stale = True
+            self._changed_terms.clear()
+            self._changed_vocabularies.clear()
+
+    @property
+    def is_built(self) -> bool:
+        return self._dataset is not None and not self._stale
+
+    def _record(self, term_ids: Iterable[int] = (), vocabulary_ids: Iterable[int] = ()):
+        with self._pending_lock:
+            self._changed_terms.update(term_ids)
+            self._changed_vocabularies.update(vocabulary_ids)
+
+    def invalidate_terms(self, term_ids: Iterable[int]):
+        """Reloads the given terms before the next query, once the current
+        transaction (if any) has committed."""
+        term_ids = list(term_ids)
+        transaction.on_commit(lambda: self._record(term_ids=term_ids))
+
+    def invalidate_vocabulary(self, vocabulary_id: int):
+        """Reloads the graph of the given vocabulary before the next query,
+        once the current transaction (if any) has committed."""
+        transaction.on_commit(lambda: self._record(vocabulary_ids=[vocabulary_id]))
+
+    def handle_change(self, event: ChangeEvent):
+        if event.model in ('Term', 'Property'):
+            self.invalidate_terms([event.term_id])
+        elif event.model == 'Vocabulary':
+            # bulk changes, and the coalesced changes of other processes,
+            # may affect several vocabularies
+            for vocabulary_id in event.vocabulary_ids or (event.object_id,):
+                self.invalidate_vocabulary(vocabulary_id)
+        else:
+            # changing a predicate's object type changes the nodes of all its values
+            self.reset()
+
+    def _add_terms(self, terms: QuerySet):
+        term_values, property_values = term_rows(terms)
+        for term_id, vocabulary_id, vocabulary_uri, name in term_values:
+            if vocabulary_id not in self._graph_names:
+                continue
+            subject = URIRef(vocabulary_uri + name)
+            self._subjects[term_id] = (vocabulary_id, subject)
+            self._dataset.graph(self._graph_names[vocabulary_id]).add((subject, dc.identifier, Literal(name)))
+        for term_id, predicate_uri, object_type, value in property_values:
+            if term_id not in self._subjects:
+                # rows created between the two queries are picked up on the next update
+                continue
+            vocabulary_id, subject = self._subjects[term_id]
+            self._dataset.graph(self._graph_names[vocabulary_id]).add(
+                (subject, URIRef(predicate_uri), rdf_node(value, object_type))
+            )
+
+    def _remove_term(self, term_id: int):
+        if term_id in self._subjects:
+            vocabulary_id, subject = self._subjects.pop(term_id)
+            self._dataset.graph(self._graph_names[vocabulary_id]).remove((subject, None, None))
+
+    def _add_vocabularies(self, vocabularies: Iterable[Vocabulary]) -> list[int]:
+        ids = []
+        for vocabulary in vocabularies:
+            graph_name = URIRef(vocabulary.uri)
+            self._graph_names[vocabulary.id] = graph_name
+            graph = self._dataset.graph(graph_name)
+            for triple in vocabulary.metadata_triples():
+                graph.add(triple)
+            ids.append(vocabulary.id)
+        return ids
+
+    def _remove_vocabulary(self, vocabulary_id: int):
+        graph_name = self._graph_names.pop(vocabulary_id, None)
+        if graph_name is not None:
+            self._dataset.remove_graph(self._dataset.graph(graph_name))
+        self._subjects = {k: v for k, v in self._subjects.items() if v[0] != vocabulary_id}
+
+    def _build(self):
+        self._dataset = Dataset(store=DeadlineStore(), default_union=True)
+        self._graph_names = {}
+        self._subjects = {}
+        self._add_vocabularies(Vocabulary.objects.all())
+        self._add_terms(Term.objects.all())
+        logger.info(f'Built SPARQL dataset with {len(self._graph_names)} graphs and {len(self._subjects)} terms')
+
+    def _update(self):
+        with self._pending_lock:
+            stale, self._stale = self._stale, False
+            term_ids, self._changed_terms = self._changed_terms, set()
+            vocabulary_ids, self._changed_vocabularies = self._changed_vocabularies, set()
+
+        if stale or self._dataset is None:
+            self._build()
+            return
+
+        if vocabulary_ids:
+            for vocabulary_id in vocabulary_ids:
+                self._remove_vocabulary(vocabulary_id)
+            reloaded = self._add_vocabularies(Vocabulary.objects.filter(id__in=vocabulary_ids))
+            self._add_terms(Term.objects.filter(vocabulary_id__in=reloaded))
+        term_ids = {
+            term_id for term_id in term_ids
+            if self._subjects.get(term_id, (None,))[0] not in vocabulary_ids
+        }
+        if term_ids:
+            for term_id in term_ids:
+                self._remove_term(term_id)
+            self._add_terms(Term.objects.filter(id__in=term_ids, vocabulary_id__in=self._graph_names.keys()))
+        logger.debug(f'Updated SPARQL dataset: {len(vocabulary_ids)} vocabularies, {len(term_ids)} terms')
+
+    def _evaluate(self, query: Query, max_results: int, deadline: float) -> QueryResult:
+        with self._lock:
+            self._dataset.store.deadline = deadline
+            try:
+                return self._limit(self._dataset.query(query), max_results)
+            finally:
+                self._dataset.store.deadline = None
+
+    @staticmethod
+    def _limit(result: Result, max_results: int) -> QueryResult:
+        if result.type == 'ASK':
+            return QueryResult(result)
+
+        limited = Result(result.type)
+        truncated = False
+        if result.type == 'SELECT':
+            limited.vars = result.vars
+            limited.bindings = []
+            for row in result:
+                if len(limited.bindings) >= max_results:
+                    truncated = True
+                    break
+                limited.bindings.append({var: value for var, value in zip(result.vars, row) if value is not None})
+        else:
+            limited.graph = Graph(namespace_manager=namespace_manager)
+            for triple in result.graph:
+                if len(limited.graph) >= max_results:
+                    truncated = True
+                    break
+                limited.graph.add(triple)
+        return QueryResult(limited, truncated)
+
+    def query(self, query_string: str, timeout: float, max_results: int) -> QueryResult:
+        """Runs a read-only query, returning at most `max_results` rows (or
+        triples, for CONSTRUCT and DESCRIBE queries).
+
+        Raises QueryError if the query is invalid or fails to evaluate, and
+        QueryTimeout if it cannot be answered within `timeout` seconds."""
+        query = parse_query(query_string)
+        deadline = time.monotonic() + timeout
+
+        # pending changes are applied on the calling thread, since the
+        # worker thread has no database connection of its own
+        if not self._lock.acquire(timeout=timeout):
+            raise QueryTimeout()
+        try:
+            self._update()
+        finally:
+            self._lock.release()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sparql')
+        future = self._executor.submit(self._evaluate, query, max_results, deadline)
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError as e:
+            future.cancel()
+            logger.warning(f'SPARQL query timed out after {timeout} seconds')
+            raise QueryTimeout() from e
+        except QueryTimeout:
+            raise
+        except Exception as e:
+            # e.g., rdflib type errors, for operators applied to the wrong kind of value
+            logger.warning(f'SPARQL query failed: {e.__class__.__name__}: {e}', exc_info=True)
+            raise QueryError(f'{e.__class__.__name__}: {e}') from e
+
+
+vocabulary_dataset = VocabularyDataset()
@@ -0,0 +1,98 @@
+"""Opens uploaded RDF files for parsing as streams, so that large files are
+never held in memory whole: Django spools uploads larger than
+FILE_UPLOAD_MAX_MEMORY_SIZE to a temporary file, which is parsed straight
+from disk, and gzip- or bzip2-compressed files are decompressed as they
+are read."""
+
+import bz2
+import gzip
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import IO
+
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from rdflib.util import guess_format
+
+from vocabs.models import VocabularyImportError
+
+AUTO_FORMAT = 'auto'
+
+DECOMPRESSORS = {
+    b'\x1f\x8b': gzip.open,
+    b'BZh': bz2.open,
+}
+"""Opener for each compressed format, by its magic number."""
+
+GUESSED_FORMATS = {
+    'json-ld': 'json-ld',
+    'turtle': 'turtle',
+    'xml': 'rdfxml',
+    'nt': 'ntriples',
+}
+"""Keys of VOCAB_FORMAT_LABELS, by the formats rdflib guesses from file names."""
+
+SNIFF_SIZE = 4096
+
+NTRIPLES_LINE = re.compile(r'(<[^>\s]*>|_:\S+)\s+<[^>\s]*>\s+.*\.\s*')
+
+
+def peek(stream: IO[bytes], size: int) -> bytes:
+    """Returns up to `size` bytes from the start of a stream that has not
+    been read yet, without consuming them."""
+    if hasattr(stream, 'peek'):
+        return stream.peek(size)[:size]
+    head = stream.read(size)
+    stream.seek(0)
+    return head
+
+
+def sniff_format(stream: IO[bytes], name: str) -> str:
+    """Guesses the RDF format of an uncompressed stream, from the file name
+    (without any compression suffix) or, failing that, from its first few
+    kilobytes. Turtle is the fallback, since it is a superset of N-Triples."""
+    name = re.sub(r'\.(gz|bz2)$', '', name.lower())
+    guessed = GUESSED_FORMATS.get(guess_format(name) or '')
+    if guessed is not None:
+        return guessed
+
+    head = peek(stream, SNIFF_SIZE).decode('utf-8', errors='ignore').lstrip('\ufeff \t\r\n')
+    if head.startswith(('{', '[')):
+        return 'json-ld'
+    if head.startswith('<?xml') or re.match(r'<([\w.-]+:)?RDF\b', head):
+        return 'rdfxml'
+    # only whole lines, since the last one may be cut off
+    lines = [line for line in head.splitlines()[:-1] if line.strip() and not line.startswith('#')]
+    if lines and all(NTRIPLES_LINE.fullmatch(line.strip()) for line in lines):
+        return 'ntriples'
+    return 'turtle'
+
+
+@contextmanager
+def open_upload(upload: UploadedFile, rdf_format: str = AUTO_FORMAT) -> Iterator[tuple[IO[bytes], str]]:
+    """Opens an uploaded file for parsing, and yields the stream and the RDF
+    format. The stream reads from the temporary file of a spooled upload,
+    decompresses gzip and bzip2 data, and is closed afterward. With
+    `AUTO_FORMAT`, the format is guessed with `sniff_format()`.
+
+    Raises VocabularyImportError if the compressed data is invalid."""
+    if isinstance(upload, TemporaryUploadedFile):
+        raw = open(upload.temporary_file_path(), 'rb')
+    else:
+        upload.seek(0)
+        raw = upload.file
+    try:
+        stream = raw
+        head = peek(raw, 3)
+        for magic, decompress in DECOMPRESSORS.items():
+            if head.startswith(magic):
+                stream = decompress(raw)
+                break
+        try:
+            if rdf_format == AUTO_FORMAT:
+                rdf_format = sniff_format(stream, upload.name or '')
+        except (OSError, EOFError) as e:
+            raise VocabularyImportError(f'Invalid compressed file: {e}') from e
+        yield stream, rdf_format
+    finally:
+        raw.close()
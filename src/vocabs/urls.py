@@ -3,7 +3,11 @@ from django.urls import path
 
 from vocabs.views import (GraphView, IndexView, NewPropertyView, PredicatesView, PrefixList, PropertyEditView,
                           PropertyView, TermView, VocabularyView, ImportFormView, VocabularyStatusView,
-                          RootView, VocabularyPublicationFormView, NewTermFormView,
+                          RootView, VocabularyPublicationFormView, NewTermFormView, AutocompleteView,
+                          ResolveTermsView, ReconcileView, ReferencesView, BatchEditView,
+                          VocabulariesAPIView, TermsAPIView, PredicatesAPIView, SparqlView, CacheStatsView,
+                          TermUploadView, TermRenameView, CloneFormView, TermsDeleteView, DeletionsView,
+                          DatasetImportView,
                           )
 
 urlpatterns = [
@@ -11,16 +15,35 @@ urlpatterns = [
     path('vocabs/', IndexView.as_view(), name='list_vocabularies'),
     path('vocabs/<int:pk>', VocabularyView.as_view(), name='show_vocabulary'),
     path('vocabs/<int:pk>/graph', GraphView.as_view(), name='show_graph'),
+    path('vocabs/<int:pk>/batch', BatchEditView.as_view(), name='batch_edit'),
+    path('vocabs/<int:pk>/upload', TermUploadView.as_view(), name='upload_terms'),
+    path('vocabs/<int:pk>/rename', TermRenameView.as_view(), name='rename_terms'),
+    path('vocabs/<int:pk>/clone', CloneFormView.as_view(), name='clone_vocabulary'),
+    path('vocabs/<int:pk>/terms/delete', TermsDeleteView.as_view(), name='delete_terms'),
+    path('vocabs/<int:pk>/deletions', DeletionsView.as_view(), name='vocabulary_deletions'),
     path('vocabs/<int:pk>/status', VocabularyStatusView.as_view(), name='vocabulary_status'),
     path('vocabs/<int:pk>/forms/publication', VocabularyPublicationFormView.as_view(), name='publication_form'),
     path('vocabs/<int:pk>/forms/term', NewTermFormView.as_view(), name='new_term_form'),
+    path('vocabs/<int:pk>/reconcile', ReconcileView.as_view(), name='reconcile_vocabulary'),
     path('terms/<int:pk>', TermView.as_view(), name='show_term'),
+    path('terms/<int:pk>/references', ReferencesView.as_view(), name='term_references'),
+    path('terms/resolve', ResolveTermsView.as_view(), name='resolve_terms'),
+    path('references', ReferencesView.as_view(), name='references'),
     path('properties/new', NewPropertyView.as_view(), name='new_property'),
     path('properties/<int:pk>', PropertyView.as_view(), name='show_property'),
     path('properties/<int:pk>/edit', PropertyEditView.as_view(), name='edit_property'),
+    path('autocomplete', AutocompleteView.as_view(), name='autocomplete'),
+    path('reconcile', ReconcileView.as_view(), name='reconcile'),
+    path('sparql', SparqlView.as_view(), name='sparql'),
+    path('caches', CacheStatsView.as_view(), name='cache_stats'),
     path('predicates', PredicatesView.as_view(), name='list_predicates'),
     path('prefixes', PrefixList.as_view(), name='list_prefixes'),
     path('import', ImportFormView.as_view(), name='import_form'),
+    path('import/dataset', DatasetImportView.as_view(), name='import_dataset'),
+    path('api/vocabularies', VocabulariesAPIView.as_view(), name='api_vocabularies'),
+    path('api/vocabularies/<int:pk>/terms', TermsAPIView.as_view(), name='api_vocabulary_terms'),
+    path('api/terms', TermsAPIView.as_view(), name='api_terms'),
+    path('api/predicates', PredicatesAPIView.as_view(), name='api_predicates'),
 ]
 
 
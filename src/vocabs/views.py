@@ -1,25 +1,47 @@
+import json
 import logging
+from datetime import datetime
 from http import HTTPStatus
 from os.path import basename
+from tarfile import TarError
 from typing import Any, Counter
+from zipfile import BadZipFile
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
 from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
 from django.template.defaultfilters import pluralize
 from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.views.generic import CreateView, DetailView, ListView, UpdateView, TemplateView, FormView
 from django.views.generic.detail import SingleObjectMixin
-from plastron.namespaces import namespace_manager, rdf
 from rdflib.util import from_n3
-
-from vocabs.forms import PropertyForm, NewVocabularyForm, VocabularyForm, ImportForm, TermForm
-from vocabs.models import Predicate, Property, Term, Vocabulary, VOCAB_FORMAT_LABELS, import_vocabulary
+from safedelete.config import HARD_DELETE
+
+from vocabs.api import APIError, PredicateResource, Resource, TermResource, VocabularyResource, page_size, paginate
+from vocabs.autocomplete import autocomplete_index
+from vocabs.bulk import Batch, BatchError, TermTable, clone_vocabulary, deletion_batches, restore_deleted, \
+    soft_delete_terms, soft_delete_vocabularies, sync_vocabulary, import_dataset
+from vocabs.conditional import ConditionalGetMixin, data_version, predicates_version, vocabulary_version
+from vocabs.curies import curie_codec
+from vocabs.datasets import DatasetTooLarge
+from vocabs.forms import PropertyForm, NewVocabularyForm, VocabularyForm, ImportForm, TermForm, TermUploadForm, \
+    TermRenameForm, CloneForm, DatasetImportForm
+from vocabs.fragments import term_row_cache
+from vocabs.graph_cache import graph_cache
+from vocabs.models import Predicate, Property, Term, Vocabulary, VOCAB_FORMAT_LABELS, VocabularyImportError, \
+    import_vocabulary, predicate_registry, rdf_type_predicate, references_to
+from vocabs.namespaces import RenameError, rename_terms, rewrite_namespace
+from vocabs.reconcile import reconcile, service_manifest
+from vocabs.resolve import resolve_terms
+from vocabs.sparql import QueryError, QueryTimeout, vocabulary_dataset
+from vocabs.uploads import open_upload
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +108,7 @@ class PrefixList(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        prefixes = {prefix: uri for prefix, uri in namespace_manager.namespaces()}
+        prefixes = curie_codec.prefixes
         context.update({
             'title': 'Prefixes',
             'prefixes': dict(sorted(prefixes.items())),
@@ -94,10 +116,13 @@ class PrefixList(LoginRequiredMixin, TemplateView):
         return context
 
 
-class IndexView(LoginRequiredMixin, ListView):
+class IndexView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Vocabulary
     context_object_name = 'vocabularies'
 
+    def get_version(self):
+        return data_version()
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context.update({
@@ -110,27 +135,37 @@ class IndexView(LoginRequiredMixin, ListView):
     def post(self, _request, *_args, **_kwargs):
         uri = self.request.POST.get('uri', '').strip()
         if uri != '':
+            deleted = Vocabulary.deleted_with_uri(uri)
+            if deleted is not None:
+                messages.error(self.request, message=deleted.deleted_message)
+                return HttpResponseRedirect(reverse('list_vocabularies'))
             label = basename(uri.rstrip('#/')).title()
-            vocab, is_new = Vocabulary.objects.get_or_create(uri=uri, label=label)
+            vocab, is_new = Vocabulary.objects.get_or_create(uri=uri, defaults={'label': label})
             return HttpResponseRedirect(reverse('show_vocabulary', args=(vocab.id,)))
 
         return HttpResponseRedirect(reverse('list_vocabularies'))
 
 
-class VocabularyView(LoginRequiredMixin, PublishUpdatesMixin, UpdateView):
+class VocabularyView(LoginRequiredMixin, ConditionalGetMixin, PublishUpdatesMixin, UpdateView):
     model = Vocabulary
     form_class = VocabularyForm
     context_object_name = 'vocabulary'
     template_name_suffix = '_detail'
 
+    def get_version(self):
+        version = vocabulary_version(self.kwargs['pk'])
+        return version and (*version, *predicates_version())
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
+        terms = self.object.terms.all().order_by('name').prefetch_related('properties__predicate')
         context.update({
             'title': f'Vocabulary: {self.object.label}',
-            'predicates': Predicate.objects.all,
+            'predicates': predicate_registry.all(),
             'formats': VOCAB_FORMAT_LABELS,
-            'terms': self.object.terms.all().order_by('name'),
+            'term_rows': term_row_cache.render(terms, predicate_registry.all()),
             'new_term_form': TermForm(initial={'vocabulary': self.object}),
+            'term_upload_form': TermUploadForm(),
         })
         return context
 
@@ -138,29 +173,171 @@ class VocabularyView(LoginRequiredMixin, PublishUpdatesMixin, UpdateView):
         return reverse('show_vocabulary', kwargs={'pk': self.object.id})
 
     def form_valid(self, form):
+        with transaction.atomic():
+            result = None
+            if 'uri' in form.changed_data:
+                # update the references to the old URI along with it
+                try:
+                    result = rewrite_namespace(form.initial['uri'], form.cleaned_data['uri'])
+                except ValueError as e:
+                    form.add_error('uri', str(e))
+                    return self.form_invalid(form)
+            for key, value in form.cleaned_data.items():
+                setattr(self.object, key, value)
+            response = super().form_valid(form)
+
         messages.success(self.request, message='Vocabulary updated')
-        for key, value in form.cleaned_data.items():
-            setattr(self.object, key, value)
-        return super().form_valid(form)
+        if result is not None:
+            messages.info(
+                self.request,
+                message=f'Updated {result.properties} reference(s) and {result.predicates} predicate(s) '
+                        f'in {len(result.vocabularies)} vocabulary(ies)',
+            )
+        return response
 
     def form_invalid(self, form):
         messages.error(self.request, message='Vocabulary cannot be updated due to validation errors')
         return super().form_invalid(form)
 
     @method_decorator(ensure_csrf_cookie)
-    def delete(self, *_args, **_kwargs):
-        self.get_object().delete()
+    def delete(self, request, *_args, **_kwargs):
+        if request.GET.get('permanent') == 'true':
+            # also for a vocabulary that is already soft-deleted, to reuse its URI
+            vocabulary = get_object_or_404(Vocabulary.all_objects.all(), pk=self.kwargs['pk'])
+            vocabulary.delete(force_policy=HARD_DELETE)
+            return HttpResponse(status=HTTPStatus.OK)
+        # soft-deletes the terms and properties too; see DeletionsView to restore them
+        soft_delete_vocabularies(Vocabulary.objects.filter(pk=self.get_object().pk))
         return HttpResponse(status=HTTPStatus.OK)
 
 
-def rdf_type_predicate() -> Predicate:
-    """Find or create the Predicate for "rdf:type"."""
+class BatchEditView(LoginRequiredMixin, SingleObjectMixin, View):
+    """Applies a JSON list of edit operations to a vocabulary in a single
+    transaction. See `vocabs.bulk.Batch` for the operation format.
+
+    Responds with the number of changes of each kind, or with status 400 and
+    a list of per-operation errors, in which case nothing is changed."""
+
+    model = Vocabulary
+
+    def post(self, request, *args, **kwargs):
+        try:
+            operations = json.loads(request.body)['operations']
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse(
+                {'error': 'Expected a JSON object with an "operations" list'},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        if not isinstance(operations, list):
+            return JsonResponse({'error': '"operations" must be a list'}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            count = Batch(self.get_object(), operations).apply()
+        except BatchError as e:
+            return JsonResponse({'errors': e.errors}, status=HTTPStatus.BAD_REQUEST)
+
+        return JsonResponse({'applied': count})
+
+
+class TermRenameView(LoginRequiredMixin, SingleObjectMixin, View):
+    """Renames terms of a vocabulary, given a JSON object with a "names"
+    object that maps old names to new ones, and updates all references to
+    them. With `"dry_run": true`, nothing is changed.
+
+    Responds with the number of property values and predicates rewritten,
+    and the URIs of the affected vocabularies, or with status 400 and the
+    errors for each old name, in which case nothing is changed."""
+
+    model = Vocabulary
+
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            names = data['names']
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse(
+                {'error': 'Expected a JSON object with a "names" object'},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        if not isinstance(names, dict) or not all(isinstance(name, str) for name in names.values()):
+            return JsonResponse(
+                {'error': '"names" must map old names to new names'},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        dry_run = data.get('dry_run', False)
+        if not isinstance(dry_run, bool):
+            return JsonResponse({'error': '"dry_run" must be true or false'}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            result = rename_terms(self.get_object(), names, dry_run=dry_run)
+        except RenameError as e:
+            return JsonResponse({'errors': e.errors}, status=HTTPStatus.BAD_REQUEST)
+
+        return JsonResponse({
+            'renamed': len(result.names),
+            'properties': result.properties,
+            'predicates': result.predicates,
+            'vocabularies': [vocabulary.uri for vocabulary in result.vocabularies],
+        })
+
+
+class TermsDeleteView(LoginRequiredMixin, SingleObjectMixin, View):
+    """Soft-deletes the terms of a vocabulary that match a JSON object with
+    a "names" list, a "name_startswith" string, or both, along with their
+    properties.
+
+    Responds with the number of terms and properties deleted, and the
+    deletion batch to give to DeletionsView to restore them."""
+
+    model = Vocabulary
+
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            names = data.get('names')
+            prefix = data.get('name_startswith')
+        except (ValueError, AttributeError):
+            return JsonResponse({'error': 'Expected a JSON object'}, status=HTTPStatus.BAD_REQUEST)
+        if names is None and not prefix:
+            return JsonResponse(
+                {'error': 'Expected "names", "name_startswith", or both'},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        if names is not None and not (isinstance(names, list) and all(isinstance(name, str) for name in names)):
+            return JsonResponse({'error': '"names" must be a list of names'}, status=HTTPStatus.BAD_REQUEST)
+
+        terms = self.get_object().terms.all()
+        if names is not None:
+            terms = terms.filter(name__in=names)
+        if prefix:
+            terms = terms.filter(name__startswith=str(prefix))
+        batch, count = soft_delete_terms(terms)
+        return JsonResponse({'deleted': count, 'batch': batch.isoformat()})
+
 
-    predicate, _ = Predicate.objects.get_or_create(
-        uri=str(rdf.type),
-        object_type=Predicate.ObjectType.URI_REF,
-    )
-    return predicate
+class DeletionsView(LoginRequiredMixin, SingleObjectMixin, View):
+    """Lists the deletion batches of a vocabulary (including a deleted
+    vocabulary), as JSON, and restores everything deleted in the batch
+    given as "batch" in a JSON object."""
+
+    queryset = Vocabulary.all_objects.all()
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({'batches': deletion_batches(self.get_object())})
+
+    def post(self, request, *args, **kwargs):
+        try:
+            batch = datetime.fromisoformat(json.loads(request.body)['batch'])
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse(
+                {'error': 'Expected a JSON object with a "batch" timestamp'},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        try:
+            count = restore_deleted(self.get_object(), batch)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=HTTPStatus.CONFLICT)
+        return JsonResponse({'restored': count})
 
 
 class GraphView(LoginRequiredMixin, DetailView):
@@ -175,7 +352,7 @@ class GraphView(LoginRequiredMixin, DetailView):
         raise ValueError(f'Unknown format: {format_param}')
 
     def get(self, request, *args, **kwargs):
-        graph, context = self.get_object().graph()
+        graph, context = graph_cache.get(self.get_object())
         try:
             media_type, charset = self.requested_content_type()
         except ValueError as e:
@@ -187,20 +364,109 @@ class GraphView(LoginRequiredMixin, DetailView):
         )
 
 
-class TermView(LoginRequiredMixin, PublishUpdatesMixin, DetailView):
+class TermView(LoginRequiredMixin, ConditionalGetMixin, PublishUpdatesMixin, DetailView):
     model = Term
     context_object_name = 'term'
 
+    def get_version(self):
+        if not Term.objects.filter(pk=self.kwargs['pk']).exists():
+            return None
+        # the page also lists references from terms in any vocabulary
+        return data_version()
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'title': f'Term: {self.object.name}',
+            'references': self.object.incoming_references,
+            'rename_form': TermRenameForm(initial={'name': self.object.name}),
+        })
+        return context
+
+    def post(self, request, *_args, **_kwargs):
+        """Renames the term, and updates the references to it."""
+        term = self.get_object()
+        form = TermRenameForm(request.POST)
+        if not form.is_valid():
+            for error in form.errors['name']:
+                messages.error(request, message=f'Unable to rename term: {error}')
+            return HttpResponseRedirect(reverse('show_term', kwargs={'pk': term.id}))
+        try:
+            result = rename_terms(term.vocabulary, {term.name: form.cleaned_data['name']})
+        except RenameError as e:
+            for error in e.errors[term.name]:
+                messages.error(request, message=f'Unable to rename term: {error}')
+        else:
+            messages.success(request, message=f'Term renamed to "{form.cleaned_data["name"]}"')
+            if result.properties or result.predicates:
+                messages.info(
+                    request,
+                    message=f'Updated {result.properties} reference(s) and {result.predicates} predicate(s) '
+                            f'in {len(result.vocabularies)} vocabulary(ies)',
+                )
+        return HttpResponseRedirect(reverse('show_term', kwargs={'pk': term.id}))
+
     @method_decorator(ensure_csrf_cookie)
-    def delete(self, *_args, **_kwargs):
-        self.get_object().delete()
+    def delete(self, request, *_args, **_kwargs):
+        term = self.get_object()
+        if request.GET.get('force') != 'true':
+            references = list(term.incoming_references)
+            if references:
+                # the client is expected to confirm, then repeat the request with "?force=true"
+                sources = ', '.join(str(prop.term) for prop in references[:5])
+                if len(references) > 5:
+                    sources += f', and {len(references) - 5} more'
+                return HttpResponse(
+                    f'The term "{term.name}" is referenced by {len(references)} '
+                    f'propert{pluralize(len(references), "y,ies")} ({sources}). Delete it anyway?',
+                    status=HTTPStatus.CONFLICT,
+                    content_type='text/plain',
+                )
+        term.delete()
         return HttpResponse(status=HTTPStatus.OK)
 
 
-class PropertyView(LoginRequiredMixin, PublishUpdatesMixin, DetailView):
+class ReferencesView(LoginRequiredMixin, View):
+    """Lists the properties that use a URI as their value, as JSON.
+
+    The URI is either that of the term given in the path, or the "uri" query
+    parameter."""
+
+    def get(self, request, *args, **kwargs):
+        if 'pk' in kwargs:
+            term = get_object_or_404(Term, pk=kwargs['pk'])
+            uri = term.uri
+            references = term.incoming_references
+        elif 'uri' in request.GET:
+            uri = request.GET['uri']
+            references = references_to(uri)
+        else:
+            return JsonResponse({'error': 'Missing "uri" parameter'}, status=HTTPStatus.BAD_REQUEST)
+
+        return JsonResponse({
+            'uri': uri,
+            'references': [
+                {
+                    'property': prop.id,
+                    'term': prop.term.uri,
+                    'vocabulary': prop.term.vocabulary.uri,
+                    'predicate': str(prop.predicate),
+                }
+                for prop in references
+            ],
+        })
+
+
+class PropertyView(LoginRequiredMixin, ConditionalGetMixin, PublishUpdatesMixin, DetailView):
     model = Property
+    # the change event of a delete needs the term's vocabulary
+    queryset = Property.objects.select_related('term')
     context_object_name = 'property'
 
+    def get_version(self):
+        modified = Property.objects.filter(pk=self.kwargs['pk']).values_list('modified', flat=True).first()
+        return modified and (modified, *predicates_version())
+
     @method_decorator(ensure_csrf_cookie)
     def delete(self, *_args, **_kwargs):
         self.get_object().delete()
@@ -229,6 +495,7 @@ class NewPropertyView(LoginRequiredMixin, CreateView):
 
 class PropertyEditView(LoginRequiredMixin, PublishUpdatesMixin, UpdateView):
     model = Property
+    queryset = Property.objects.select_related('term')
     form_class = PropertyForm
 
     def get_initial(self):
@@ -242,9 +509,223 @@ class PropertyEditView(LoginRequiredMixin, PublishUpdatesMixin, UpdateView):
         return reverse('show_property', args=(self.object.id,))
 
 
-class PredicatesView(LoginRequiredMixin, ListView):
+class AutocompleteView(LoginRequiredMixin, View):
+    """Suggests CURIEs and URIs for URI-valued property values.
+
+    Query parameters:
+
+    * `q` (or `value`, as sent by the property forms): the text typed so far
+    * `predicate`: optional id of the predicate being edited; values already
+      used with that predicate are suggested first
+    * `limit`: maximum number of suggestions (default 10, between 1 and 100)
+
+    Returns `<option>` elements for HTMX requests, and JSON otherwise."""
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', request.GET.get('value', ''))
+        try:
+            predicate_id = int(request.GET['predicate']) if request.GET.get('predicate') else None
+            limit = max(1, min(int(request.GET.get('limit', 10)), 100))
+        except ValueError:
+            return HttpResponse('predicate and limit must be integers', status=HTTPStatus.BAD_REQUEST)
+
+        suggestions = autocomplete_index.suggest(query, predicate_id=predicate_id, limit=limit)
+        if request.htmx:
+            return render(request, 'vocabs/autocomplete_options.html', {'suggestions': suggestions})
+        return JsonResponse({'query': query, 'suggestions': [s._asdict() for s in suggestions]})
+
+
+# read-only, so it is safe to accept POSTs from non-browser clients
+@method_decorator(csrf_exempt, name='dispatch')
+class ResolveTermsView(LoginRequiredMixin, View):
+    """Looks up many term URIs at once.
+
+    Expects a JSON request body of the form:
+
+        {"uris": ["http://example.com/vocab#term", ...], "predicates": ["rdfs:label"]}
+
+    where "predicates" is optional and limits the properties returned."""
+
+    def post(self, request, *args, **kwargs):
+        try:
+            body = json.loads(request.body)
+            uris = body['uris']
+            predicates = body.get('predicates')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return JsonResponse({'error': 'Expected a JSON object with a "uris" list'}, status=HTTPStatus.BAD_REQUEST)
+
+        if not isinstance(uris, list) or not all(isinstance(uri, str) for uri in uris):
+            return JsonResponse({'error': '"uris" must be a list of strings'}, status=HTTPStatus.BAD_REQUEST)
+        if predicates is not None and (
+            not isinstance(predicates, list) or not all(isinstance(p, str) for p in predicates)
+        ):
+            return JsonResponse({'error': '"predicates" must be a list of strings'}, status=HTTPStatus.BAD_REQUEST)
+        if len(uris) > settings.RESOLVE_MAX_URIS:
+            return JsonResponse(
+                {'error': f'Too many URIs; the maximum is {settings.RESOLVE_MAX_URIS}'},
+                status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        return JsonResponse(resolve_terms(uris, predicates))
+
+
+# read-only, and OpenRefine does not send a CSRF token
+@method_decorator(csrf_exempt, name='dispatch')
+class ReconcileView(LoginRequiredMixin, View):
+    """Reconciliation service following the OpenRefine Reconciliation API.
+
+    Without a "queries" parameter, returns the service manifest. Otherwise,
+    "queries" is a JSON object mapping query keys to objects with a "query"
+    string and optional "type" (vocabulary URI) and "limit". When accessed
+    through a vocabulary's URL, all queries are limited to that vocabulary."""
+
+    def get(self, request, *args, **kwargs):
+        return self.respond(request.GET.get('queries'))
+
+    def post(self, request, *args, **kwargs):
+        return self.respond(request.POST.get('queries'))
+
+    def respond(self, queries: str | None):
+        vocabulary_id = self.kwargs.get('pk')
+        if queries is None:
+            vocabularies = Vocabulary.objects.all()
+            if vocabulary_id is not None:
+                vocabularies = vocabularies.filter(pk=vocabulary_id)
+            return JsonResponse(service_manifest(vocabularies))
+        try:
+            return JsonResponse(reconcile(json.loads(queries), vocabulary_id=vocabulary_id))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+
+# read-only, and SPARQL clients do not send a CSRF token
+@method_decorator(csrf_exempt, name='dispatch')
+class SparqlView(LoginRequiredMixin, View):
+    """Read-only SPARQL endpoint over all vocabularies, following the query
+    operation of the SPARQL 1.1 Protocol.
+
+    The query is given in the "query" parameter (GET or form-encoded POST),
+    or as the body of a POST with the "application/sparql-query" content
+    type. Each vocabulary is a named graph, and the default graph is their
+    union. The result format is chosen from the Accept header. Results over
+    the SPARQL_MAX_RESULTS limit are cut off, and marked with a
+    "X-Results-Truncated" header."""
+
+    def get(self, request, *args, **kwargs):
+        return self.respond(request.GET.get('query'))
+
+    def post(self, request, *args, **kwargs):
+        if request.content_type == 'application/sparql-query':
+            return self.respond(request.body.decode(request.encoding or 'utf-8'))
+        return self.respond(request.POST.get('query'))
+
+    def respond(self, query: str | None):
+        if not query:
+            return HttpResponse('Missing "query" parameter', status=HTTPStatus.BAD_REQUEST, content_type='text/plain')
+        try:
+            result = vocabulary_dataset.query(
+                query,
+                timeout=settings.SPARQL_QUERY_TIMEOUT,
+                max_results=settings.SPARQL_MAX_RESULTS,
+            )
+        except QueryError as e:
+            return HttpResponse(f'Invalid query: {e}', status=HTTPStatus.BAD_REQUEST, content_type='text/plain')
+        except QueryTimeout:
+            return HttpResponse(
+                f'Query did not finish within {settings.SPARQL_QUERY_TIMEOUT} seconds',
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+                content_type='text/plain',
+            )
+
+        try:
+            body, media_type = result.serialize(self.request.headers.get('Accept', ''))
+        except Exception as e:
+            logger.warning(f'Could not serialize SPARQL results: {e.__class__.__name__}: {e}', exc_info=True)
+            return HttpResponse(
+                f'Invalid query: the results cannot be serialized ({e})',
+                status=HTTPStatus.BAD_REQUEST,
+                content_type='text/plain',
+            )
+        response = HttpResponse(body, content_type=f'{media_type}; charset=utf-8')
+        if result.truncated:
+            response.headers['X-Results-Truncated'] = 'true'
+        return response
+
+
+class CacheStatsView(LoginRequiredMixin, View):
+    """Sizes and hit counts of this process's in-memory caches, for tuning
+    their size settings."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({
+            'graphs': graph_cache.stats(),
+            'term_rows': term_row_cache.stats(),
+            'curies': {name: info._asdict() for name, info in curie_codec.cache_info().items()},
+        })
+
+
+class APIListView(LoginRequiredMixin, View):
+    """Base class for the read-only, paginated JSON API views.
+
+    Query parameters:
+
+    * `limit`: page size (default 100, maximum 1000)
+    * `cursor`: opaque cursor from the "next" link of the previous page
+    * `fields`: comma-separated list of fields to include (default all)"""
+
+    resource: Resource
+
+    def get_base_queryset(self) -> QuerySet:
+        return self.resource.model.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = self.resource.parse_fields(request.GET.get('fields'))
+            limit = page_size(request.GET.get('limit'))
+            queryset = self.resource.get_queryset(self.get_base_queryset(), fields)
+            objects, next_cursor = paginate(queryset, request.GET.get('cursor'), limit)
+        except APIError as e:
+            return JsonResponse({'error': str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        next_url = None
+        if next_cursor is not None:
+            params = request.GET.copy()
+            params['cursor'] = next_cursor
+            next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+        return JsonResponse({
+            'results': [self.resource.serialize(obj, fields) for obj in objects],
+            'next': next_url,
+        })
+
+
+class VocabulariesAPIView(APIListView):
+    resource = VocabularyResource()
+
+
+class TermsAPIView(APIListView):
+    """All terms, or only the terms of the vocabulary given in the path."""
+
+    resource = TermResource()
+
+    def get_base_queryset(self) -> QuerySet:
+        queryset = super().get_base_queryset()
+        if 'pk' in self.kwargs:
+            vocabulary = get_object_or_404(Vocabulary, pk=self.kwargs['pk'])
+            queryset = queryset.filter(vocabulary=vocabulary)
+        return queryset
+
+
+class PredicatesAPIView(APIListView):
+    resource = PredicateResource()
+
+
+class PredicatesView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Predicate
 
+    def get_version(self):
+        # includes the properties, for the usage counts
+        return data_version()
+
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(object_list=object_list, **kwargs)
         context.update({'title': 'Predicates'})
@@ -255,7 +736,7 @@ class PredicatesView(LoginRequiredMixin, ListView):
         uri = self.request.POST.get('new_predicate', '').strip()
         if uri != '':
             if not uri.startswith('http:') or uri.startswith('https:'):
-                uri = from_n3(uri, nsm=namespace_manager)
+                uri = curie_codec.expand(uri)
             Predicate.objects.get_or_create(
                 uri=uri,
                 object_type=self.request.POST.get('object_type', '')
@@ -286,13 +767,16 @@ class ImportFormView(LoginRequiredMixin, FormView):
         return context
 
     def form_valid(self, form):
+        if form.cleaned_data['sync']:
+            return self.sync(form)
         try:
-            vocab, is_new, count = import_vocabulary(
-                file=form.files['file'],
-                rdf_format=form.cleaned_data['rdf_format'],
-                uri=form.cleaned_data['uri'],
-            )
-        except ValueError:
+            with open_upload(form.files['file'], form.cleaned_data['rdf_format']) as (file, rdf_format):
+                vocab, is_new, count = import_vocabulary(
+                    file=file,
+                    rdf_format=rdf_format,
+                    uri=form.cleaned_data['uri'],
+                )
+        except (ValueError, VocabularyImportError):
             messages.error(self.request, message='Unable to import vocabulary')
             return super().form_invalid(form)
 
@@ -309,11 +793,183 @@ class ImportFormView(LoginRequiredMixin, FormView):
 
         return HttpResponseRedirect(reverse('show_vocabulary', kwargs={'pk': vocab.id}))
 
+    def sync(self, form):
+        """Previews or applies the changes that make the vocabulary match the
+        file. See `vocabs.bulk.sync_vocabulary`."""
+        preview = form.cleaned_data['preview']
+        try:
+            with open_upload(form.files['file'], form.cleaned_data['rdf_format']) as (file, rdf_format):
+                vocab, is_new, diff = sync_vocabulary(
+                    file=file,
+                    rdf_format=rdf_format,
+                    uri=form.cleaned_data['uri'],
+                    dry_run=preview,
+                )
+        except (ValueError, VocabularyImportError):
+            messages.error(self.request, message='Unable to import vocabulary')
+            return super().form_invalid(form)
+
+        if preview:
+            # the file has to be chosen again to apply the changes
+            initial = {**form.cleaned_data, 'preview': False}
+            del initial['file']
+            return self.render_to_response(self.get_context_data(
+                form=self.form_class(initial=initial),
+                preview=True,
+                diff=diff,
+                vocabulary=vocab,
+            ))
+
+        if diff:
+            messages.success(
+                self.request, message=f'Sync successful: Vocabulary {"created" if is_new else "updated"}'
+            )
+            count = diff.count()
+            if count['new_terms'] > 0:
+                messages.info(self.request, message=f'Created {quantity(count, "new term")}.')
+            if count['new_properties'] > 0:
+                messages.info(self.request, message=f'Created {quantity(count, "new propert|y,ies")}.')
+            removed = Counter({
+                'terms': count['removed_terms'],
+                'properties': count['removed_properties'],
+            })
+            if removed['terms'] > 0:
+                messages.info(self.request, message=f'Removed {quantity(removed, "term")}.')
+            if removed['properties'] > 0:
+                messages.info(self.request, message=f'Removed {quantity(removed, "propert|y,ies")}.')
+        else:
+            messages.info(self.request, message='No changes to vocabulary')
+        return HttpResponseRedirect(reverse('show_vocabulary', kwargs={'pk': vocab.id}))
+
     def form_invalid(self, form):
         messages.error(self.request, message='Unable to import vocabulary')
         return super().form_invalid(form)
 
 
+class DatasetImportView(LoginRequiredMixin, FormView):
+    """Imports several vocabularies from one uploaded dataset or archive,
+    and shows a report of what was added to each. See
+    `vocabs.bulk.import_dataset`."""
+
+    form_class = DatasetImportForm
+    template_name = 'vocabs/dataset_import.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({'title': 'Import Vocabularies'})
+        return context
+
+    def form_valid(self, form):
+        upload = form.files['file']
+        try:
+            report = import_dataset(upload.file, upload.name or '')
+        except (OSError, EOFError, BadZipFile, TarError) as e:
+            logger.error(f'Unable to read {upload.name}: {e}')
+            messages.error(self.request, message='Unable to read the uploaded file')
+            return super().form_invalid(form)
+        except DatasetTooLarge as e:
+            messages.error(self.request, message=f'Unable to import the uploaded file: {e}')
+            return super().form_invalid(form)
+
+        if report.vocabularies:
+            messages.success(self.request, message=f'Imported {len(report.vocabularies)} vocabulary(ies).')
+        else:
+            messages.info(self.request, message='No vocabularies found')
+        if report.errors:
+            messages.error(self.request, message=f'Unable to parse {len(report.errors)} file(s).')
+        return self.render_to_response(self.get_context_data(form=self.form_class(), report=report))
+
+    def form_invalid(self, form):
+        messages.error(self.request, message='Unable to import vocabularies')
+        return super().form_invalid(form)
+
+
+class TermUploadView(LoginRequiredMixin, SingleObjectMixin, FormView):
+    """Adds the terms in an uploaded CSV or TSV file to a vocabulary. See
+    `vocabs.bulk.TermTable` for the file format.
+
+    If any row is invalid, nothing is added, and the page lists the errors
+    in each row."""
+
+    model = Vocabulary
+    form_class = TermUploadForm
+    template_name = 'vocabs/term_upload.html'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().post(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({'title': f'Upload Terms: {self.object.label}'})
+        return context
+
+    def form_valid(self, form):
+        try:
+            count = TermTable.from_upload(self.object, form.files['file']).load()
+        except BatchError as e:
+            messages.error(self.request, message=f'Unable to upload terms: {len(e.errors)} invalid row(s)')
+            return self.render_to_response(
+                self.get_context_data(form=form, errors=e.errors),
+                status=HTTPStatus.BAD_REQUEST,
+            )
+
+        messages.success(
+            self.request,
+            message=f'Upload successful: Created {quantity(count, "new term")} '
+                    f'and {quantity(count, "new propert|y,ies")}.',
+        )
+        return HttpResponseRedirect(reverse('show_vocabulary', kwargs={'pk': self.object.id}))
+
+
+class CloneFormView(LoginRequiredMixin, SingleObjectMixin, FormView):
+    """Copies the live terms and properties of a vocabulary to a new one."""
+
+    model = Vocabulary
+    form_class = CloneForm
+    template_name = 'vocabs/clone_form.html'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().post(request, *args, **kwargs)
+
+    def get_initial(self):
+        return {'label': f'{self.object.label} (copy)'}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({'title': f'Clone Vocabulary: {self.object.label}'})
+        return context
+
+    def form_valid(self, form):
+        try:
+            clone, count = clone_vocabulary(
+                self.object,
+                uri=form.cleaned_data['uri'],
+                label=form.cleaned_data['label'],
+                rewrite_references=form.cleaned_data['rewrite_references'],
+            )
+        except IntegrityError:
+            # another request created a vocabulary with this URI first
+            form.add_error('uri', 'There is already a vocabulary with this URI')
+            return self.form_invalid(form)
+
+        messages.success(
+            self.request,
+            message=f'Clone successful: Created {quantity(count, "new term")} '
+                    f'and {quantity(count, "new propert|y,ies")}.',
+        )
+        return HttpResponseRedirect(reverse('show_vocabulary', kwargs={'pk': clone.id}))
+
+
 class VocabularyStatusView(LoginRequiredMixin, DetailView):
     model = Vocabulary
 
@@ -370,7 +1026,7 @@ class NewTermFormView(LoginRequiredMixin, PublishUpdatesMixin, DetailView, FormV
             )
 
         if self.request.htmx:
-            response = render(self.request, 'vocabs/term.html', {'term': term, 'predicates': Predicate.objects.all})
+            response = render(self.request, 'vocabs/term.html', {'term': term, 'predicates': predicate_registry.all()})
             add_htmx_trigger(response, 'grove:termAdded')
             return response
         else:
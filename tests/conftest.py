@@ -0,0 +1,27 @@
+import pytest
+
+from vocabs.autocomplete import autocomplete_index
+from vocabs.fragments import term_row_cache
+from vocabs.graph_cache import graph_cache
+from vocabs.models import predicate_registry
+from vocabs.reconcile import label_index
+from vocabs.sparql import vocabulary_dataset
+
+
+@pytest.fixture(autouse=True)
+def reset_indexes():
+    # the in-memory indexes outlive the per-test database transactions,
+    # so make sure each test starts with empty ones
+    autocomplete_index.reset()
+    label_index.reset()
+    vocabulary_dataset.reset()
+    graph_cache.reset()
+    term_row_cache.reset()
+    predicate_registry.reset()
+    yield
+    autocomplete_index.reset()
+    label_index.reset()
+    vocabulary_dataset.reset()
+    graph_cache.reset()
+    term_row_cache.reset()
+    predicate_registry.reset()
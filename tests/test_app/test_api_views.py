@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+import pytest
+
+from vocabs.models import Predicate, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    for n in range(3):
+        Term.objects.create(vocabulary=vocab, name=f'term{n}')
+    return vocab
+
+
+@pytest.mark.django_db
+def test_list_terms(admin_client, vocab):
+    response = admin_client.get(f'/api/vocabularies/{vocab.id}/terms', data={'limit': 2, 'fields': 'uri'})
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [t['uri'] for t in data['results']] == ['http://example.com/foo#term0', 'http://example.com/foo#term1']
+    assert data['next'].startswith('http://testserver/api/vocabularies/')
+
+    data = admin_client.get(data['next']).json()
+    assert [t['uri'] for t in data['results']] == ['http://example.com/foo#term2']
+    assert data['next'] is None
+
+
+@pytest.mark.django_db
+def test_list_vocabularies_and_predicates(admin_client, vocab):
+    Predicate.objects.create(uri='http://www.w3.org/2000/01/rdf-schema#label', object_type='Literal')
+    data = admin_client.get('/api/vocabularies').json()
+    assert data['results'][0]['uri'] == 'http://example.com/foo#'
+    assert data['results'][0]['term_count'] == 3
+    data = admin_client.get('/api/predicates').json()
+    assert data['results'][0]['curie'] == 'rdfs:label'
+    assert len(admin_client.get('/api/terms').json()['results']) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{'cursor': 'garbage'}, {'limit': 'x'}, {'fields': 'nope'}])
+def test_bad_request(admin_client, params):
+    assert admin_client.get('/api/terms', data=params).status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_unknown_vocabulary(admin_client):
+    assert admin_client.get('/api/vocabularies/0/terms').status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,35 @@
+from http import HTTPStatus
+
+import pytest
+
+from vocabs.models import Term, Vocabulary
+
+
+@pytest.mark.django_db
+def test_autocomplete_json(admin_client):
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    Term.objects.create(vocabulary=vocab, name='Bar')
+    response = admin_client.get('/autocomplete', data={'q': 'http://example.com/foo#'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['suggestions'] == [
+        {'value': 'http://example.com/foo#Bar', 'label': 'http://example.com/foo#Bar', 'kind': 'term'},
+    ]
+
+
+@pytest.mark.django_db
+def test_autocomplete_htmx(admin_client):
+    response = admin_client.get('/autocomplete', data={'value': 'rdfs'}, headers={'HX-Request': 'true'})
+    assert '<option value="rdfs:">' in response.content.decode()
+
+
+@pytest.mark.parametrize('params', [{'predicate': 'foo'}, {'limit': 'abc'}])
+def test_autocomplete_bad_parameters(admin_client, params):
+    response = admin_client.get('/autocomplete', data={'q': 'rdfs', **params})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize('limit', ['-1', '0'])
+def test_autocomplete_limit_at_least_one(admin_client, limit):
+    response = admin_client.get('/autocomplete', data={'q': 'rdfs', 'limit': limit})
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['suggestions']) == 1
@@ -0,0 +1,34 @@
+from http import HTTPStatus
+
+import pytest
+
+from vocabs.models import Vocabulary
+
+
+@pytest.mark.django_db
+def test_batch_edit(admin_client):
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/batch',
+        data={'operations': [{'op': 'add_term', 'name': 'Bar'}]},
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['applied']['terms_added'] == 1
+    assert vocab.terms.get().name == 'Bar'
+
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/batch',
+        data={'operations': [{'op': 'add_term', 'name': 'Bar'}]},
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['errors'][0]['index'] == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('data', ['not json', {'ops': []}, {'operations': {}}])
+def test_batch_edit_bad_request(admin_client, data):
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    response = admin_client.post(f'/vocabs/{vocab.id}/batch', data=data, content_type='application/json')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
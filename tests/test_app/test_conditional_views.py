@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import User
+from plastron.namespaces import rdfs
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    label, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    term = Term.objects.create(vocabulary=vocab, name='red')
+    Property.objects.create(term=term, predicate=label, value='Red')
+    return vocab
+
+
+def revalidate(client, url: str, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ['/vocabs/', '/vocabs/{vocab}', '/terms/{term}', '/properties/{prop}', '/predicates'])
+def test_not_modified(admin_client, vocab, url):
+    prop = Property.objects.get()
+    url = url.format(vocab=vocab.id, term=prop.term.id, prop=prop.id)
+    # the first request sets the CSRF cookie
+    admin_client.get('/vocabs/')
+
+    response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert 'no-cache' in response['Cache-Control']
+    assert 'Last-Modified' in response
+    not_modified = revalidate(admin_client, url, response)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.content == b''
+
+    prop.value = 'Rouge'
+    prop.save()
+    assert revalidate(admin_client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_predicate_change(admin_client, vocab):
+    admin_client.get('/vocabs/')
+    url = f'/vocabs/{vocab.id}'
+    response = admin_client.get(url)
+    Predicate.objects.create(uri='http://example.com/ns#hue', object_type=Predicate.ObjectType.LITERAL)
+    assert revalidate(admin_client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_per_user(client, admin_user, vocab):
+    other = User.objects.create_user('other')
+    client.force_login(admin_user)
+    client.get('/vocabs/')
+    response = client.get('/vocabs/')
+    client.force_login(other)
+    client.get('/predicates')
+    assert revalidate(client, '/vocabs/', response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_pending_messages(admin_client, vocab):
+    url = f'/vocabs/{vocab.id}'
+    admin_client.get(url)
+    response = admin_client.get(url)
+    # updating the vocabulary adds a message to show on the next page
+    admin_client.post(url, data={'uri': vocab.uri, 'label': vocab.label})
+    response = revalidate(admin_client, url, response)
+    assert response.status_code == HTTPStatus.OK
+    assert b'Vocabulary updated' in response.content
+
+
+@pytest.mark.django_db
+def test_missing_object(admin_client):
+    admin_client.get('/vocabs/')
+    response = admin_client.get('/terms/999')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert 'ETag' not in response
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+
+from vocabs.models import Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    for name in ('bar', 'baz', 'qux'):
+        Term.objects.create(vocabulary=vocab, name=name)
+    return vocab
+
+
+@pytest.mark.django_db
+def test_delete_and_restore_terms(admin_client, vocab):
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/terms/delete',
+        data={'names': ['qux'], 'name_startswith': 'ba'},
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['deleted'] == {'terms': 0, 'properties': 0}
+
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/terms/delete',
+        data={'name_startswith': 'ba'},
+        content_type='application/json',
+    )
+    batch = response.json()['batch']
+    assert response.json()['deleted'] == {'terms': 2, 'properties': 0}
+    assert list(vocab.terms.values_list('name', flat=True)) == ['qux']
+
+    response = admin_client.get(f'/vocabs/{vocab.id}/deletions')
+    assert response.json() == {'batches': [{'batch': batch, 'deleted': {'terms': 2}}]}
+
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/deletions', data={'batch': batch}, content_type='application/json'
+    )
+    assert response.json() == {'restored': {'terms': 2, 'properties': 0}}
+    assert vocab.terms.count() == 3
+
+
+@pytest.mark.django_db
+def test_restore_deleted_vocabulary(admin_client, vocab):
+    assert admin_client.delete(f'/vocabs/{vocab.id}').status_code == HTTPStatus.OK
+    assert not Vocabulary.objects.exists()
+
+    [batch] = admin_client.get(f'/vocabs/{vocab.id}/deletions').json()['batches']
+    assert batch['deleted'] == {'vocabulary': 1, 'terms': 3}
+
+    # the URI stays taken by the deleted vocabulary
+    response = admin_client.post('/vocabs/', data={'uri': vocab.uri}, follow=True)
+    assert 'has been deleted' in response.content.decode()
+    assert not Vocabulary.objects.exists()
+
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/deletions', data={'batch': batch['batch']}, content_type='application/json'
+    )
+    assert response.json() == {'restored': {'vocabularies': 1, 'terms': 3, 'properties': 0}}
+    assert Vocabulary.objects.get().terms.count() == 3
+
+
+@pytest.mark.django_db
+def test_delete_vocabulary_permanently(admin_client, vocab):
+    assert admin_client.delete(f'/vocabs/{vocab.id}').status_code == HTTPStatus.OK
+    assert admin_client.delete(f'/vocabs/{vocab.id}?permanent=true').status_code == HTTPStatus.OK
+    assert not Vocabulary.all_objects.exists()
+    assert not Term.all_objects.exists()
+
+    # the URI can be used again
+    admin_client.post('/vocabs/', data={'uri': vocab.uri})
+    assert Vocabulary.objects.get().uri == vocab.uri
+
+
+@pytest.mark.django_db
+def test_invalid_requests(admin_client, vocab):
+    for data in ({}, {'names': 'bar'}, ['bar']):
+        response = admin_client.post(f'/vocabs/{vocab.id}/terms/delete', data=data, content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/deletions', data={'batch': 'yesterday'}, content_type='application/json'
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert vocab.terms.count() == 3
@@ -1,10 +1,73 @@
+import gzip
 from http import HTTPStatus
+from io import BytesIO
 
 import pytest
 
+from vocabs.models import Term, Vocabulary
+
 
 @pytest.mark.django_db
 def test_import_vocabulary(datadir, post, vocab_uri):
     with (datadir / 'foo.ttl').open() as fh:
         response = post('/import', data={'uri': vocab_uri, 'rdf_format': 'text/turtle', 'file': fh})
     assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_sync_vocabulary(datadir, post, vocab_uri):
+    vocab = Vocabulary.objects.create(uri=vocab_uri, label='Foo')
+    Term.objects.create(vocabulary=vocab, name='Old')
+
+    with (datadir / 'foo.ttl').open() as fh:
+        response = post(
+            '/import',
+            data={'uri': vocab_uri, 'rdf_format': 'turtle', 'file': fh, 'preview': 'on'},
+        )
+    content = response.content.decode()
+    assert 'Sync Preview' in content
+    assert 'Add term' in content
+    assert 'Remove term' in content
+    assert list(vocab.terms.values_list('name', flat=True)) == ['Old']
+
+    with (datadir / 'foo.ttl').open() as fh:
+        response = post('/import', data={'uri': vocab_uri, 'rdf_format': 'turtle', 'file': fh, 'sync': 'on'})
+    content = response.content.decode()
+    assert 'Sync successful: Vocabulary updated' in content
+    assert 'Removed 1 term.' in content
+    assert list(vocab.terms.values_list('name', flat=True)) == ['Thing']
+
+
+@pytest.mark.django_db
+def test_import_dataset(post, settings):
+    settings.IMPORT_WORKERS = 0
+    dataset = BytesIO(
+        b'<http://example.com/foo#Thing> <http://www.w3.org/2000/01/rdf-schema#label> "Thing" '
+        b'<http://example.com/foo#> .\n'
+    )
+    dataset.name = 'legacy.nq'
+    response = post('/import/dataset', data={'file': dataset})
+    content = response.content.decode()
+    assert 'Imported 1 vocabulary(ies).' in content
+    assert 'http://example.com/foo# (created)' in content
+    assert Vocabulary.objects.get(uri='http://example.com/foo#').terms.get().name == 'Thing'
+
+
+@pytest.mark.django_db
+def test_import_dataset_too_large(post, settings):
+    settings.IMPORT_WORKERS = 0
+    settings.IMPORT_MAX_SIZE = 10
+    dataset = BytesIO(b'<http://example.com/foo#Thing> <http://www.w3.org/2000/01/rdf-schema#label> "Thing" .\n')
+    dataset.name = 'legacy.nt'
+    response = post('/import/dataset', data={'file': dataset})
+    assert 'More than 10 bytes of uncompressed data in legacy.nt' in response.content.decode()
+    assert not Vocabulary.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_compressed_vocabulary(datadir, post, vocab_uri):
+    upload = BytesIO(gzip.compress((datadir / 'foo.ttl').read_bytes()))
+    upload.name = 'foo.ttl.gz'
+    response = post('/import', data={'uri': vocab_uri, 'rdf_format': 'auto', 'file': upload})
+    assert 'Import successful: Vocabulary created' in response.content.decode()
+    assert Vocabulary.objects.get(uri=vocab_uri).terms.get().name == 'Thing'
@@ -0,0 +1,41 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from vocabs.models import Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    Term.objects.create(vocabulary=vocab, name='red')
+    return vocab
+
+
+@pytest.mark.django_db
+def test_service_manifest(admin_client, vocab):
+    response = admin_client.get('/reconcile')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['defaultTypes'] == [{'id': 'http://example.com/colors#', 'name': 'Colors'}]
+
+
+@pytest.mark.django_db
+def test_reconcile_post(admin_client, vocab):
+    response = admin_client.post('/reconcile', data={'queries': json.dumps({'q0': {'query': 'Red'}})})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['q0']['result'][0]['id'] == 'http://example.com/colors#red'
+
+
+@pytest.mark.django_db
+def test_reconcile_vocabulary(admin_client, vocab):
+    other = Vocabulary.objects.create(uri='http://example.com/other#', label='Other')
+    Term.objects.create(vocabulary=other, name='red')
+    response = admin_client.get(f'/vocabs/{other.id}/reconcile', data={'queries': json.dumps({'q0': {'query': 'Red'}})})
+    assert [r['id'] for r in response.json()['q0']['result']] == ['http://example.com/other#red']
+
+
+@pytest.mark.django_db
+def test_reconcile_bad_request(admin_client):
+    response = admin_client.get('/reconcile', data={'queries': 'not json'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
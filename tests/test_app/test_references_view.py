@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+from plastron.namespaces import owl
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def terms():
+    same_as, _ = Predicate.objects.get_or_create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    target = Term.objects.create(vocabulary=vocab, name='target')
+    source = Term.objects.create(vocabulary=vocab, name='source')
+    Property.objects.create(term=source, predicate=same_as, value=target.uri)
+    return target, source
+
+
+@pytest.mark.django_db
+def test_term_view_shows_references(admin_client, terms):
+    target, source = terms
+    response = admin_client.get(f'/terms/{target.id}')
+    assert response.status_code == HTTPStatus.OK
+    assert 'http://example.com/foo#source' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_references_json(admin_client, terms):
+    target, source = terms
+    expected = {
+        'uri': 'http://example.com/foo#target',
+        'references': [
+            {
+                'property': source.properties.first().id,
+                'term': 'http://example.com/foo#source',
+                'vocabulary': 'http://example.com/foo#',
+                'predicate': 'owl:sameAs',
+            },
+        ],
+    }
+    assert admin_client.get(f'/terms/{target.id}/references').json() == expected
+    assert admin_client.get('/references', data={'uri': target.uri}).json() == expected
+    assert admin_client.get('/references').status_code == HTTPStatus.BAD_REQUEST
+    assert admin_client.get('/terms/0/references').status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_delete_referenced_term_requires_force(admin_client, terms):
+    target, source = terms
+    response = admin_client.delete(f'/terms/{target.id}')
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert 'referenced by 1 property' in response.content.decode()
+    assert Term.objects.filter(pk=target.pk).exists()
+
+    response = admin_client.delete(f'/terms/{target.id}?force=true')
+    assert response.status_code == HTTPStatus.OK
+    assert not Term.objects.filter(pk=target.pk).exists()
+
+
+@pytest.mark.django_db
+def test_delete_unreferenced_term(admin_client, terms):
+    target, source = terms
+    response = admin_client.delete(f'/terms/{source.id}')
+    assert response.status_code == HTTPStatus.OK
+    assert not Term.objects.filter(pk=source.pk).exists()
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from plastron.namespaces import owl
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    other = Vocabulary.objects.create(uri='http://example.com/other#', label='Other')
+    same_as = Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    Term.objects.create(vocabulary=vocab, name='bar')
+    Property.objects.create(
+        term=Term.objects.create(vocabulary=other, name='x'),
+        predicate=same_as,
+        value='http://example.com/foo#bar',
+    )
+    return vocab
+
+
+@pytest.mark.django_db
+def test_rename_term(admin_client, vocab):
+    term = vocab.terms.get()
+    response = admin_client.post(f'/terms/{term.id}', data={'name': 'baz'}, follow=True)
+    content = response.content.decode()
+    assert 'Term renamed to &quot;baz&quot;' in content
+    assert 'Updated 1 reference(s) and 0 predicate(s) in 2 vocabulary(ies)' in content
+    term.refresh_from_db()
+    assert term.name == 'baz'
+
+    response = admin_client.post(f'/terms/{term.id}', data={'name': 'not valid'}, follow=True)
+    assert 'Unable to rename term' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_rename_terms(admin_client, vocab):
+    url = f'/vocabs/{vocab.id}/rename'
+    response = admin_client.post(url, data={'names': {'bar': 'baz'}, 'dry_run': True}, content_type='application/json')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'renamed': 1,
+        'properties': 1,
+        'predicates': 0,
+        'vocabularies': ['http://example.com/foo#', 'http://example.com/other#'],
+    }
+    assert vocab.terms.get().name == 'bar'
+
+    response = admin_client.post(url, data={'names': {'bar': 'baz'}}, content_type='application/json')
+    assert response.status_code == HTTPStatus.OK
+    assert vocab.terms.get().name == 'baz'
+
+    response = admin_client.post(url, data={'names': {'bar': 'qux'}}, content_type='application/json')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert list(response.json()['errors']) == ['bar']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'data',
+    [
+        'not json',
+        {'renames': {}},
+        {'names': ['bar']},
+        {'names': {'bar': 1}},
+        {'names': {'bar': 'baz'}, 'dry_run': 'false'},
+        {'names': {'bar': 'baz'}, 'dry_run': 0},
+    ],
+)
+def test_rename_terms_bad_request(admin_client, vocab, data):
+    response = admin_client.post(f'/vocabs/{vocab.id}/rename', data=data, content_type='application/json')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert vocab.terms.get().name == 'bar'
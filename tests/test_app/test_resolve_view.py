@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from vocabs.models import Term, Vocabulary
+
+
+@pytest.mark.django_db
+def test_resolve_terms_view(admin_client):
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    Term.objects.create(vocabulary=vocab, name='Bar')
+    response = admin_client.post(
+        '/terms/resolve',
+        data={'uris': ['http://example.com/foo#Bar', 'http://example.com/foo#Baz']},
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'results': {
+            'http://example.com/foo#Bar': {'vocabulary': 'http://example.com/foo#', 'name': 'Bar', 'properties': {}},
+        },
+        'not_found': ['http://example.com/foo#Baz'],
+    }
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        'not json',
+        {'urls': []},
+        {'uris': 'http://example.com/foo#Bar'},
+        {'uris': [], 'predicates': 'rdfs:label'},
+    ]
+)
+def test_resolve_terms_view_bad_request(admin_client, data):
+    response = admin_client.post('/terms/resolve', data=data, content_type='application/json')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@override_settings(RESOLVE_MAX_URIS=1)
+def test_resolve_terms_view_too_many(admin_client):
+    response = admin_client.post('/terms/resolve', data={'uris': ['a', 'b']}, content_type='application/json')
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
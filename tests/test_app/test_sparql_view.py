@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from vocabs.models import Term, Vocabulary
+
+QUERY = 'SELECT ?s WHERE { ?s dc:identifier ?name } ORDER BY ?name'
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    for name in ['red', 'green']:
+        Term.objects.create(vocabulary=vocab, name=name)
+    return vocab
+
+
+@pytest.mark.django_db
+def test_sparql_get(admin_client, vocab):
+    response = admin_client.get('/sparql', data={'query': QUERY})
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('application/sparql-results+json')
+    bindings = response.json()['results']['bindings']
+    assert [b['s']['value'] for b in bindings] == ['http://example.com/colors#green', 'http://example.com/colors#red']
+
+
+@pytest.mark.django_db
+def test_sparql_post_query_body(admin_client, vocab):
+    response = admin_client.post('/sparql', data=QUERY, content_type='application/sparql-query', HTTP_ACCEPT='text/csv')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/csv')
+    assert response.content.splitlines()[1] == b'http://example.com/colors#green'
+
+
+@pytest.mark.django_db
+def test_sparql_truncated(admin_client, vocab, settings):
+    settings.SPARQL_MAX_RESULTS = 1
+    response = admin_client.post('/sparql', data={'query': QUERY})
+    assert len(response.json()['results']['bindings']) == 1
+    assert response['X-Results-Truncated'] == 'true'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{}, {'query': 'DELETE WHERE { ?s ?p ?o }'}])
+def test_sparql_bad_request(admin_client, params):
+    assert admin_client.get('/sparql', data=params).status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', [
+    'SELECT * WHERE { SERVICE <http://localhost:1/sparql> { ?s ?p ?o } }',
+    'SELECT * WHERE { OPTIONAL { SERVICE SILENT <file:///etc/hostname> { ?s ?p ?o } } }',
+    'SELECT * FROM <http://localhost:1/data.ttl> WHERE { ?s ?p ?o }',
+    'SELECT * FROM NAMED <file:///etc/hostname> WHERE { GRAPH ?g { ?s ?p ?o } }',
+])
+def test_sparql_no_remote_data(admin_client, vocab, monkeypatch, query):
+    def fetch(*args, **kwargs):
+        raise AssertionError('the server must not fetch anything')
+
+    monkeypatch.setattr('urllib.request.urlopen', fetch)
+    response = admin_client.get('/sparql', data={'query': query})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_sparql_evaluation_error(admin_client, vocab, monkeypatch):
+    def fail(*args, **kwargs):
+        raise TypeError('unsupported operand')
+
+    monkeypatch.setattr('rdflib.Dataset.query', fail)
+    response = admin_client.get('/sparql', data={'query': QUERY})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert b'TypeError: unsupported operand' in response.content
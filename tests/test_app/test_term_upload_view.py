@@ -0,0 +1,40 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from plastron.namespaces import rdfs
+
+from vocabs.models import Predicate, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    return Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+
+
+@pytest.mark.django_db
+def test_upload_terms(admin_client, vocab):
+    upload = SimpleUploadedFile('terms.tsv', b'name\trdfs:label\nbar\tBar\nbaz\tBaz\n')
+    response = admin_client.post(f'/vocabs/{vocab.id}/upload', data={'file': upload}, follow=True)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Created 2 new terms and 2 new properties.' in response.content.decode()
+    assert set(vocab.terms.values_list('name', flat=True)) == {'bar', 'baz'}
+
+
+@pytest.mark.django_db
+def test_upload_invalid_terms(admin_client, vocab):
+    upload = SimpleUploadedFile('terms.csv', b'\xef\xbb\xbfname,rdfs:label\nbar,Bar\nbad name,Bad\n')
+    response = admin_client.post(f'/vocabs/{vocab.id}/upload', data={'file': upload})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert '<td>bad name</td>' in response.content.decode()
+    assert not vocab.terms.exists()
+
+
+@pytest.mark.django_db
+def test_upload_requires_login(client, vocab):
+    # the login check comes before looking up the vocabulary
+    for vocab_id in (vocab.id, vocab.id + 1):
+        response = client.get(f'/vocabs/{vocab_id}/upload')
+        assert response.status_code == HTTPStatus.FOUND
+        assert response.url.startswith('/saml2/login/')
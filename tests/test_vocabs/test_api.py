@@ -0,0 +1,93 @@
+import pytest
+from plastron.namespaces import rdfs
+
+from vocabs.api import APIError, TermResource, VocabularyResource, decode_cursor, encode_cursor, page_size, paginate
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    label, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    for n in range(25):
+        term = Term.objects.create(vocabulary=vocab, name=f'term{n:02}')
+        Property.objects.create(term=term, predicate=label, value=f'Term {n}')
+    return vocab
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+
+
+@pytest.mark.parametrize('cursor', ['!!!', 'bm90IGpzb24', encode_cursor(1).replace('e', 'x'), 'eyJhZnRlciI6ICIxIn0'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(APIError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(('value', 'expected'), [(None, 100), ('10', 10), ('5000', 1000)])
+def test_page_size(value, expected):
+    assert page_size(value) == expected
+
+
+@pytest.mark.parametrize('value', ['0', 'ten'])
+def test_invalid_page_size(value):
+    with pytest.raises(APIError):
+        page_size(value)
+
+
+@pytest.mark.django_db
+def test_paginate(vocab):
+    names = []
+    cursor = None
+    pages = 0
+    while True:
+        terms, cursor = paginate(Term.objects.all(), cursor, 10)
+        names.extend(t.name for t in terms)
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == 3
+    assert names == [f'term{n:02}' for n in range(25)]
+
+
+@pytest.mark.django_db
+def test_queries_per_page_are_constant(vocab, django_assert_num_queries):
+    resource = TermResource()
+    fields = resource.parse_fields(None)
+    queryset = resource.get_queryset(Term.objects.all(), fields)
+    _, cursor = paginate(queryset, None, 10)
+    _, cursor = paginate(queryset, cursor, 10)
+    # one query for the terms (joined with vocabularies), one for the properties (joined with predicates)
+    with django_assert_num_queries(2):
+        terms, _ = paginate(queryset, cursor, 10)
+        data = [resource.serialize(term, fields) for term in terms]
+    assert len(data) == 5
+    assert data[0]['properties'][0]['predicate'] == 'rdfs:label'
+
+
+@pytest.mark.django_db
+def test_sparse_fields(vocab, django_assert_num_queries):
+    resource = TermResource()
+    fields = resource.parse_fields('name')
+    assert fields == ['id', 'name']
+    queryset = resource.get_queryset(Term.objects.all(), fields)
+    with django_assert_num_queries(1) as context:
+        terms, _ = paginate(queryset, None, 10)
+        data = [resource.serialize(term, fields) for term in terms]
+    assert data[0] == {'id': terms[0].id, 'name': 'term00'}
+    # only the columns of the requested fields are selected
+    select = context.captured_queries[0]['sql'].split(' FROM ')[0]
+    assert '"created"' not in select and '"vocabulary_id"' not in select
+
+    with pytest.raises(APIError):
+        resource.parse_fields('name,nonsense')
+
+
+@pytest.mark.django_db
+def test_vocabulary_term_count(vocab):
+    vocab.terms.first().delete()
+    resource = VocabularyResource()
+    fields = resource.parse_fields('term_count')
+    vocabs, _ = paginate(resource.get_queryset(Vocabulary.objects.all(), fields), None, 10)
+    assert resource.serialize(vocabs[0], fields) == {'id': vocab.id, 'term_count': 24}
@@ -0,0 +1,90 @@
+import pytest
+from plastron.namespaces import owl, rdf, rdfs
+
+from vocabs.autocomplete import PrefixIndex, Suggestion, autocomplete_index
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    return Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo', preferred_prefix='foo')
+
+
+@pytest.fixture
+def same_as():
+    predicate, _ = Predicate.objects.get_or_create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    return predicate
+
+
+def values(suggestions: list[Suggestion]) -> list[str]:
+    return [s.value for s in suggestions]
+
+
+def test_prefix_index():
+    thing = Suggestion('ex:Thing', 'http://example.com/Thing', 'term')
+    other = Suggestion('ex:Other', 'http://example.com/Other', 'term')
+    index = PrefixIndex([('ex:Thing', thing), ('ex:Other', other)])
+    assert list(index.search('ex:t')) == [thing]
+    assert list(index.search('EX:')) == [other, thing]
+    index.add('ex:Thing', thing)
+    index.remove('ex:Thing', thing)
+    assert list(index.search('ex:t')) == [thing]
+    index.remove('ex:Thing', thing)
+    assert list(index.search('ex:t')) == []
+
+
+@pytest.mark.django_db
+def test_suggest_prefixes():
+    assert 'rdfs:' in values(autocomplete_index.suggest('rdf'))
+    assert 'rdfs:' in values(autocomplete_index.suggest(str(rdfs)))
+
+
+@pytest.mark.django_db
+def test_suggest_terms(vocab):
+    Term.objects.create(vocabulary=vocab, name='Bar')
+    assert 'http://example.com/foo#Bar' in values(autocomplete_index.suggest('http://example.com/foo#b'))
+    assert 'http://example.com/foo#Bar' in values(autocomplete_index.suggest('foo:b'))
+    assert 'http://example.com/foo#Bar' in values(autocomplete_index.suggest('bar'))
+
+
+@pytest.mark.django_db
+def test_index_is_updated_incrementally(vocab, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        Term.objects.create(vocabulary=vocab, name='Bar')
+    assert values(autocomplete_index.suggest('foo:')) == ['http://example.com/foo#Bar']
+    assert autocomplete_index.is_built
+
+    with django_capture_on_commit_callbacks(execute=True):
+        baz = Term.objects.create(vocabulary=vocab, name='Baz')
+    assert autocomplete_index.is_built
+    assert values(autocomplete_index.suggest('foo:')) == ['http://example.com/foo#Bar', 'http://example.com/foo#Baz']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        baz.delete()
+    assert autocomplete_index.is_built
+    assert values(autocomplete_index.suggest('foo:')) == ['http://example.com/foo#Bar']
+
+
+@pytest.mark.django_db
+def test_suggest_values_for_predicate(vocab, same_as, django_capture_on_commit_callbacks):
+    term = Term.objects.create(vocabulary=vocab, name='Bar')
+    Property.objects.create(term=term, predicate=same_as, value='http://example.org/elsewhere/Bar')
+    suggestions = autocomplete_index.suggest('http://example.org/', predicate_id=same_as.id)
+    assert values(suggestions) == ['http://example.org/elsewhere/Bar']
+    assert suggestions[0].kind == 'value'
+
+    # a new value is picked up on the next request
+    with django_capture_on_commit_callbacks(execute=True):
+        Property.objects.create(term=term, predicate=same_as, value='http://example.org/elsewhere/Baz')
+    suggestions = autocomplete_index.suggest('http://example.org/', predicate_id=same_as.id)
+    assert len(suggestions) == 2
+
+    # values from other predicates are not suggested
+    rdf_type, _ = Predicate.objects.get_or_create(uri=rdf.type, object_type=Predicate.ObjectType.URI_REF)
+    assert autocomplete_index.suggest('http://example.org/', predicate_id=rdf_type.id) == []
+
+
+@pytest.mark.django_db
+def test_suggest_limit(vocab):
+    Term.objects.bulk_create(Term(vocabulary=vocab, name=f'term{n}') for n in range(20))
+    assert len(autocomplete_index.suggest('foo:term', limit=5)) == 5
@@ -0,0 +1,137 @@
+import pytest
+from plastron.namespaces import owl, rdf, rdfs
+
+from vocabs.bulk import Batch, BatchError
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    Predicate.objects.get_or_create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    return Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+
+
+@pytest.fixture
+def term(vocab):
+    term = Term.objects.create(vocabulary=vocab, name='existing')
+    Property.objects.create(term=term, predicate=Predicate.from_curie('rdfs:label'), value='Existing')
+    return term
+
+
+@pytest.mark.django_db
+def test_add_terms_and_properties(vocab, django_assert_max_num_queries):
+    operations = [
+        {'op': 'add_term', 'name': 'Thing', 'rdf_type': 'rdfs:Class'},
+        {'op': 'add_term', 'name': 'thing2'},
+        {'op': 'add_property', 'term': 'Thing', 'predicate': 'rdfs:label', 'value': 'A thing'},
+        {'op': 'add_property', 'term': 'thing2', 'predicate': str(owl.sameAs), 'value': 'rdfs:Resource'},
+    ]
+    # the forms validate each operation with a few queries, but the rows
+    # are inserted with one query per table
+    with django_assert_max_num_queries(34):
+        count = Batch(vocab, operations).apply()
+    assert count['terms_added'] == 2
+    assert count['properties_added'] == 2
+
+    thing = vocab.terms.get(name='Thing')
+    assert {(p.predicate.uri, p.value) for p in thing.properties.all()} == {
+        (str(rdf.type), str(rdfs.Class)),
+        (str(rdfs.label), 'A thing'),
+    }
+    assert vocab.terms.get(name='thing2').properties.get().value == str(rdfs.Resource)
+
+
+@pytest.mark.django_db
+def test_update_and_delete(vocab, term):
+    prop = term.properties.get()
+    other = Term.objects.create(vocabulary=vocab, name='other')
+    other_prop = Property.objects.create(term=other, predicate=prop.predicate, value='Other')
+    operations = [
+        {'op': 'update_property', 'id': prop.id, 'value': 'Updated'},
+        {'op': 'delete_property', 'id': other_prop.id},
+        {'op': 'delete_term', 'term': 'existing'},
+    ]
+    count = Batch(vocab, operations).apply()
+    assert count == {
+        'terms_added': 0,
+        'properties_added': 0,
+        'properties_updated': 1,
+        'properties_deleted': 1,
+        'terms_deleted': 1,
+    }
+    assert list(vocab.terms.all()) == [other]
+    assert other.properties.count() == 0
+    deleted_prop = Property.all_objects.get(pk=prop.pk)
+    assert deleted_prop.value == 'Updated'
+    assert deleted_prop.deleted is not None
+    assert deleted_prop.deleted_by_cascade
+
+
+@pytest.mark.django_db
+def test_single_timestamp(vocab, term):
+    batch = Batch(vocab, [
+        {'op': 'add_term', 'name': 'new'},
+        {'op': 'add_property', 'term': 'new', 'predicate': 'rdfs:label', 'value': 'New'},
+        {'op': 'update_property', 'id': term.properties.get().id, 'value': 'Updated'},
+    ])
+    batch.apply()
+    assert vocab.updated == batch.timestamp
+    timestamps = set(Property.objects.values_list('modified', flat=True))
+    timestamps.update(Term.objects.filter(name='new').values_list('modified', flat=True))
+    assert timestamps == {batch.timestamp}
+
+
+@pytest.mark.django_db
+def test_invalid_batch_changes_nothing(vocab, term):
+    operations = [
+        {'op': 'add_term', 'name': 'fine'},
+        {'op': 'add_term', 'name': 'not valid!'},
+        {'op': 'add_property', 'term': 'missing', 'predicate': 'rdfs:label', 'value': 'X'},
+        {'op': 'add_property', 'term': 'existing', 'predicate': 'owl:sameAs', 'value': 'has spaces'},
+        {'op': 'add_property', 'term': 'existing', 'predicate': 'ex:unknown', 'value': 'X'},
+        {'op': 'delete_property', 'id': 0},
+    ]
+    with pytest.raises(BatchError) as exc_info:
+        Batch(vocab, operations).apply()
+    assert [e['index'] for e in exc_info.value.errors] == [1, 2, 3, 4, 5]
+    assert 'name' in exc_info.value.errors[0]['errors']
+    assert vocab.terms.count() == 1
+
+    # the valid term is not added if the property errors are the only problem
+    operations[1]['name'] = 'valid'
+    with pytest.raises(BatchError) as exc_info:
+        Batch(vocab, operations).apply()
+    assert [e['index'] for e in exc_info.value.errors] == [2, 3, 4, 5]
+    assert vocab.terms.count() == 1
+
+
+@pytest.mark.django_db
+def test_unknown_operation(vocab):
+    with pytest.raises(BatchError) as exc_info:
+        Batch(vocab, [{'op': 'rename_term'}, 'add_term']).apply()
+    assert [e['index'] for e in exc_info.value.errors] == [0, 1]
+
+
+@pytest.mark.django_db
+def test_invalid_references(vocab, term):
+    prop_id = term.properties.get().id
+    operations = [
+        {'op': 'add_property', 'term': ['existing'], 'predicate': 'rdfs:label', 'value': 'X'},
+        {'op': 'update_property', 'id': {'id': prop_id}, 'value': 'X'},
+        {'op': 'delete_property', 'id': [prop_id]},
+        {'op': 'delete_term', 'term': {'name': 'existing'}},
+        {'op': 'delete_property', 'id': True},
+    ]
+    with pytest.raises(BatchError) as exc_info:
+        Batch(vocab, operations).apply()
+    assert [e['index'] for e in exc_info.value.errors] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.django_db
+def test_duplicate_term_names(vocab, term):
+    with pytest.raises(BatchError) as exc_info:
+        Batch(vocab, [{'op': 'add_term', 'name': 'dup'}, {'op': 'add_term', 'name': 'dup'}]).apply()
+    assert [e['index'] for e in exc_info.value.errors] == [1]
+    with pytest.raises(BatchError):
+        Batch(vocab, [{'op': 'add_term', 'name': 'existing'}]).apply()
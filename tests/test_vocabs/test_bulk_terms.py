@@ -0,0 +1,97 @@
+from io import StringIO
+
+import pytest
+from plastron.namespaces import owl, rdf, rdfs
+
+from vocabs.bulk import BatchError, TermTable
+from vocabs.models import Predicate, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    Predicate.objects.get_or_create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    Predicate.objects.get_or_create(uri=rdf.type, object_type=Predicate.ObjectType.URI_REF)
+    vocab = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    Term.objects.create(vocabulary=vocab, name='existing')
+    return vocab
+
+
+def load(vocab: Vocabulary, text: str, delimiter: str = ','):
+    return TermTable(vocab, StringIO(text), delimiter=delimiter).load()
+
+
+@pytest.mark.django_db
+def test_load_terms(vocab, django_assert_max_num_queries):
+    text = (
+        'name,rdfs:label,rdf:type,<http://www.w3.org/2002/07/owl#sameAs>,rdfs:label\n'
+        'Thing,A thing,rdfs:Class,,Une chose\n'
+        'other,Other,,http://example.org/other,\n'
+        ',,,,\n'
+    )
+    # the same number of queries for any number of rows: loading the
+    # predicates, the existing names, one insert per table, interning the
+    # values, and the change notice
+    with django_assert_max_num_queries(11):
+        count = load(vocab, text)
+    assert count == {'new_terms': 2, 'new_properties': 5}
+
+    thing = vocab.terms.get(name='Thing')
+    assert {(p.predicate.uri, p.value) for p in thing.properties.all()} == {
+        (str(rdfs.label), 'A thing'),
+        (str(rdfs.label), 'Une chose'),
+        (str(rdf.type), str(rdfs.Class)),
+    }
+    other = vocab.terms.get(name='other')
+    assert other.properties.get(predicate__uri=owl.sameAs).value == 'http://example.org/other'
+    assert len({thing.modified, other.modified, *(p.modified for p in thing.properties.all())}) == 1
+
+
+@pytest.mark.django_db
+def test_load_tsv(vocab):
+    assert load(vocab, 'name\trdfs:label\nThing\tA, thing\n', delimiter='\t')['new_properties'] == 1
+    assert vocab.terms.get(name='Thing').properties.get().value == 'A, thing'
+
+
+@pytest.mark.django_db
+def test_invalid_rows(vocab):
+    text = (
+        'name,rdfs:label,owl:sameAs\n'
+        'existing,Existing,\n'
+        'bad name,Bad,\n'
+        'good,Good,not a URI\n'
+        'twice,Twice,\n'
+        'twice,Again,\n'
+        'fine,Fine,\n'
+        'extra,Extra,,,\n'
+    )
+    with pytest.raises(BatchError) as e:
+        load(vocab, text)
+    assert [(error['line'], error['name'], set(error['errors'])) for error in e.value.errors] == [
+        (2, 'existing', {'name'}),
+        (3, 'bad name', {'name'}),
+        (4, 'good', {'owl:sameAs'}),
+        (6, 'twice', {'name'}),
+        (8, 'extra', {'__all__'}),
+    ]
+    assert e.value.errors[3]['errors']['name'] == ['The name "twice" is also used on line 5']
+    # nothing is added
+    assert not vocab.terms.exclude(name='existing').exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(('text', 'message'), [
+    ('', 'The file is empty'),
+    ('label,rdfs:label\n', 'No "name" column'),
+])
+def test_invalid_header(vocab, text, message):
+    with pytest.raises(BatchError) as e:
+        load(vocab, text)
+    assert e.value.errors == [{'line': 1, 'name': None, 'errors': {'__all__': [message]}}]
+
+
+@pytest.mark.django_db
+def test_unknown_predicate(vocab):
+    with pytest.raises(BatchError) as e:
+        load(vocab, 'name,rdfs:label,foo:bar\nThing,A thing,Bar\n')
+    assert e.value.errors[0]['errors'] == {'foo:bar': ['Unknown predicate "foo:bar"']}
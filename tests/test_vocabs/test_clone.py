@@ -0,0 +1,88 @@
+import pytest
+from plastron.namespaces import owl, rdfs
+
+from vocabs.bulk import clone_vocabulary
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+FOO = 'http://example.com/foo/'
+COPY = 'http://example.com/foo-v2/'
+
+
+@pytest.fixture
+def vocab():
+    label = Predicate.objects.create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    same_as = Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    vocab = Vocabulary.objects.create(uri=FOO, label='Foo', description='Things')
+    Vocabulary.objects.create(uri=FOO + 'sub/', label='Sub')
+    red = Term.objects.create(vocabulary=vocab, name='red')
+    Property.objects.create(term=red, predicate=label, value='Red')
+    Property.objects.create(term=red, predicate=label, value=FOO + 'green')
+    Property.objects.create(term=red, predicate=same_as, value=FOO + 'green')
+    Property.objects.create(term=red, predicate=same_as, value=FOO + 'sub/x')
+    Property.objects.create(term=red, predicate=same_as, value='http://example.com/other/x')
+    Property.objects.create(term=red, predicate=label, value='Rouge').delete()
+    green = Term.objects.create(vocabulary=vocab, name='green')
+    Property.objects.create(term=green, predicate=label, value='Green')
+    Term.objects.create(vocabulary=vocab, name='gone').delete()
+    return vocab
+
+
+def triples(vocabulary: Vocabulary) -> set[tuple[str, str, str]]:
+    return {
+        (prop.term.name, prop.predicate.uri, prop.value)
+        for prop in Property.objects.filter(term__vocabulary=vocabulary).select_related('term', 'predicate')
+    }
+
+
+@pytest.mark.django_db
+def test_clone(vocab, django_assert_max_num_queries):
+    # the number of queries does not depend on the number of rows
+    with django_assert_max_num_queries(12):
+        clone, count = clone_vocabulary(vocab, COPY, label='Foo v2')
+    assert count == {'new_terms': 2, 'new_properties': 6}
+    assert (clone.uri, clone.label, clone.description, clone.is_published) == (COPY, 'Foo v2', 'Things', False)
+    assert set(clone.terms.values_list('name', flat=True)) == {'red', 'green'}
+    assert triples(clone) == {
+        ('red', str(rdfs.label), 'Red'),
+        ('red', str(rdfs.label), FOO + 'green'),
+        ('red', str(owl.sameAs), COPY + 'green'),
+        ('red', str(owl.sameAs), FOO + 'sub/x'),
+        ('red', str(owl.sameAs), 'http://example.com/other/x'),
+        ('green', str(rdfs.label), 'Green'),
+    }
+    # the original is unchanged
+    assert ('red', str(owl.sameAs), FOO + 'green') in triples(vocab)
+    assert vocab.terms.count() == 2
+
+
+@pytest.mark.django_db
+def test_clone_without_rewriting(vocab):
+    clone, count = clone_vocabulary(vocab, COPY, rewrite_references=False)
+    assert clone.label == 'Foo'
+    assert triples(clone) == triples(vocab)
+
+
+@pytest.mark.django_db
+def test_clone_view(vocab, admin_client):
+    response = admin_client.get(f'/vocabs/{vocab.id}/clone')
+    assert 'value="Foo (copy)"' in response.content.decode()
+
+    response = admin_client.post(
+        f'/vocabs/{vocab.id}/clone',
+        data={'uri': COPY, 'label': 'Foo v2', 'rewrite_references': 'on'},
+        follow=True,
+    )
+    assert 'Created 2 new terms and 6 new properties.' in response.content.decode()
+    assert Vocabulary.objects.get(uri=COPY).terms.count() == 2
+
+    response = admin_client.post(f'/vocabs/{vocab.id}/clone', data={'uri': COPY, 'label': 'Again'})
+    assert 'There is already a vocabulary' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_clone_view_requires_login(vocab, client):
+    # the login check comes before looking up the vocabulary
+    for vocab_id in (vocab.id, vocab.id + 1):
+        response = client.post(f'/vocabs/{vocab_id}/clone', data={'uri': COPY, 'label': 'Foo v2'})
+        assert response.url.startswith('/saml2/login/')
+    assert not Vocabulary.objects.filter(uri=COPY).exists()
@@ -0,0 +1,66 @@
+import pytest
+from rdflib import Graph
+from rdflib.namespace import NamespaceManager
+
+from vocabs.curies import CurieCodec, curie_codec
+
+
+@pytest.fixture
+def codec():
+    namespace_manager = NamespaceManager(Graph(), bind_namespaces='none')
+    namespace_manager.bind('ex', 'http://example.com/')
+    namespace_manager.bind('exa', 'http://example.com/a/')
+    namespace_manager.bind('exab', 'http://example.com/ab')
+    return CurieCodec(namespace_manager)
+
+
+@pytest.mark.parametrize(
+    ('uri', 'expected'),
+    [
+        ('http://example.com/foo', 'ex:foo'),
+        # longest namespace wins
+        ('http://example.com/a/foo', 'exa:foo'),
+        # not under the longer "exa:" namespace at all
+        ('http://example.com/a1', 'ex:a1'),
+        # "-c" is not a valid local name under "exab:", but "ab-c" is under "ex:"
+        ('http://example.com/ab-c', 'ex:ab-c'),
+        ('http://example.com/b/foo', 'http://example.com/b/foo'),
+        ('http://example.com/', 'http://example.com/'),
+        ('http://example.org/foo', 'http://example.org/foo'),
+    ]
+)
+def test_compact(codec, uri, expected):
+    assert codec.compact(uri) == expected
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    [
+        ('ex:foo', 'http://example.com/foo'),
+        ('exa:foo', 'http://example.com/a/foo'),
+        ('http://example.com/foo', 'http://example.com/foo'),
+        ('urn:foo', 'urn:foo'),
+        ('foo', 'foo'),
+    ]
+)
+def test_expand(codec, value, expected):
+    assert codec.expand(value) == expected
+
+
+def test_bind_rebuilds(codec):
+    assert codec.compact('http://example.net/foo') == 'http://example.net/foo'
+    codec.bind('net', 'http://example.net/')
+    assert codec.compact('http://example.net/foo') == 'net:foo'
+    assert codec.expand('net:foo') == 'http://example.net/foo'
+
+
+def test_memoized(codec):
+    for _ in range(3):
+        codec.compact('http://example.com/foo')
+    info = codec.cache_info()['compact']
+    assert (info.hits, info.misses) == (2, 1)
+
+
+def test_shared_codec():
+    assert curie_codec.compact('http://www.w3.org/2000/01/rdf-schema#label') == 'rdfs:label'
+    assert curie_codec.expand('owl:sameAs') == 'http://www.w3.org/2002/07/owl#sameAs'
@@ -0,0 +1,195 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from plastron.namespaces import rdfs
+from safedelete import HARD_DELETE
+
+from vocabs.events import ALL_MODELS, ChangeBus, ChangeEvent, ChangeType, FileChannel, change_bus, coalesce
+from vocabs.models import ChangeNotice, Predicate, Property, Term, Vocabulary
+
+
+class Recorder:
+    def __init__(self):
+        self.events: list[ChangeEvent] = []
+
+    def handle_change(self, event: ChangeEvent):
+        self.events.append(event)
+
+    def changes(self) -> list[tuple[str, ChangeType, frozenset[int] | None]]:
+        return [(e.model, e.change, e.vocabulary_ids) for e in self.events]
+
+
+@pytest.fixture
+def recorder():
+    recorder = Recorder()
+    change_bus.register(recorder)
+    yield recorder
+    change_bus.unregister(recorder)
+
+
+@pytest.fixture
+def vocab():
+    return Vocabulary.objects.create(uri='http://example.com/foo#')
+
+
+@pytest.fixture
+def label():
+    predicate, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    return predicate
+
+
+@pytest.mark.django_db(transaction=True)
+def test_term_lifecycle(vocab, label, recorder):
+    term = Term.objects.create(vocabulary=vocab, name='bar')
+    Property.objects.create(term=term, predicate=label, value='Bar')
+    term.delete()
+    term.undelete()
+    ids = frozenset([vocab.id])
+    assert recorder.changes() == [
+        ('Term', ChangeType.CREATED, ids),
+        ('Property', ChangeType.CREATED, ids),
+        # the soft delete cascades from the term to its properties
+        ('Property', ChangeType.SOFT_DELETED, ids),
+        ('Term', ChangeType.SOFT_DELETED, ids),
+        ('Term', ChangeType.UPDATED, ids),
+        ('Term', ChangeType.RESTORED, ids),
+        ('Property', ChangeType.UPDATED, ids),
+        ('Property', ChangeType.RESTORED, ids),
+    ]
+    assert recorder.events[0].instance == term
+    assert recorder.events[1].term_id == term.id
+    assert recorder.events[1].predicate_id == label.id
+
+
+@pytest.mark.django_db(transaction=True)
+def test_vocabulary_and_predicate_events(vocab, label, recorder):
+    Term.objects.create(vocabulary=vocab, name='bar')
+    recorder.events.clear()
+    vocab_id = vocab.id
+    # vocabularies are soft-deleted, along with their terms
+    vocab.delete()
+    assert ('Term', ChangeType.SOFT_DELETED, frozenset([vocab_id])) in recorder.changes()
+    assert recorder.changes()[-1] == ('Vocabulary', ChangeType.SOFT_DELETED, frozenset([vocab_id]))
+
+    # one event stands for the vocabulary and everything in it
+    recorder.events.clear()
+    vocab.delete(force_policy=HARD_DELETE)
+    assert recorder.changes() == [('Vocabulary', ChangeType.DELETED, frozenset([vocab_id]))]
+
+    label.save()
+    assert recorder.changes()[-1] == ('Predicate', ChangeType.UPDATED, None)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_property_event_without_query(vocab, label, recorder):
+    term = Term.objects.create(vocabulary=vocab, name='bar')
+    prop = Property.objects.create(term=term, predicate=label, value='Bar')
+    prop = Property.objects.select_related('term').get(pk=prop.pk)
+    with CaptureQueriesContext(connection) as queries:
+        prop.delete()
+    assert not any('FROM "vocabs_term"' in query['sql'] for query in queries.captured_queries)
+    assert recorder.changes()[-1] == ('Property', ChangeType.SOFT_DELETED, frozenset([vocab.id]))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_changes_are_not_dispatched(vocab, recorder):
+    with pytest.raises(RuntimeError), transaction.atomic():
+        Term.objects.create(vocabulary=vocab, name='bar')
+        assert recorder.events == []
+        raise RuntimeError
+    assert recorder.events == []
+
+    with transaction.atomic():
+        Term.objects.create(vocabulary=vocab, name='bar')
+        assert recorder.events == []
+    assert recorder.changes() == [('Term', ChangeType.CREATED, frozenset([vocab.id]))]
+
+
+@pytest.mark.django_db
+def test_vocabulary_delete_does_not_load_properties(vocab, label):
+    for name in ['bar', 'baz']:
+        term = Term.objects.create(vocabulary=vocab, name=name)
+        Property.objects.create(term=term, predicate=label, value=name)
+    with CaptureQueriesContext(connection) as queries:
+        vocab.delete(force_policy=HARD_DELETE)
+    assert not any(query['sql'].startswith('SELECT "vocabs_property"') for query in queries.captured_queries)
+    assert not Property.all_objects.exists()
+
+
+def test_coalesce():
+    term_updated = ChangeEvent('Term', ChangeType.UPDATED, 1, frozenset([1]), term_id=1)
+    term_restored = term_updated._replace(change=ChangeType.RESTORED)
+    other_term = ChangeEvent('Term', ChangeType.CREATED, 2, frozenset([2]), term_id=2)
+    predicate = ChangeEvent('Predicate', ChangeType.UPDATED, 1, None, predicate_id=1)
+
+    assert coalesce([term_updated]) == term_updated
+    assert coalesce([term_updated, term_restored]) == term_restored
+    assert coalesce([term_updated, other_term]) == ChangeEvent('Vocabulary', ChangeType.UPDATED, 1, frozenset([1, 2]))
+    assert coalesce([term_updated, predicate]).model == ALL_MODELS
+
+
+@pytest.mark.django_db(transaction=True)
+def test_database_channel(vocab, label):
+    # stands in for a second server process
+    other_process = ChangeBus()
+    recorder = Recorder()
+    other_process.register(recorder)
+    other_process.sync()
+
+    term = Term.objects.create(vocabulary=vocab, name='bar')
+    assert ChangeNotice.objects.filter(model='Term', object_id=term.id, origin=change_bus.origin).exists()
+    other_process.sync()
+    assert recorder.changes() == [('Term', ChangeType.CREATED, frozenset([vocab.id]))]
+    assert recorder.events[0].instance is None
+
+    # the other process's own changes are not delivered back to it
+    other_process.publish(recorder.events[0])
+    other_process.sync()
+    assert len(recorder.events) == 2
+
+    # the changes of a transaction are written as one notice
+    notices = ChangeNotice.objects.count()
+    with transaction.atomic():
+        term = Term.objects.create(vocabulary=vocab, name='baz')
+        Property.objects.create(term=term, predicate=label, value='Baz')
+        assert ChangeNotice.objects.count() == notices
+    assert ChangeNotice.objects.count() == notices + 1
+    other_process.sync()
+    assert recorder.changes()[-1] == ('Vocabulary', ChangeType.UPDATED, frozenset([vocab.id]))
+
+    # nothing is sent for a transaction that is rolled back
+    with pytest.raises(RuntimeError), transaction.atomic():
+        Term.objects.create(vocabulary=vocab, name='qux')
+        raise RuntimeError
+    assert ChangeNotice.objects.count() == notices + 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_interval(vocab):
+    other_process = ChangeBus()
+    recorder = Recorder()
+    other_process.register(recorder)
+    other_process.sync()
+
+    Term.objects.create(vocabulary=vocab, name='bar')
+    other_process.sync(interval=60)
+    assert recorder.events == []
+    other_process.sync()
+    assert len(recorder.events) == 1
+
+
+@pytest.mark.django_db
+def test_file_channel(tmp_path, vocab, django_capture_on_commit_callbacks):
+    path = tmp_path / 'changes.jsonl'
+    sender, receiver = FileChannel(path), FileChannel(path)
+    assert receiver.receive('receiver') == []
+
+    event = ChangeEvent('Term', ChangeType.UPDATED, 1, frozenset([vocab.id]), term_id=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        sender.send('sender', event)
+    assert receiver.receive('receiver') == [event]
+    assert receiver.receive('receiver') == []
+    assert sender.receive('sender') == []
+
+    path.write_bytes(b'')
+    assert [e.model for e in receiver.receive('receiver')] == [ALL_MODELS]
@@ -5,6 +5,7 @@ from vocabs.forms import VocabularyForm, PropertyForm, TermForm
 from vocabs.models import Vocabulary, Term, Predicate
 
 
+@pytest.mark.django_db
 @pytest.mark.parametrize(
     ('data', 'expected_validity'),
     [
@@ -20,6 +21,14 @@ def test_vocabulary_form(data, expected_validity):
     assert form.is_valid() is expected_validity
 
 
+@pytest.mark.django_db
+def test_vocabulary_form_unique_uri():
+    Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    form = VocabularyForm({'uri': 'http://example.com/foo#', 'label': 'Other Foo'})
+    assert not form.is_valid()
+    assert 'uri' in form.errors
+
+
 @pytest.fixture
 def vocab():
     vocab, _ = Vocabulary.objects.get_or_create(uri='http://example.com/foo#')
@@ -93,3 +102,14 @@ def test_property_form_uriref_validation(vocab, rdf_type_predicate, term, value,
 def test_term_form_name_validation(vocab, name, expected_validity):
     form = TermForm({'name': name, 'vocabulary': vocab})
     assert form.is_valid() == expected_validity
+
+
+@pytest.mark.django_db
+def test_property_form_autocomplete(term, rdf_type_predicate, rdfs_label_predicate):
+    form = PropertyForm(initial={'term': term, 'predicate': rdf_type_predicate})
+    assert form.fields['value'].widget.attrs['hx-get'] == '/autocomplete'
+    assert form.fields['value'].widget.attrs['list'] == f'value-suggestions-{term.pk}-{rdf_type_predicate.pk}'
+
+    # no suggestions for literal values
+    form = PropertyForm(initial={'term': term, 'predicate': rdfs_label_predicate})
+    assert 'hx-get' not in form.fields['value'].widget.attrs
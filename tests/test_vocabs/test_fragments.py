@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+from plastron.namespaces import owl, rdfs
+
+from vocabs.fragments import TermRowCache, term_row_cache
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def label():
+    predicate, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    return predicate
+
+
+@pytest.fixture
+def vocab(label):
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    for name in ['red', 'green']:
+        term = Term.objects.create(vocabulary=vocab, name=name)
+        Property.objects.create(term=term, predicate=label, value=name.title())
+    return vocab
+
+
+def render(cache: TermRowCache, vocab: Vocabulary) -> list[str]:
+    terms = vocab.terms.order_by('name').prefetch_related('properties__predicate')
+    return cache.render(terms, Predicate.objects.all())
+
+
+@pytest.mark.django_db
+def test_renders_only_stale_rows(vocab, label):
+    cache = TermRowCache(max_size=10)
+    first = render(cache, vocab)
+    assert 'Green' in first[0] and 'Red' in first[1]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    assert render(cache, vocab) == first
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    Property.objects.create(term=vocab.terms.get(name='red'), predicate=label, value='Rouge')
+    rows = render(cache, vocab)
+    assert rows[0] == first[0]
+    assert 'Rouge' in rows[1]
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert cache.stats()['hit_rate'] == 0.5
+
+
+@pytest.mark.django_db
+def test_stale_when_updated_elsewhere(vocab):
+    cache = TermRowCache(max_size=10)
+    render(cache, vocab)
+    # bulk updates send no signals
+    Property.objects.filter(value='Red').update(value='Rot', modified=datetime.now(timezone.utc))
+    assert 'Rot' in render(cache, vocab)[1]
+
+    # a new predicate changes the "Add a property" menu of every row
+    Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    assert all('owl:sameAs' in row for row in render(cache, vocab))
+    assert cache.misses == 5
+
+
+@pytest.mark.django_db
+def test_evicts_least_recently_used(vocab):
+    cache = TermRowCache(max_size=1)
+    render(cache, vocab)
+    assert len(cache) == 1
+    assert cache.evictions == 1
+    assert vocab.terms.get(name='red').id in cache
+
+
+@pytest.mark.django_db
+def test_invalidated_by_change_events(vocab, django_capture_on_commit_callbacks):
+    render(term_row_cache, vocab)
+    red = vocab.terms.get(name='red')
+    assert red.id in term_row_cache
+    with django_capture_on_commit_callbacks(execute=True):
+        red.delete()
+    assert red.id not in term_row_cache
+    assert len(term_row_cache) == 1
+
+
+@pytest.mark.django_db
+def test_vocabulary_page(admin_client, vocab):
+    for _ in range(2):
+        response = admin_client.get(f'/vocabs/{vocab.id}')
+        assert response.status_code == 200
+        assert b'Green' in response.content and b'Red' in response.content
+    assert (term_row_cache.hits, term_row_cache.misses) == (2, 2)
+
+    stats = admin_client.get('/caches').json()
+    assert stats['term_rows']['hit_rate'] == 0.5
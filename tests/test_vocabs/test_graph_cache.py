@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+from plastron.namespaces import rdfs
+
+from vocabs.graph_cache import GraphCache, graph_cache
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def label():
+    predicate, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    return predicate
+
+
+def make_vocab(uri: str, *names: str) -> Vocabulary:
+    vocab = Vocabulary.objects.create(uri=uri)
+    for name in names:
+        Term.objects.create(vocabulary=vocab, name=name)
+    return vocab
+
+
+@pytest.mark.django_db
+def test_hit_and_miss():
+    vocab = make_vocab('http://example.com/a#', 'one', 'two')
+    graph, _ = graph_cache.get(vocab)
+    assert len(graph) == 2
+    assert graph_cache.get(vocab)[0] is graph
+    stats = graph_cache.stats()
+    assert (stats['graphs'], stats['triples'], stats['hits'], stats['misses']) == (1, 2, 1, 1)
+
+
+@pytest.mark.django_db
+def test_invalidated_by_signals(label, django_capture_on_commit_callbacks):
+    vocab = make_vocab('http://example.com/a#', 'one')
+    graph_cache.get(vocab)
+    with django_capture_on_commit_callbacks(execute=True):
+        Property.objects.create(term=vocab.terms.get(name='one'), predicate=label, value='One')
+    assert vocab.id not in graph_cache
+    graph, _ = graph_cache.get(vocab)
+    assert len(graph) == 2
+
+    graph_cache.get(vocab)
+    with django_capture_on_commit_callbacks(execute=True):
+        vocab.terms.get(name='one').delete()
+    assert vocab.id not in graph_cache
+    assert len(graph_cache.get(vocab)[0]) == 0
+
+
+@pytest.mark.django_db
+def test_stale_when_updated_elsewhere():
+    vocab = make_vocab('http://example.com/a#', 'one')
+    graph_cache.get(vocab)
+    # a bulk update in another process sends no signals here
+    Term.objects.filter(vocabulary=vocab).update(name='uno', modified=datetime.now(timezone.utc))
+    graph, _ = graph_cache.get(vocab)
+    assert graph_cache.misses == 2
+    assert {str(o) for o in graph.objects()} == {'uno'}
+
+
+@pytest.mark.django_db
+def test_evicts_least_recently_used():
+    cache = GraphCache(max_triples=5)
+    a = make_vocab('http://example.com/a#', 'one', 'two')
+    b = make_vocab('http://example.com/b#', 'one', 'two')
+    c = make_vocab('http://example.com/c#', 'one', 'two')
+    cache.get(a)
+    cache.get(b)
+    cache.get(a)
+    cache.get(c)
+    assert a.id in cache
+    assert b.id not in cache
+    assert cache.evictions == 1
+    assert cache.total_triples == 4
+
+    big = make_vocab('http://example.com/big#', *(f't{n}' for n in range(6)))
+    cache.get(big)
+    assert big.id not in cache
+    assert len(cache) == 2
@@ -0,0 +1,180 @@
+import tarfile
+from io import BytesIO
+from zipfile import ZipFile
+
+import pytest
+from plastron.namespaces import rdfs
+
+from vocabs.bulk import import_dataset
+from vocabs.datasets import DatasetTooLarge, Member, namespace_of, parse_members, read_members
+from vocabs.models import Property, Term, Vocabulary
+
+TRIG = b'''
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix vann: <http://purl.org/vocab/vann/> .
+
+<http://example.com/colors#> {
+    <http://example.com/colors#> rdfs:label "Colours" ; vann:preferredNamespacePrefix "colors" .
+    <http://example.com/colors#red> a rdfs:Class ; rdfs:label "Red" .
+}
+
+<http://example.com/shapes/> {
+    <http://example.com/shapes/square> rdfs:label "Square" .
+    <http://example.com/shapes/round/circle> rdfs:label "Circle" .
+}
+
+<http://example.com/shapes/round/> {
+    <http://example.com/shapes/round/> rdfs:label "Round Shapes" .
+}
+
+<http://example.com/elsewhere#thing> rdfs:label "Elsewhere" .
+'''
+
+COLORS = b'''
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+
+<http://example.com/colors#> a owl:Ontology .
+<http://example.com/colors#red> rdfs:label "Red" .
+<http://example.com/colors#green> rdfs:label "Green" .
+'''
+
+SIZES = b'<http://example.com/sizes/large> <http://www.w3.org/2000/01/rdf-schema#label> "Large" .\n'
+
+
+def zip_archive(files: dict[str, bytes]) -> BytesIO:
+    buffer = BytesIO()
+    with ZipFile(buffer, 'w') as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def tar_archive(files: dict[str, bytes]) -> BytesIO:
+    buffer = BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+def test_namespace_of():
+    namespaces = {'http://example.com/shapes/', 'http://example.com/shapes/round/', 'http://example.com/colors#'}
+    assert namespace_of('http://example.com/shapes/square', namespaces) == 'http://example.com/shapes/'
+    assert namespace_of('http://example.com/shapes/round/circle', namespaces) == 'http://example.com/shapes/round/'
+    assert namespace_of('http://example.com/colors#a/b', namespaces) == 'http://example.com/colors#'
+    assert namespace_of('http://example.com/other', namespaces) is None
+
+
+@pytest.mark.django_db
+def test_import_trig():
+    report = import_dataset(BytesIO(TRIG), 'legacy.trig', workers=0)
+    assert report.errors == []
+    assert report.unrouted == ['http://example.com/elsewhere#thing']
+    assert [(v['uri'], v['created'], v['new_terms'], v['new_properties']) for v in report.vocabularies] == [
+        ('http://example.com/colors#', True, 1, 2),
+        ('http://example.com/shapes/', True, 1, 1),
+        ('http://example.com/shapes/round/', True, 1, 1),
+    ]
+    colors = Vocabulary.objects.get(uri='http://example.com/colors#')
+    assert colors.label == 'Colours'
+    assert colors.preferred_prefix == 'colors'
+    assert Vocabulary.objects.get(uri='http://example.com/shapes/round/').label == 'Round Shapes'
+    assert Term.objects.get(name='circle').vocabulary.uri == 'http://example.com/shapes/round/'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('archive', [zip_archive, tar_archive])
+def test_import_archive(archive):
+    existing = Vocabulary.objects.create(uri='http://example.com/sizes/', label='Sizes')
+    files = {
+        'legacy/colors.ttl': COLORS,
+        'legacy/sizes.nt': SIZES,
+        'legacy/broken.ttl': b'not turtle',
+        'legacy/README': b'Legacy vocabularies',
+        '__MACOSX/legacy/._colors.ttl': b'',
+    }
+    report = import_dataset(archive(files), 'legacy.zip' if archive is zip_archive else 'legacy.tar.gz', workers=0)
+    assert [error['file'] for error in report.errors] == ['legacy/broken.ttl', 'legacy/README']
+    assert report.vocabularies == [
+        {'uri': 'http://example.com/colors#', 'created': True, 'subjects': 2, 'new_terms': 2, 'new_properties': 2},
+        {'uri': 'http://example.com/sizes/', 'created': False, 'subjects': 1, 'new_terms': 1, 'new_properties': 1},
+    ]
+    assert existing.terms.get().properties.get().value == 'Large'
+
+
+@pytest.mark.django_db
+def test_import_again_adds_nothing():
+    import_dataset(BytesIO(TRIG), 'legacy.trig', workers=0)
+    report = import_dataset(zip_archive({'colors.ttl': COLORS}), 'colors.zip', workers=0)
+    assert report.vocabularies == [
+        {'uri': 'http://example.com/colors#', 'created': False, 'subjects': 2, 'new_terms': 1, 'new_properties': 1},
+    ]
+    assert set(
+        Property.objects.filter(predicate__uri=rdfs.label, term__name='red').values_list('value', flat=True)
+    ) == {'Red'}
+
+
+@pytest.mark.django_db
+def test_import_in_worker_processes():
+    files = {f'sizes-{i}.nt': SIZES.replace(b'large', f'size{i}'.encode()) for i in range(4)}
+    Vocabulary.objects.create(uri='http://example.com/sizes/', label='Sizes')
+    report = import_dataset(zip_archive(files), 'sizes.zip', workers=2)
+    assert report.vocabularies == [
+        {'uri': 'http://example.com/sizes/', 'created': False, 'subjects': 4, 'new_terms': 4, 'new_properties': 4},
+    ]
+
+
+def test_read_members_limits():
+    files = {f'sizes-{i}.nt': SIZES for i in range(3)}
+    assert len(list(read_members(zip_archive(files), 'sizes.zip', max_members=3, max_size=3 * len(SIZES)))) == 3
+    with pytest.raises(DatasetTooLarge, match='More than 2 files'):
+        list(read_members(zip_archive(files), 'sizes.zip', max_members=2))
+    with pytest.raises(DatasetTooLarge, match='More than 100 bytes'):
+        list(read_members(tar_archive(files), 'sizes.tar.gz', max_size=100))
+    with pytest.raises(DatasetTooLarge):
+        list(read_members(BytesIO(SIZES), 'sizes.nt', max_size=10))
+
+
+def test_read_members_stops_decompressing_at_the_limit():
+    # a small archive of a large, highly compressible file
+    archive = zip_archive({'zeros.nt': bytes(50 * 1024 * 1024)})
+    members = read_members(archive, 'zeros.zip', max_size=1024)
+    with pytest.raises(DatasetTooLarge):
+        next(members)
+
+
+def test_members_are_sent_to_workers_as_they_are_needed():
+    read = []
+
+    def members():
+        for i in range(20):
+            read.append(i)
+            yield Member(f'sizes-{i}.nt', SIZES, 'nt')
+
+    parsed = parse_members(members(), workers=2)
+    assert next(parsed).name == 'sizes-0.nt'
+    assert len(read) == 4
+    parsed.close()
+
+
+@pytest.mark.django_db
+def test_import_too_large(settings):
+    settings.IMPORT_MAX_FILES = 1
+    files = {'colors.ttl': COLORS, 'sizes.nt': SIZES}
+    with pytest.raises(DatasetTooLarge):
+        import_dataset(zip_archive(files), 'legacy.zip', workers=0)
+    assert not Vocabulary.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_skips_deleted_vocabularies():
+    Vocabulary.objects.create(uri='http://example.com/sizes/', label='Sizes').delete()
+    report = import_dataset(BytesIO(SIZES), 'sizes.nt', workers=0)
+    assert report.vocabularies == []
+    assert 'has been deleted' in report.errors[0]['error']
+    assert not Term.all_objects.filter(name='large').exists()
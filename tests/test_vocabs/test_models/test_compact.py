@@ -0,0 +1,126 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from plastron.namespaces import rdfs
+from safedelete.config import DELETED_VISIBLE
+
+from vocabs.bulk import restore_deleted, soft_delete_terms, soft_delete_vocabularies
+from vocabs.models import ArchivedProperty, ArchivedTerm, ArchivedVocabulary, Predicate, Property, Term, Vocabulary
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    label, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    for name in ['red', 'green', 'blue']:
+        term = Term.objects.create(vocabulary=vocab, name=name)
+        Property.objects.create(term=term, predicate=label, value=name.title())
+        Property.objects.create(term=term, predicate=label, value=name.upper())
+    return vocab
+
+
+def delete(queryset, days: int):
+    """Deletes the objects (and their cascaded properties), as if it was done the given number of days ago."""
+    instances = list(queryset)
+    for instance in instances:
+        instance.delete()
+    timestamp = timezone.now() - timedelta(days=days)
+    ids = [instance.pk for instance in instances]
+    # bulk updates only reach soft-deleted rows with forced visibility
+    queryset.model.all_objects.all(force_visibility=DELETED_VISIBLE).filter(pk__in=ids).update(
+        deleted=timestamp, modified=timestamp
+    )
+    if queryset.model is Term:
+        Property.all_objects.all(force_visibility=DELETED_VISIBLE).filter(
+            term_id__in=ids, deleted_by_cascade=True
+        ).update(
+            deleted=timestamp, modified=timestamp
+        )
+
+
+def compact(*args: str) -> str:
+    out = StringIO()
+    call_command('compact', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_compact(vocab):
+    delete(Term.objects.filter(name='red'), days=100)
+    delete(Property.objects.filter(value='GREEN'), days=100)
+    # too recent to archive
+    delete(Property.objects.filter(value='Blue'), days=10)
+    updated = vocab.updated
+
+    assert 'Would archive 0 vocabulary(ies), 1 term(s), and 3 property(ies)' in compact('--days', '30', '--dry-run')
+    assert Property.all_objects.count() == 6
+
+    output = compact('--days', '30')
+    assert 'Archived 0 vocabulary(ies), 1 term(s), and 3 property(ies)' in output
+    assert 'reclaiming about' in output
+    assert set(ArchivedProperty.objects.values_list('value', flat=True)) == {'Red', 'RED', 'GREEN'}
+    assert ArchivedTerm.objects.get().name == 'red'
+    assert Term.all_objects.count() == 2
+    assert set(Property.all_objects.values_list('value', flat=True)) == {'Green', 'Blue', 'BLUE'}
+
+    vocab.refresh_from_db()
+    assert vocab.updated == updated
+
+
+@pytest.mark.django_db
+def test_term_with_recent_property_kept(vocab):
+    term = Term.objects.get(name='red')
+    delete(term.properties.filter(value='RED'), days=10)
+    delete(Term.objects.filter(name='red'), days=100)
+
+    assert 'Archived 0 vocabulary(ies), 0 term(s), and 1 property(ies)' in compact('--days', '30')
+    assert Term.all_objects.filter(name='red').exists()
+
+
+@pytest.mark.django_db
+def test_deleted_vocabulary_archived_as_a_whole(vocab):
+    Term.objects.get(name='red').delete()
+    batch, _ = soft_delete_vocabularies(Vocabulary.objects.filter(pk=vocab.pk))
+    # the terms of a recently deleted vocabulary stay, however old their own deletion is
+    all_terms = Term.all_objects.all(force_visibility=DELETED_VISIBLE)
+    all_terms.filter(name='red').update(deleted=timezone.now() - timedelta(days=100))
+    assert 'Archived 0 vocabulary(ies), 0 term(s), and 0 property(ies)' in compact('--days', '30')
+    assert restore_deleted(vocab, batch) == {'vocabularies': 1, 'terms': 2, 'properties': 4}
+
+    batch, _ = soft_delete_vocabularies(Vocabulary.objects.filter(pk=vocab.pk))
+    Vocabulary.all_objects.all(force_visibility=DELETED_VISIBLE).update(deleted=timezone.now() - timedelta(days=100))
+    assert 'Would archive 1 vocabulary(ies), 3 term(s), and 6 property(ies)' in compact('--days', '30', '--dry-run')
+    assert 'Archived 1 vocabulary(ies), 3 term(s), and 6 property(ies)' in compact('--days', '30')
+    assert not Vocabulary.all_objects.all(force_visibility=DELETED_VISIBLE).exists()
+    assert not all_terms.exists()
+    assert ArchivedVocabulary.objects.get().uri == vocab.uri
+    assert set(ArchivedTerm.objects.values_list('vocabulary_id', flat=True)) == {vocab.id}
+
+
+@pytest.mark.django_db
+def test_partly_archived_batch_not_restored(vocab):
+    batch, _ = soft_delete_terms(vocab.terms.all())
+    # as if "compact" had archived one of the properties, but not yet the rest
+    prop = Property.all_objects.all(force_visibility=DELETED_VISIBLE).filter(term__name='red').first()
+    ArchivedProperty.objects.create(
+        id=prop.id,
+        term_id=prop.term_id,
+        predicate_uri=rdfs.label,
+        value=prop.value,
+        created=prop.created,
+        modified=prop.modified,
+        deleted=batch,
+    )
+
+    with pytest.raises(ValueError, match='have been archived'):
+        restore_deleted(vocab, batch)
+    assert not vocab.terms.exists()
+    assert Term.all_objects.filter(deleted=batch).count() == 3
+
+
+def test_invalid_arguments():
+    with pytest.raises(CommandError, match='must be positive'):
+        compact('--batch-size', '0')
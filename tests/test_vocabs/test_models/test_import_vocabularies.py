@@ -0,0 +1,32 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from vocabs.models import Term
+
+NQUADS = (
+    b'<http://example.com/sizes/> <http://purl.org/vocab/vann/preferredNamespacePrefix> "sizes" '
+    b'<http://example.com/sizes/> .\n'
+    b'<http://example.com/sizes/large> <http://www.w3.org/2000/01/rdf-schema#label> "Large" '
+    b'<http://example.com/sizes/> .\n'
+    b'<http://example.com/elsewhere#thing> <http://www.w3.org/2000/01/rdf-schema#label> "Elsewhere" .\n'
+)
+
+
+@pytest.mark.django_db
+def test_import_vocabularies(tmp_path, capsys):
+    path = tmp_path / 'sizes.nq'
+    path.write_bytes(NQUADS)
+    call_command('import_vocabularies', str(path), '--workers', '0')
+    captured = capsys.readouterr()
+    assert 'http://example.com/sizes/ (created): 1 subject(s), 1 new term(s)' in captured.out
+    assert 'Imported 1 vocabulary(ies)' in captured.out
+    assert '1 subject(s) outside every vocabulary were not imported' in captured.err
+    assert Term.objects.filter(vocabulary__uri='http://example.com/sizes/', name='large').exists()
+
+
+@pytest.mark.django_db
+def test_import_vocabularies_invalid_archive(tmp_path):
+    path = tmp_path / 'broken.zip'
+    path.write_bytes(b'not a zip file')
+    with pytest.raises(CommandError, match='Invalid file'):
+        call_command('import_vocabularies', str(path))
@@ -1,6 +1,9 @@
+from io import StringIO
+
 import pytest
 from django.core.management import call_command
 from django.core.management.base import CommandError
+from vocabs.management.commands.load_predicates import expand_predicate
 from vocabs.models import Predicate
 
 
@@ -41,3 +44,57 @@ def test_bad_csvs(datadir, filename, message):
     opts = {"file": datadir / filename}
     with pytest.raises(CommandError, match=message):
         call_command('load_predicates', *args, **opts)
+
+
+@pytest.mark.django_db
+def test_load_predicates_bulk(datadir):
+    Predicate.objects.create(uri='http://example.com/ns#b', object_type='Literal')
+    out = StringIO()
+    call_command('load_predicates', file=datadir / 'bulk.csv', bulk=True, stdout=out)
+
+    assert set(Predicate.objects.values_list('uri', 'object_type')) == {
+        ('http://www.w3.org/2000/01/rdf-schema#label', 'Literal'),
+        ('http://example.com/ns#a', 'URIRef'),
+        ('http://example.com/ns#b', 'Literal'),
+    }
+    output = out.getvalue()
+    assert '4 row(s)' in output
+    assert '3 distinct, 1 duplicate, 0 invalid' in output
+    assert '2 created, 1 existing' in output
+
+
+@pytest.mark.django_db
+def test_load_predicates_bulk_invalid(datadir):
+    err = StringIO()
+    with pytest.raises(CommandError, match='Invalid rows: 4 of 5; no predicates were added'):
+        call_command('load_predicates', file=datadir / 'bulk_invalid.csv', bulk=True, stderr=err)
+
+    assert Predicate.objects.count() == 0
+    assert err.getvalue().splitlines() == [
+        'Line 3: "foo bar" is not a CURIE or a URI',
+        'Line 4: unknown object_type "Thing" (expected one of: URIRef, Literal)',
+        'Line 5: missing predicate or object_type',
+        "Line 6: extra column found: ['extra']",
+    ]
+
+
+@pytest.mark.parametrize(
+    ('value', 'uri'),
+    [
+        ('rdfs:label', 'http://www.w3.org/2000/01/rdf-schema#label'),
+        ('<http://example.com/ns#a>', 'http://example.com/ns#a'),
+        ('http://example.com/ns#a', 'http://example.com/ns#a'),
+        ('urn:example:a', 'urn:example:a'),
+        ('tag:example.com,2026:a', 'tag:example.com,2026:a'),
+        ('info:lccn/2002022641', 'info:lccn/2002022641'),
+        ('mailto:someone@example.com', 'mailto:someone@example.com'),
+    ]
+)
+def test_expand_predicate(value, uri):
+    assert expand_predicate(value) == uri
+
+
+@pytest.mark.parametrize('value', ['label', 'foo bar', '<rdfs label>', ':label'])
+def test_expand_invalid_predicate(value):
+    with pytest.raises(ValueError):
+        expand_predicate(value)
@@ -3,6 +3,7 @@ import vocabs
 from freezegun import freeze_time
 import pytest
 from plastron.namespaces import rdfs
+from safedelete import HARD_DELETE
 
 from vocabs.models import Vocabulary, Term, Predicate, Property
 
@@ -112,15 +113,25 @@ def test_property_deleted_timestamp_set_when_property_is_deleted(prop):
 
 
 @pytest.mark.django_db
-def test_vocabulary_delete_hard_deletes_dependent_term_and_property(vocab, prop):
+def test_vocabulary_delete_soft_deletes_dependent_term_and_property(vocab, prop):
     assert 1 == len(Vocabulary.objects.all())
     assert 1 == len(Term.objects.all())
     assert 1 == len(Property.objects.all())
 
     vocab.delete()
 
-    # Verify hard delete
+    # Verify soft delete
     assert 0 == len(Vocabulary.objects.all())
+    assert 1 == len(Vocabulary.objects.all_with_deleted())
+    assert 0 == len(Term.objects.all())
+    assert Term.objects.all_with_deleted().get().deleted_by_cascade
+    assert 0 == len(Property.objects.all())
+    assert 1 == len(Property.objects.all_with_deleted())
+
+    vocab.delete(force_policy=HARD_DELETE)
+
+    # Verify hard delete
+    assert 0 == len(Vocabulary.objects.all_with_deleted())
     assert 0 == len(Term.objects.all())
     assert 0 == len(Term.objects.all_with_deleted())
     assert 0 == len(Property.objects.all())
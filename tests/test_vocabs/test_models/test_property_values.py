@@ -0,0 +1,60 @@
+import pytest
+from plastron.namespaces import owl, rdf, rdfs
+
+from vocabs.models import Predicate, Property, Term, Vocabulary, import_vocabulary, property_rows
+
+
+@pytest.fixture
+def vocab():
+    return Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+
+
+@pytest.fixture
+def rdf_type():
+    predicate, _ = Predicate.objects.get_or_create(uri=rdf.type, object_type=Predicate.ObjectType.URI_REF)
+    return predicate
+
+
+def add_terms(vocab: Vocabulary, predicate: Predicate, *names: str, value: str = str(rdfs.Class)) -> list[Property]:
+    return [
+        Property.objects.create(term=Term.objects.create(vocabulary=vocab, name=name), predicate=predicate, value=value)
+        for name in names
+    ]
+
+
+@pytest.mark.django_db
+def test_property_rows(vocab, rdf_type, django_assert_num_queries):
+    red, green, blue = add_terms(vocab, rdf_type, 'red', 'green', 'blue')
+    Property.objects.filter(pk=blue.pk).update(value=str(owl.Class))
+
+    with django_assert_num_queries(1):
+        rows = property_rows(Property.objects.filter(term__vocabulary=vocab).order_by('term__name'))
+    assert [(term_id, value) for term_id, _, _, value in rows] == [
+        (blue.term_id, str(owl.Class)),
+        (green.term_id, str(rdfs.Class)),
+        (red.term_id, str(rdfs.Class)),
+    ]
+    # repeated values are shared
+    assert rows[1][3] is rows[2][3]
+
+
+@pytest.mark.django_db
+def test_graph_shares_nodes(vocab, rdf_type):
+    add_terms(vocab, rdf_type, 'red', 'green')
+    graph, _ = vocab.graph()
+    objects = list(graph.objects(predicate=rdf.type))
+    assert objects == [rdfs.Class, rdfs.Class]
+    assert objects[0] is objects[1]
+
+
+@pytest.mark.django_db
+def test_import(tmp_path):
+    file = tmp_path / 'colors.ttl'
+    file.write_text(
+        '@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n'
+        '<http://example.com/colors#red> a rdfs:Class .\n'
+        '<http://example.com/colors#green> a rdfs:Class .\n'
+    )
+    import_vocabulary(str(file), 'http://example.com/colors#', 'turtle')
+    assert Property.objects.count() == 2
+    assert set(Property.objects.values_list('value', flat=True)) == {str(rdfs.Class)}
@@ -0,0 +1,43 @@
+import pytest
+from plastron.namespaces import owl, rdfs
+
+from vocabs.models import Predicate, Property, Term, Vocabulary, references_to
+
+
+@pytest.fixture
+def terms():
+    same_as, _ = Predicate.objects.get_or_create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    label, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    foo = Vocabulary.objects.create(uri='http://example.com/foo#', label='Foo')
+    bar = Vocabulary.objects.create(uri='http://example.com/bar#', label='Bar')
+    target = Term.objects.create(vocabulary=foo, name='target')
+    source1 = Term.objects.create(vocabulary=foo, name='source1')
+    source2 = Term.objects.create(vocabulary=bar, name='source2')
+    Property.objects.create(term=source1, predicate=same_as, value=target.uri)
+    Property.objects.create(term=source2, predicate=same_as, value=target.uri)
+    # literal values that happen to match the URI are not references
+    Property.objects.create(term=source2, predicate=label, value=target.uri)
+    # neither are self-references
+    Property.objects.create(term=target, predicate=same_as, value=target.uri)
+    return target, source1, source2
+
+
+@pytest.mark.django_db
+def test_incoming_references(terms):
+    target, source1, source2 = terms
+    assert [prop.term for prop in target.incoming_references] == [source2, source1]
+    assert source1.incoming_references.count() == 0
+
+
+@pytest.mark.django_db
+def test_deleted_references_are_ignored(terms):
+    target, source1, source2 = terms
+    source1.delete()
+    assert [prop.term for prop in target.incoming_references] == [source2]
+
+
+@pytest.mark.django_db
+def test_references_to(terms):
+    target, _, _ = terms
+    assert references_to(target.uri).count() == 3
+    assert references_to('http://example.com/nothing').count() == 0
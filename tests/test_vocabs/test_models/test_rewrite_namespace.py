@@ -0,0 +1,39 @@
+import pytest
+from django.core.management import CommandError, call_command
+from plastron.namespaces import owl
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+OLD = 'http://example.com/foo/'
+NEW = 'http://example.org/bar/'
+
+
+@pytest.fixture
+def vocabs():
+    same_as = Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    related = Predicate.objects.create(uri=OLD + 'related', object_type=Predicate.ObjectType.URI_REF)
+    foo = Vocabulary.objects.create(uri=OLD, label='Foo')
+    Term.objects.create(vocabulary=foo, name='thing')
+    other = Vocabulary.objects.create(uri='http://example.com/other/', label='Other')
+    x = Term.objects.create(vocabulary=other, name='x')
+    Property.objects.create(term=x, predicate=same_as, value=OLD + 'thing')
+    uses_predicate = Vocabulary.objects.create(uri='http://example.com/uses/', label='Uses')
+    Property.objects.create(
+        term=Term.objects.create(vocabulary=uses_predicate, name='z'),
+        predicate=related,
+        value='http://example.com/other/x',
+    )
+
+
+@pytest.mark.django_db
+def test_rewrite_namespace(vocabs, capsys):
+    call_command('rewrite_namespace', OLD, NEW, '--dry-run')
+    output = capsys.readouterr().out
+    assert 'Would rewrite 1 property value(s) and 1 predicate(s) in 3 vocabulary(ies)' in output
+    assert f'  {OLD} (Foo)' in output
+
+    call_command('rewrite_namespace', OLD, NEW)
+    assert 'Rewrote 1' in capsys.readouterr().out
+    assert Vocabulary.objects.filter(uri=NEW).exists()
+    with pytest.raises(CommandError):
+        call_command('rewrite_namespace', OLD, NEW)
@@ -0,0 +1,112 @@
+import pytest
+from plastron.namespaces import owl, rdfs
+from rdflib import URIRef
+
+from vocabs.graph_cache import graph_cache
+from vocabs.models import Predicate, Property, Term, Vocabulary
+from vocabs.namespaces import rewrite_namespace
+
+OLD = 'http://example.com/foo/'
+NEW = 'http://example.org/bar/'
+
+
+@pytest.fixture
+def vocabs():
+    label = Predicate.objects.create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    same_as = Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    related = Predicate.objects.create(uri=OLD + 'related', object_type=Predicate.ObjectType.URI_REF)
+    foo = Vocabulary.objects.create(uri=OLD, label='Foo')
+    # a separate namespace inside the old one
+    sub = Vocabulary.objects.create(uri=OLD + 'sub/', label='Sub')
+    other = Vocabulary.objects.create(uri='http://example.com/other/', label='Other')
+    unrelated = Vocabulary.objects.create(uri='http://example.com/unrelated/', label='Unrelated')
+    uses_predicate = Vocabulary.objects.create(uri='http://example.com/uses/', label='Uses')
+
+    Term.objects.create(vocabulary=foo, name='thing')
+    term = Term.objects.create(vocabulary=other, name='x')
+    Property.objects.create(term=term, predicate=same_as, value=OLD + 'thing')
+    Property.objects.create(term=term, predicate=same_as, value=OLD + 'sub/thing')
+    Property.objects.create(term=term, predicate=same_as, value=OLD.upper() + 'thing')
+    Property.objects.create(term=term, predicate=label, value=OLD + 'thing')
+    Property.objects.create(term=term, predicate=same_as, value=OLD + 'gone').delete()
+    term = Term.objects.create(vocabulary=unrelated, name='y')
+    Property.objects.create(term=term, predicate=same_as, value='http://example.com/other/x')
+    term = Term.objects.create(vocabulary=uses_predicate, name='z')
+    Property.objects.create(term=term, predicate=related, value='http://example.com/other/x')
+    return foo, other, uses_predicate
+
+
+def values(vocabulary: Vocabulary) -> set[tuple[str, str]]:
+    return {
+        (prop.predicate.uri, prop.value)
+        for prop in Property.all_objects.filter(term__vocabulary=vocabulary).select_related('predicate')
+    }
+
+
+@pytest.mark.django_db
+def test_dry_run(vocabs):
+    foo, other, uses_predicate = vocabs
+    result = rewrite_namespace(OLD, NEW, dry_run=True)
+    assert (result.properties, result.predicates) == (2, 1)
+    assert result.vocabularies == [foo, other, uses_predicate]
+    assert Vocabulary.objects.filter(uri=OLD).exists()
+    assert Property.all_objects.filter(value__startswith=NEW).count() == 0
+
+
+@pytest.mark.django_db
+def test_rewrite(vocabs, django_capture_on_commit_callbacks):
+    foo, other, uses_predicate = vocabs
+    before = {v.pk: v.updated for v in vocabs}
+    graph_cache.get(other)
+    with django_capture_on_commit_callbacks(execute=True):
+        result = rewrite_namespace(OLD, NEW)
+    assert (result.properties, result.predicates) == (2, 1)
+
+    foo.refresh_from_db()
+    assert foo.uri == NEW
+    assert values(other) == {
+        (str(owl.sameAs), NEW + 'thing'),
+        (str(owl.sameAs), NEW + 'gone'),
+        (str(owl.sameAs), OLD + 'sub/thing'),
+        (str(owl.sameAs), OLD.upper() + 'thing'),
+        (str(rdfs.label), OLD + 'thing'),
+    }
+    assert values(uses_predicate) == {(NEW + 'related', 'http://example.com/other/x')}
+    for vocabulary in vocabs:
+        vocabulary.refresh_from_db()
+        assert vocabulary.updated > before[vocabulary.pk]
+    # cached graphs are updated
+    graph, _ = graph_cache.get(other)
+    assert URIRef(NEW + 'thing') in set(graph.objects(predicate=owl.sameAs))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(('old_uri', 'new_uri', 'message'), [
+    ('http://example.com/none/', NEW, 'No vocabulary'),
+    (OLD, 'http://example.org/bar', 'Invalid URI'),
+    (OLD, OLD, 'same as the old one'),
+    (OLD, 'http://example.com/other/', 'already a vocabulary'),
+])
+def test_invalid(vocabs, old_uri, new_uri, message):
+    with pytest.raises(ValueError, match=message):
+        rewrite_namespace(old_uri, new_uri)
+
+
+@pytest.mark.django_db
+def test_predicate_conflict(vocabs):
+    Predicate.objects.create(uri=NEW + 'related', object_type=Predicate.ObjectType.URI_REF)
+    with pytest.raises(ValueError, match='Predicates already exist'):
+        rewrite_namespace(OLD, NEW)
+    assert Vocabulary.objects.filter(uri=OLD).exists()
+
+
+@pytest.mark.django_db
+def test_vocabulary_form(vocabs, admin_client):
+    foo = vocabs[0]
+    response = admin_client.post(
+        f'/vocabs/{foo.id}',
+        data={'uri': NEW, 'label': 'Foo', 'description': '', 'preferred_prefix': ''},
+        follow=True,
+    )
+    assert 'Updated 2 reference(s) and 1 predicate(s) in 3 vocabulary(ies)' in response.content.decode()
+    assert Property.objects.filter(value=NEW + 'thing').exists()
@@ -0,0 +1,102 @@
+import pytest
+from plastron.namespaces import dcterms, owl, rdfs
+
+from vocabs.events import predicates_changed
+from vocabs.forms import PropertyForm
+from vocabs.models import Predicate, PredicateRegistry, Term, Vocabulary, predicate_registry
+
+
+@pytest.fixture
+def label():
+    return Predicate.objects.create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+
+
+@pytest.fixture
+def same_as():
+    return Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+
+
+@pytest.mark.django_db
+def test_lookups(label, same_as):
+    registry = PredicateRegistry(max_age=60)
+    assert registry.all() == (label, same_as)
+    assert registry.get(label.id) == label
+    assert registry.get(0) is None
+    assert registry.from_uri(str(owl.sameAs)) == same_as
+    assert registry.from_curie('rdfs:label') == label
+    assert registry.from_curie('dcterms:title') is None
+    assert registry.get_or_create(str(owl.sameAs), Predicate.ObjectType.URI_REF) == same_as
+
+
+@pytest.mark.django_db
+def test_loaded_once(label, same_as, django_assert_num_queries):
+    registry = PredicateRegistry(max_age=60)
+    # one query for the version, one for the predicates
+    with django_assert_num_queries(2):
+        registry.all()
+    with django_assert_num_queries(0):
+        registry.get(label.id)
+        registry.from_curie('owl:sameAs')
+    assert registry.loads == 1
+
+
+@pytest.mark.django_db
+def test_reloaded_on_change(label):
+    registry = PredicateRegistry(max_age=60)
+    before = registry.snapshot()
+    title = Predicate.objects.create(uri=dcterms.title, object_type=Predicate.ObjectType.LITERAL)
+    # not noticed until a change event or the maximum age
+    assert registry.get(title.id) is None
+
+    registry.handle_change(predicates_changed())
+    assert registry.get(title.id) == title
+    assert registry.loads == 2
+    # the old snapshot is replaced, not changed
+    assert before.predicates == (label,)
+
+
+@pytest.mark.django_db
+def test_version_checked_after_max_age(label, django_assert_num_queries):
+    registry = PredicateRegistry(max_age=0)
+    registry.all()
+    # unchanged, so only the version is read again
+    with django_assert_num_queries(1):
+        assert registry.all() == (label,)
+    assert registry.loads == 1
+
+    title = Predicate.objects.create(uri=dcterms.title, object_type=Predicate.ObjectType.LITERAL)
+    assert registry.get(title.id) == title
+    assert registry.loads == 2
+
+
+@pytest.mark.django_db
+def test_other_events_ignored(label):
+    registry = PredicateRegistry(max_age=60)
+    registry.all()
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    Term.objects.create(vocabulary=vocab, name='red')
+    registry.all()
+    assert registry.loads == 1
+
+
+@pytest.mark.django_db
+def test_saved_predicates_invalidate_shared_registry(label, django_capture_on_commit_callbacks):
+    assert predicate_registry.all() == (label,)
+    with django_capture_on_commit_callbacks(execute=True):
+        same_as = Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    assert predicate_registry.all() == (label, same_as)
+
+
+@pytest.mark.django_db
+def test_property_form_uses_registry(label, django_assert_num_queries):
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    term = Term.objects.create(vocabulary=vocab, name='red')
+    form = PropertyForm({'term': term.id, 'predicate': label.id, 'value': 'Red'})
+    assert form.is_valid()
+    assert form.cleaned_data['predicate'] == label
+    with django_assert_num_queries(0):
+        assert [value for value, _ in form.fields['predicate'].choices] == ['', label.id]
+
+    form = PropertyForm({'term': term.id, 'predicate': 0, 'value': 'Red'})
+    assert not form.is_valid()
+    assert 'predicate' in form.errors
@@ -0,0 +1,84 @@
+"""Checks that the hot lookups are answered from an index, not a table scan."""
+
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+from plastron.namespaces import rdfs
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+
+
+def query_plan(queryset: QuerySet) -> str:
+    if connection.vendor == 'postgresql':
+        # the test tables are tiny, so the planner would prefer to scan them anyway
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    elif connection.vendor != 'sqlite':
+        pytest.skip(f'No query plan checks for {connection.vendor}')
+    return queryset.explain()
+
+
+def assert_uses_index(queryset: QuerySet, index_name: str | None = None):
+    plan = query_plan(queryset)
+    if connection.vendor == 'sqlite':
+        table = queryset.model._meta.db_table
+        steps = [line for line in plan.splitlines() if f' {table} ' in line + ' ']
+        # "SEARCH" looks up rows by key; "SCAN ... USING INDEX" walks an index in order
+        assert steps and all('USING' in step for step in steps), plan
+    else:
+        assert 'Seq Scan' not in plan, plan
+    if index_name is not None:
+        assert index_name in plan, plan
+
+
+@pytest.fixture
+def term():
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    return Term.objects.create(vocabulary=vocab, name='red')
+
+
+@pytest.fixture
+def label():
+    predicate, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    return predicate
+
+
+@pytest.mark.django_db
+def test_vocabulary_by_uri(term):
+    assert_uses_index(Vocabulary.objects.filter(uri='http://example.com/colors#'))
+
+
+@pytest.mark.django_db
+def test_predicate_by_uri(label):
+    # SQLite gives the index for the unique constraint its own name
+    assert_uses_index(Predicate.objects.filter(uri=str(rdfs.label)))
+    assert_uses_index(Predicate.objects.filter(uri=str(rdfs.label), object_type=Predicate.ObjectType.LITERAL))
+
+
+@pytest.mark.django_db
+def test_live_term_by_name(term):
+    assert_uses_index(
+        Term.objects.filter(vocabulary=term.vocabulary, name='red'),
+        'unique_term_vocabulary_name',
+    )
+
+
+@pytest.mark.django_db
+def test_live_property_by_value(term, label):
+    Property.objects.create(term=term, predicate=label, value='Red')
+    assert_uses_index(
+        Property.objects.filter(term=term, predicate=label, value='Red'),
+        'property_live_term_idx',
+    )
+
+
+@pytest.mark.django_db
+def test_latest_change(term):
+    assert_uses_index(Term.all_objects.order_by('-modified')[:1], 'term_modified_idx')
+
+
+@pytest.mark.django_db
+def test_table_scan_detected(term):
+    with pytest.raises(AssertionError):
+        # all_objects, since the default manager also filters on the indexed "deleted" column
+        assert_uses_index(Vocabulary.all_objects.filter(label='Colors'))
@@ -0,0 +1,140 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from plastron.namespaces import rdfs, skos
+
+from vocabs.models import Predicate, Property, Term, Vocabulary, predicate_registry
+from vocabs.reconcile import ReconciliationQuery, label_index, normalize, reconcile, trigrams
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    rdfs_label, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    alt_label, _ = Predicate.objects.get_or_create(uri=skos.altLabel, object_type=Predicate.ObjectType.LITERAL)
+    for name, label, alt in [('red', 'Red', 'Crimson'), ('lightBlue', 'Light Blue', 'Bleu clair'), ('green', '', '')]:
+        term = Term.objects.create(vocabulary=vocab, name=name)
+        if label:
+            Property.objects.create(term=term, predicate=rdfs_label, value=label)
+        if alt:
+            Property.objects.create(term=term, predicate=alt_label, value=alt)
+    return vocab
+
+
+@pytest.mark.parametrize(
+    ('label', 'expected'),
+    [
+        ('Light Blue', 'light blue'),
+        ('lightBlue', 'light blue'),
+        ('  Café -- au   lait!', 'cafe au lait'),
+        ('snake_case', 'snake case'),
+        ('', ''),
+    ]
+)
+def test_normalize(label, expected):
+    assert normalize(label) == expected
+
+
+def test_trigrams():
+    assert trigrams('ab') == {'  a', ' ab', 'ab '}
+
+
+@pytest.mark.django_db
+def test_exact_match(vocab):
+    results = label_index.match({'q0': ReconciliationQuery('light blue'), 'q1': ReconciliationQuery('CRIMSON')})
+    assert results['q0'][0].uri == 'http://example.com/colors#lightBlue'
+    assert results['q0'][0].label == 'Light Blue'
+    assert results['q0'][0].score == 100.0
+    assert results['q0'][0].match is True
+    assert results['q1'][0].uri == 'http://example.com/colors#red'
+    assert results['q1'][0].label == 'Red'
+
+
+@pytest.mark.django_db
+def test_fuzzy_match(vocab):
+    results = label_index.match({'q0': ReconciliationQuery('Light Bleu'), 'q1': ReconciliationQuery('zzzz')})
+    assert results['q0'][0].uri == 'http://example.com/colors#lightBlue'
+    assert results['q0'][0].match is False
+    assert 30.0 <= results['q0'][0].score < 100.0
+    assert results['q1'] == []
+
+
+@pytest.mark.django_db
+def test_match_by_term_name(vocab):
+    results = label_index.match({'q0': ReconciliationQuery('Green')})
+    assert results['q0'][0].uri == 'http://example.com/colors#green'
+
+
+@pytest.mark.django_db
+def test_match_limited_to_vocabulary(vocab):
+    other = Vocabulary.objects.create(uri='http://example.com/other#', label='Other')
+    Term.objects.create(vocabulary=other, name='red')
+    results = label_index.match({'q0': ReconciliationQuery('red', limit=10)})
+    assert len(results['q0']) == 2
+    results = label_index.match({'q0': ReconciliationQuery('red', vocabulary_id=other.id)})
+    assert [c.uri for c in results['q0']] == ['http://example.com/other#red']
+
+
+@pytest.mark.django_db
+def test_index_is_rebuilt_after_changes(vocab, django_assert_num_queries, django_capture_on_commit_callbacks):
+    label_index.match({'q0': ReconciliationQuery('red')})
+    assert label_index.is_built
+    # a batch of any size is answered without touching the database
+    with django_assert_num_queries(0):
+        label_index.match({f'q{n}': ReconciliationQuery(f'red {n}') for n in range(100)})
+
+    # properties that are not labels leave the index alone
+    comment, _ = Predicate.objects.get_or_create(uri=rdfs.comment, object_type=Predicate.ObjectType.LITERAL)
+    term = Term.objects.get(vocabulary=vocab, name='red')
+    Property.objects.create(term=term, predicate=comment, value='A warm colour')
+    predicate_registry.all()
+    label_index.match({'q0': ReconciliationQuery('red')})
+    prop = Property.objects.get(term=term, predicate=comment)
+    prop.value = 'A warm color'
+    with CaptureQueriesContext(connection) as context, django_capture_on_commit_callbacks(execute=True):
+        prop.save()
+    assert label_index.is_built
+    # without looking up the predicate of the property
+    assert not [q for q in context.captured_queries if q['sql'].startswith('SELECT "vocabs_predicate"."id"')]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Term.objects.create(vocabulary=vocab, name='purple')
+    assert not label_index.is_built
+    results = label_index.match({'q0': ReconciliationQuery('purple')})
+    assert results['q0'][0].uri == 'http://example.com/colors#purple'
+
+
+@pytest.mark.django_db
+def test_reconcile(vocab):
+    results = reconcile({
+        'q0': {'query': 'Red', 'type': 'http://example.com/colors#', 'limit': 1},
+    })
+    assert results == {
+        'q0': {
+            'result': [
+                {
+                    'id': 'http://example.com/colors#red',
+                    'name': 'Red',
+                    'score': 100.0,
+                    'match': True,
+                    'type': [{'id': 'http://example.com/colors#', 'name': 'Colors'}],
+                },
+            ],
+        },
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'queries',
+    [
+        [],
+        {'q0': 'red'},
+        {'q0': {'text': 'red'}},
+        {'q0': {'query': 'red', 'type': 'http://example.com/unknown#'}},
+        {'q0': {'query': 'red', 'limit': 'many'}},
+    ]
+)
+def test_reconcile_bad_queries(vocab, queries):
+    with pytest.raises(ValueError):
+        reconcile(queries)
@@ -0,0 +1,90 @@
+import pytest
+from plastron.namespaces import owl, rdfs
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+from vocabs.namespaces import BATCH_SIZE, RenameError, rename_terms
+
+FOO = 'http://example.com/foo#'
+
+
+@pytest.fixture
+def vocabs():
+    label = Predicate.objects.create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    same_as = Predicate.objects.create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    related = Predicate.objects.create(uri=FOO + 'related', object_type=Predicate.ObjectType.URI_REF)
+    foo = Vocabulary.objects.create(uri=FOO, label='Foo')
+    other = Vocabulary.objects.create(uri='http://example.com/other#', label='Other')
+    unrelated = Vocabulary.objects.create(uri='http://example.com/unrelated#', label='Unrelated')
+    for name in ['red', 'green', 'related']:
+        Term.objects.create(vocabulary=foo, name=name)
+    term = Term.objects.create(vocabulary=other, name='x')
+    Property.objects.create(term=term, predicate=same_as, value=FOO + 'red')
+    Property.objects.create(term=term, predicate=same_as, value=FOO + 'reddish')
+    Property.objects.create(term=term, predicate=label, value=FOO + 'red')
+    Property.objects.create(term=term, predicate=same_as, value=FOO + 'green').delete()
+    Property.objects.create(term=term, predicate=related, value='http://example.com/other#x')
+    term = Term.objects.create(vocabulary=unrelated, name='y')
+    Property.objects.create(term=term, predicate=same_as, value='http://example.com/other#x')
+    return foo, other
+
+
+@pytest.mark.django_db
+def test_rename(vocabs, django_capture_on_commit_callbacks):
+    foo, other = vocabs
+    with django_capture_on_commit_callbacks(execute=True):
+        result = rename_terms(foo, {'red': 'crimson', 'green': 'lime', 'related': 'see-also'})
+    assert (result.properties, result.predicates) == (2, 1)
+    assert result.vocabularies == [foo, other]
+
+    assert set(foo.terms.values_list('name', flat=True)) == {'crimson', 'lime', 'see-also'}
+    assert {
+        (prop.predicate.uri, prop.value)
+        for prop in Property.all_objects.filter(term__vocabulary=other).select_related('predicate')
+    } == {
+        (str(owl.sameAs), FOO + 'crimson'),
+        (str(owl.sameAs), FOO + 'reddish'),
+        (str(owl.sameAs), FOO + 'lime'),
+        (str(rdfs.label), FOO + 'red'),
+        (FOO + 'see-also', 'http://example.com/other#x'),
+    }
+    assert Predicate.from_curie(FOO + 'see-also') is not None
+
+
+@pytest.mark.django_db
+def test_dry_run(vocabs):
+    foo, other = vocabs
+    result = rename_terms(foo, {'red': 'crimson', 'green': 'green'}, dry_run=True)
+    assert result.names == {'red': 'crimson'}
+    assert (result.properties, result.predicates) == (1, 0)
+    assert result.vocabularies == [foo, other]
+    assert foo.terms.filter(name='red').exists()
+
+
+@pytest.mark.django_db
+def test_invalid_renames(vocabs):
+    foo, _ = vocabs
+    with pytest.raises(RenameError) as e:
+        rename_terms(foo, {'red': 'green', 'green': 'lime', 'related': 'lime', 'blue': 'navy', 'x': 'bad name'})
+    assert set(e.value.errors) == {'red', 'related', 'blue', 'x'}
+    assert e.value.errors['related'] == ['"green" is also being renamed to "lime"']
+    assert foo.terms.filter(name='green').exists()
+
+
+@pytest.mark.django_db
+def test_predicate_conflict(vocabs):
+    foo, _ = vocabs
+    Predicate.objects.create(uri=FOO + 'see-also', object_type=Predicate.ObjectType.URI_REF)
+    with pytest.raises(RenameError) as e:
+        rename_terms(foo, {'related': 'see-also'})
+    assert e.value.errors == {'related': [f'A predicate with the URI "{FOO}see-also" already exists']}
+
+
+@pytest.mark.django_db
+def test_batches(vocabs, django_assert_max_num_queries):
+    foo, _ = vocabs
+    Term.objects.bulk_create([Term(vocabulary=foo, name=f'term{i}') for i in range(BATCH_SIZE + 10)])
+    names = {f'term{i}': f'renamed{i}' for i in range(BATCH_SIZE + 10)}
+    # the number of queries depends on the number of batches, not the number of terms
+    with django_assert_max_num_queries(20):
+        rename_terms(foo, names)
+    assert foo.terms.filter(name__startswith='renamed').count() == BATCH_SIZE + 10
@@ -0,0 +1,68 @@
+import pytest
+from plastron.namespaces import rdf, rdfs
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+from vocabs.resolve import resolve_terms, split_term_uri
+
+
+@pytest.fixture
+def vocabs():
+    rdf_type, _ = Predicate.objects.get_or_create(uri=rdf.type, object_type=Predicate.ObjectType.URI_REF)
+    rdfs_label, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    for uri in ('http://example.com/foo#', 'http://example.com/bar/'):
+        vocab = Vocabulary.objects.create(uri=uri, label='Test')
+        for n in range(5):
+            term = Term.objects.create(vocabulary=vocab, name=f'term{n}')
+            Property.objects.create(term=term, predicate=rdf_type, value=str(rdfs.Class))
+            Property.objects.create(term=term, predicate=rdfs_label, value=f'Term {n}')
+
+
+@pytest.mark.parametrize(
+    ('uri', 'expected'),
+    [
+        ('http://example.com/foo#bar', ('http://example.com/foo#', 'bar')),
+        ('http://example.com/foo/bar', ('http://example.com/foo/', 'bar')),
+        ('http://example.com/foo#', ('http://example.com/foo#', '')),
+    ]
+)
+def test_split_term_uri(uri, expected):
+    assert split_term_uri(uri) == expected
+
+
+@pytest.mark.django_db
+def test_resolve_terms(vocabs):
+    result = resolve_terms(['http://example.com/foo#term1', 'http://example.com/bar/term2'])
+    assert result['not_found'] == []
+    assert result['results']['http://example.com/foo#term1'] == {
+        'vocabulary': 'http://example.com/foo#',
+        'name': 'term1',
+        'properties': {
+            'rdf:type': [str(rdfs.Class)],
+            'rdfs:label': ['Term 1'],
+        },
+    }
+    assert result['results']['http://example.com/bar/term2']['properties']['rdfs:label'] == ['Term 2']
+
+
+@pytest.mark.django_db
+def test_resolve_terms_predicate_subset(vocabs):
+    result = resolve_terms(['http://example.com/foo#term1'], predicates=['rdfs:label'])
+    assert result['results']['http://example.com/foo#term1']['properties'] == {'rdfs:label': ['Term 1']}
+    result = resolve_terms(['http://example.com/foo#term1'], predicates=[str(rdf.type)])
+    assert result['results']['http://example.com/foo#term1']['properties'] == {'rdf:type': [str(rdfs.Class)]}
+
+
+@pytest.mark.django_db
+def test_resolve_terms_not_found(vocabs):
+    uris = ['http://example.com/foo#missing', 'http://example.com/unknown#term1', 'urn:foo']
+    result = resolve_terms(uris)
+    assert result['results'] == {}
+    assert result['not_found'] == uris
+
+
+@pytest.mark.django_db
+def test_resolve_terms_query_count(vocabs, django_assert_num_queries):
+    uris = [f'{vocab}term{n}' for vocab in ('http://example.com/foo#', 'http://example.com/bar/') for n in range(5)]
+    with django_assert_num_queries(3):
+        result = resolve_terms(uris)
+    assert len(result['results']) == 10
@@ -0,0 +1,121 @@
+from io import BytesIO
+
+import pytest
+from plastron.namespaces import rdfs
+
+from vocabs.bulk import deletion_batches, restore_deleted, soft_delete_terms, soft_delete_vocabularies
+from vocabs.events import ChangeEvent, change_bus
+from vocabs.forms import VocabularyForm
+from vocabs.models import Predicate, Property, Term, Vocabulary, VocabularyImportError, import_vocabulary
+
+
+@pytest.fixture
+def vocab():
+    label = Predicate.objects.create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    for name in ('red', 'green', 'blue'):
+        term = Term.objects.create(vocabulary=vocab, name=name)
+        Property.objects.create(term=term, predicate=label, value=name.title())
+    return vocab
+
+
+class Recorder:
+    def __init__(self):
+        self.events: list[ChangeEvent] = []
+
+    def handle_change(self, event: ChangeEvent):
+        self.events.append(event)
+
+
+@pytest.fixture
+def recorder():
+    recorder = Recorder()
+    change_bus.register(recorder)
+    yield recorder
+    change_bus.unregister(recorder)
+
+
+@pytest.mark.django_db
+def test_soft_delete_terms(vocab, recorder, django_assert_max_num_queries, django_capture_on_commit_callbacks):
+    # one UPDATE per table, whatever the number of terms
+    with django_assert_max_num_queries(7), django_capture_on_commit_callbacks(execute=True):
+        batch, count = soft_delete_terms(vocab.terms.filter(name__in=['red', 'green']))
+    assert count == {'terms': 2, 'properties': 2}
+    assert list(vocab.terms.values_list('name', flat=True)) == ['blue']
+    deleted = Term.all_objects.filter(deleted=batch)
+    assert deleted.count() == 2
+    assert not any(term.deleted_by_cascade for term in deleted)
+    assert Property.all_objects.filter(deleted=batch, deleted_by_cascade=True).count() == 2
+    vocab.refresh_from_db()
+    assert vocab.modified == batch
+    assert [event.vocabulary_ids for event in recorder.events] == [frozenset({vocab.id})]
+
+
+@pytest.mark.django_db
+def test_soft_delete_vocabularies(vocab, django_assert_max_num_queries):
+    with django_assert_max_num_queries(7):
+        batch, count = soft_delete_vocabularies(Vocabulary.objects.filter(pk=vocab.pk))
+    assert count == {'vocabularies': 1, 'terms': 3, 'properties': 3}
+    assert not Vocabulary.objects.exists()
+    assert Term.all_objects.filter(deleted=batch, deleted_by_cascade=True).count() == 3
+    assert Vocabulary.all_objects.get().deleted == batch
+
+    # the URI stays taken, so the vocabulary can be restored
+    form = VocabularyForm({'uri': vocab.uri, 'label': 'Colors', 'preferred_prefix': 'colors'})
+    assert 'A vocabulary with this URI already exists' in form.errors['uri']
+
+
+@pytest.mark.django_db
+def test_duplicate_uri():
+    Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    form = VocabularyForm({'uri': 'http://example.com/colors#', 'label': 'Colors', 'preferred_prefix': 'colors'})
+    assert not form.is_valid()
+    assert 'A vocabulary with this URI already exists' in form.errors['uri']
+
+
+@pytest.mark.django_db
+def test_restore_terms(vocab):
+    first, _ = soft_delete_terms(vocab.terms.filter(name='red'))
+    Property.objects.filter(term__name='blue').get().delete()
+    second, _ = soft_delete_terms(vocab.terms.filter(name='green'))
+
+    batches = deletion_batches(vocab)
+    assert batches[0] == {'batch': second.isoformat(), 'deleted': {'terms': 1, 'properties': 1}}
+    assert batches[-1] == {'batch': first.isoformat(), 'deleted': {'terms': 1, 'properties': 1}}
+    assert len(batches) == 3
+
+    assert restore_deleted(vocab, first) == {'terms': 1, 'properties': 1}
+    assert set(vocab.terms.values_list('name', flat=True)) == {'red', 'blue'}
+    assert Property.objects.filter(term__name='red').count() == 1
+    # the other batches stay deleted
+    assert len(deletion_batches(vocab)) == 2
+    assert not Property.objects.filter(term__name='blue').exists()
+
+
+@pytest.mark.django_db
+def test_restore_vocabulary(vocab):
+    batch, _ = soft_delete_vocabularies(Vocabulary.objects.filter(pk=vocab.pk))
+    assert deletion_batches(Vocabulary.all_objects.get()) == [
+        {'batch': batch.isoformat(), 'deleted': {'vocabulary': 1, 'terms': 3, 'properties': 3}},
+    ]
+    assert restore_deleted(vocab, batch) == {'vocabularies': 1, 'terms': 3, 'properties': 3}
+    assert Vocabulary.objects.get() == vocab
+    assert vocab.terms.count() == 3
+    assert Property.objects.filter(term__vocabulary=vocab).count() == 3
+
+
+@pytest.mark.django_db
+def test_restore_conflicts(vocab):
+    batch, _ = soft_delete_terms(vocab.terms.filter(name='red'))
+    Term.objects.create(vocabulary=vocab, name='red')
+    with pytest.raises(ValueError, match='red'):
+        restore_deleted(vocab, batch)
+
+
+@pytest.mark.django_db
+def test_import_into_deleted_vocabulary(vocab):
+    soft_delete_vocabularies(Vocabulary.objects.filter(pk=vocab.pk))
+    data = BytesIO(f'<{vocab.uri}purple> <{rdfs.label}> "Purple" .\n'.encode())
+    with pytest.raises(VocabularyImportError, match='has been deleted'):
+        import_vocabulary(data, vocab.uri, 'ntriples')
+    assert not Vocabulary.objects.exists()
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from plastron.namespaces import owl, rdfs
+
+from vocabs.models import Predicate, Property, Term, Vocabulary
+from vocabs.sparql import QueryError, QueryTimeout, vocabulary_dataset
+
+
+@pytest.fixture
+def vocab():
+    vocab = Vocabulary.objects.create(uri='http://example.com/colors#', label='Colors')
+    label, _ = Predicate.objects.get_or_create(uri=rdfs.label, object_type=Predicate.ObjectType.LITERAL)
+    for name in ['red', 'green']:
+        term = Term.objects.create(vocabulary=vocab, name=name)
+        Property.objects.create(term=term, predicate=label, value=name.title())
+    return vocab
+
+
+def select(query: str, max_results: int = 100) -> list[dict[str, str]]:
+    result = vocabulary_dataset.query(query, timeout=5, max_results=max_results)
+    return [{str(k): str(v) for k, v in row.items()} for row in result.result.bindings]
+
+
+LABELS = 'SELECT ?s ?label WHERE { ?s rdfs:label ?label } ORDER BY ?s'
+
+
+@pytest.mark.django_db
+def test_query_named_graphs(vocab):
+    rows = select('SELECT ?g ?s WHERE { GRAPH ?g { ?s dc:identifier "red" } }')
+    assert rows == [{'g': 'http://example.com/colors#', 's': 'http://example.com/colors#red'}]
+    assert select(LABELS) == [
+        {'s': 'http://example.com/colors#', 'label': 'Colors'},
+        {'s': 'http://example.com/colors#green', 'label': 'Green'},
+        {'s': 'http://example.com/colors#red', 'label': 'Red'},
+    ]
+
+
+@pytest.mark.django_db
+def test_incremental_update(vocab, monkeypatch, django_capture_on_commit_callbacks):
+    same_as, _ = Predicate.objects.get_or_create(uri=owl.sameAs, object_type=Predicate.ObjectType.URI_REF)
+    select(LABELS)
+    assert vocabulary_dataset.is_built
+
+    # after the first query, changes to terms and vocabularies must not cause a full rebuild
+    def fail():
+        raise AssertionError('dataset was rebuilt')
+    monkeypatch.setattr(vocabulary_dataset, '_build', fail)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        red = Term.objects.get(name='red')
+        Property.objects.create(term=red, predicate=same_as, value='http://example.org/red')
+        Term.objects.get(name='green').delete()
+    rows = select('SELECT ?s ?o WHERE { ?s owl:sameAs ?o }')
+    assert rows == [{'s': 'http://example.com/colors#red', 'o': 'http://example.org/red'}]
+    assert [row['label'] for row in select(LABELS)] == ['Colors', 'Red']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        vocab.uri = 'http://example.com/colours#'
+        vocab.save()
+    assert select('SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }') == [{'g': 'http://example.com/colours#'}]
+    result = vocabulary_dataset.query('ASK { <http://example.com/colors#red> ?p ?o }', timeout=5, max_results=10)
+    assert result.result.askAnswer is False
+
+
+@pytest.mark.django_db
+def test_result_limit(vocab):
+    result = vocabulary_dataset.query(LABELS, timeout=5, max_results=2)
+    assert len(result.result.bindings) == 2
+    assert result.truncated
+
+    result = vocabulary_dataset.query('CONSTRUCT WHERE { ?s ?p ?o }', timeout=5, max_results=3)
+    assert len(result.result.graph) == 3
+    assert result.truncated
+
+
+@pytest.mark.django_db
+def test_serialize(vocab):
+    result = vocabulary_dataset.query(LABELS, timeout=5, max_results=10)
+    body, media_type = result.serialize('text/csv')
+    assert media_type == 'text/csv'
+    assert body.splitlines()[0] == b's,label'
+    body, media_type = vocabulary_dataset.query('DESCRIBE <http://example.com/colors#red>', 5, 10).serialize()
+    assert media_type == 'text/turtle'
+    assert b'"Red"' in body
+
+
+@pytest.mark.parametrize('query', ['SELECT ?s WHERE {', 'INSERT DATA { <urn:a> <urn:b> <urn:c> }'])
+def test_invalid_query(query):
+    with pytest.raises(QueryError):
+        vocabulary_dataset.query(query, timeout=5, max_results=10)
+
+
+@pytest.mark.django_db
+def test_timeout(vocab):
+    select(LABELS)
+    # simulate a long-running query holding the dataset
+    vocabulary_dataset._lock.acquire()
+    try:
+        with pytest.raises(QueryTimeout):
+            vocabulary_dataset.query(LABELS, timeout=0.1, max_results=10)
+    finally:
+        vocabulary_dataset._lock.release()
+
+
+@pytest.mark.django_db
+def test_timeout_stops_evaluation(vocab):
+    # an aggregate over a large cross product produces no rows until the
+    # whole product has been evaluated
+    patterns = ' . '.join(f'?s{i} ?p{i} ?o{i}' for i in range(8))
+    query = f'SELECT (COUNT(*) AS ?n) WHERE {{ {patterns} }}'
+    start = time.monotonic()
+    with pytest.raises(QueryTimeout):
+        vocabulary_dataset.query(query, timeout=0.2, max_results=10)
+    # the query no longer holds the dataset, so the next one can run
+    assert vocabulary_dataset._lock.acquire(timeout=1)
+    vocabulary_dataset._lock.release()
+    assert time.monotonic() - start < 2
+    assert len(select(LABELS)) == 3
@@ -0,0 +1,111 @@
+import pytest
+from plastron.namespaces import rdf, rdfs
+
+from vocabs.bulk import deletion_batches, restore_deleted, sync_vocabulary
+from vocabs.models import Predicate, Property, Term, Vocabulary, VocabularyImportError
+
+URI = 'http://example.com/colors#'
+
+BEFORE = '''
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix : <http://example.com/colors#> .
+
+:red a rdfs:Class ; rdfs:label "Red" .
+:green a rdfs:Class ; rdfs:label "Green" .
+:blue a rdfs:Class ; rdfs:label "Blue" .
+'''
+
+AFTER = '''
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix : <http://example.com/colors#> .
+
+:red a rdfs:Class ; rdfs:label "Red", "Rouge" .
+:green a rdfs:Class .
+:yellow a rdfs:Class ; rdfs:label "Yellow" .
+'''
+
+
+@pytest.fixture
+def ttl(tmp_path):
+    def _ttl(content: str):
+        path = tmp_path / 'colors.ttl'
+        path.write_text(content)
+        return path
+    return _ttl
+
+
+def statements(vocabulary: Vocabulary) -> set[tuple[str, str, str]]:
+    return set(
+        Property.objects.filter(term__vocabulary=vocabulary).values_list('term__name', 'predicate__uri', 'value')
+    )
+
+
+@pytest.mark.django_db
+def test_sync_new_vocabulary(ttl):
+    vocab, is_new, diff = sync_vocabulary(ttl(BEFORE), URI, 'turtle', dry_run=True)
+    assert vocab is None
+    assert is_new
+    assert diff.new_terms == ['blue', 'green', 'red']
+    assert len(diff.new_properties) == 6
+    assert not Vocabulary.objects.exists()
+
+    vocab, is_new, diff = sync_vocabulary(ttl(BEFORE), URI, 'turtle')
+    assert is_new
+    assert vocab.label == 'Colors'
+    assert diff.count() == {'new_terms': 3, 'new_properties': 6, 'removed_terms': 0, 'removed_properties': 0}
+    assert ('red', str(rdfs.label), 'Red') in statements(vocab)
+
+    # no changes the second time
+    _, is_new, diff = sync_vocabulary(ttl(BEFORE), URI, 'turtle')
+    assert not is_new
+    assert not diff
+
+
+@pytest.mark.django_db
+def test_sync_changes(ttl, django_assert_max_num_queries):
+    vocab, _, _ = sync_vocabulary(ttl(BEFORE), URI, 'turtle')
+    modified = vocab.modified
+
+    _, _, preview = sync_vocabulary(ttl(AFTER), URI, 'turtle', dry_run=True)
+    assert preview.new_terms == ['yellow']
+    assert preview.removed_terms == ['blue']
+    assert preview.new_properties == [
+        ('red', str(rdfs.label), Predicate.ObjectType.LITERAL, 'Rouge'),
+        ('yellow', str(rdf.type), Predicate.ObjectType.URI_REF, str(rdfs.Class)),
+        ('yellow', str(rdfs.label), Predicate.ObjectType.LITERAL, 'Yellow'),
+    ]
+    assert preview.removed_properties == [
+        ('blue', str(rdf.type), Predicate.ObjectType.URI_REF, str(rdfs.Class)),
+        ('blue', str(rdfs.label), Predicate.ObjectType.LITERAL, 'Blue'),
+        ('green', str(rdfs.label), Predicate.ObjectType.LITERAL, 'Green'),
+    ]
+    assert Term.objects.filter(vocabulary=vocab).count() == 3
+
+    # the number of queries does not depend on the number of changes
+    with django_assert_max_num_queries(20):
+        _, is_new, diff = sync_vocabulary(ttl(AFTER), URI, 'turtle')
+    assert not is_new
+    assert diff == preview
+    assert set(vocab.terms.values_list('name', flat=True)) == {'red', 'green', 'yellow'}
+    assert statements(vocab) == {
+        ('red', str(rdf.type), str(rdfs.Class)),
+        ('red', str(rdfs.label), 'Red'),
+        ('red', str(rdfs.label), 'Rouge'),
+        ('green', str(rdf.type), str(rdfs.Class)),
+        ('yellow', str(rdf.type), str(rdfs.Class)),
+        ('yellow', str(rdfs.label), 'Yellow'),
+    }
+    vocab.refresh_from_db()
+    assert vocab.modified > modified
+
+    # the removals are a single deletion batch, which can be restored
+    [batch] = deletion_batches(vocab)
+    assert batch['deleted'] == {'terms': 1, 'properties': 3}
+    restore_deleted(vocab, Term.all_objects.get(name='blue').deleted)
+    assert ('green', str(rdfs.label), 'Green') in statements(vocab)
+
+
+@pytest.mark.django_db
+def test_sync_invalid_file(ttl):
+    with pytest.raises(VocabularyImportError):
+        sync_vocabulary(ttl('not turtle'), URI, 'turtle')
@@ -0,0 +1,102 @@
+import bz2
+import gzip
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from plastron.namespaces import rdf, rdfs
+
+from vocabs.models import Predicate, VocabularyImportError, read_vocabulary
+from vocabs.uploads import AUTO_FORMAT, open_upload, sniff_format
+
+URI = 'http://example.com/vocab/simple#'
+
+NTRIPLES = (
+    b'# two terms\n'
+    b'<http://example.com/vocab/simple#> <http://www.w3.org/2000/01/rdf-schema#label> "Simple Things" .\n'
+    b'<http://example.com/vocab/simple#Thing> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> '
+    b'<http://www.w3.org/2000/01/rdf-schema#Class> .\n'
+    b'<http://example.com/vocab/simple#Other> <http://www.w3.org/2000/01/rdf-schema#label> "Other" .\n'
+    b'<http://example.com/elsewhere#Thing> <http://www.w3.org/2000/01/rdf-schema#label> "Elsewhere" .\n'
+)
+
+TURTLE = b'''@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+<http://example.com/vocab/simple#Thing> a rdfs:Class .
+'''
+
+RDFXML = b'''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+  <rdf:Description rdf:about="http://example.com/vocab/simple#Thing">
+    <rdf:type rdf:resource="http://www.w3.org/2000/01/rdf-schema#Class"/>
+  </rdf:Description>
+</rdf:RDF>
+'''
+
+
+@pytest.mark.parametrize(
+    ('name', 'data', 'expected'),
+    [
+        ('vocab.nt', b'', 'ntriples'),
+        ('vocab.ttl.gz', b'', 'turtle'),
+        ('vocab.rdf', b'', 'rdfxml'),
+        ('vocab.jsonld', b'', 'json-ld'),
+        ('upload', NTRIPLES, 'ntriples'),
+        ('upload', TURTLE, 'turtle'),
+        ('upload', RDFXML, 'rdfxml'),
+        ('upload', b'\xef\xbb\xbf [{"@id": "http://example.com/vocab/simple#Thing"}]', 'json-ld'),
+    ],
+)
+def test_sniff_format(name, data, expected):
+    stream = BytesIO(data)
+    assert sniff_format(stream, name) == expected
+    # nothing is consumed
+    assert stream.read() == data
+
+
+@pytest.mark.parametrize('compress', [lambda data: data, gzip.compress, bz2.compress])
+def test_open_upload(compress):
+    upload = SimpleUploadedFile('upload', compress(NTRIPLES))
+    with open_upload(upload) as (stream, rdf_format):
+        assert rdf_format == 'ntriples'
+        assert stream.read() == NTRIPLES
+
+
+def test_open_spooled_upload():
+    upload = TemporaryUploadedFile('vocab.ttl.gz', 'application/gzip', 0, None)
+    upload.write(gzip.compress(TURTLE))
+    upload.flush()
+    with open_upload(upload, 'turtle') as (stream, rdf_format):
+        assert rdf_format == 'turtle'
+        assert stream.read() == TURTLE
+    upload.close()
+
+
+def test_open_invalid_compressed_upload():
+    # with no format in the name, the content has to be read to guess it
+    upload = SimpleUploadedFile('upload', b'\x1f\x8b not really gzip')
+    with pytest.raises(VocabularyImportError):
+        with open_upload(upload, AUTO_FORMAT):
+            pass
+
+
+@pytest.mark.parametrize('rdf_format', ['ntriples', 'turtle'])
+def test_read_vocabulary(rdf_format):
+    # N-Triples are streamed, Turtle is parsed into a graph; both give the same result
+    terms, metadata = read_vocabulary(BytesIO(NTRIPLES), URI, rdf_format)
+    assert terms['Thing'] == [(str(rdf.type), Predicate.ObjectType.URI_REF, str(rdfs.Class))]
+    assert terms['Other'] == [(str(rdfs.label), Predicate.ObjectType.LITERAL, 'Other')]
+    assert metadata['label'] == 'Simple Things'
+
+
+def test_read_compressed_ntriples():
+    with gzip.open(BytesIO(gzip.compress(NTRIPLES))) as stream:
+        terms, _ = read_vocabulary(stream, URI, 'ntriples')
+    assert set(terms) == {'', 'Thing', 'Other'}
+
+    with pytest.raises(VocabularyImportError):
+        read_vocabulary(gzip.open(BytesIO(b'\x1f\x8b not really gzip')), URI, 'ntriples')
+
+
+def test_read_rdfxml():
+    terms, _ = read_vocabulary(BytesIO(RDFXML), URI, 'rdfxml')
+    assert set(terms) == {'Thing'}